@@ -30,7 +30,7 @@ def mock_embedding_service():
                 return "vec_food"
             return "vec_other"
 
-        service.get_embedding.side_effect = get_emb
+        service.get_embeddings.side_effect = lambda texts: [get_emb(t) for t in texts]
         yield service
 
 
@@ -76,3 +76,55 @@ def test_semantic_anomaly_rule_does_not_trigger_on_match(mock_embedding_service)
     result = rule.should_notify(df, pd.DataFrame(), {})
 
     assert result.triggered is False
+
+
+def _despesas(*linhas: tuple[int, str, str]) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                config.ColunasTransacoes.ID: tx_id,
+                config.ColunasTransacoes.TIPO: config.ValoresTipo.DESPESA,
+                config.ColunasTransacoes.DESCRICAO: desc,
+                config.ColunasTransacoes.CATEGORIA: cat,
+                config.ColunasTransacoes.VALOR: 10.0,
+            }
+            for tx_id, desc, cat in linhas
+        ]
+    )
+
+
+def test_semantic_anomaly_rule_pontua_cada_transacao_uma_vez(
+    mock_embedding_service, tmp_path
+):
+    scores_path = str(tmp_path / "semantic_scores.json")
+    df = _despesas((1, "Compra de Pneus", "Alimentação"))
+
+    rule = SemanticAnomalyRule(threshold_similarity=0.5, scores_path=scores_path)
+    assert rule.should_notify(df, pd.DataFrame(), {}).triggered is True
+
+    # Nova execução (instância nova, como no job): nada novo, zero chamadas
+    mock_embedding_service.get_embeddings.reset_mock()
+    rule = SemanticAnomalyRule(threshold_similarity=0.5, scores_path=scores_path)
+    assert rule.should_notify(df, pd.DataFrame(), {}).triggered is False
+    mock_embedding_service.get_embeddings.assert_not_called()
+
+    # Só a transação nova vai para o provedor
+    df = _despesas((1, "Compra de Pneus", "Alimentação"), (2, "Pizza", "Alimentação"))
+    rule.should_notify(df, pd.DataFrame(), {})
+    mock_embedding_service.get_embeddings.assert_called_once_with(
+        ["Pizza", "Alimentação"]
+    )
+
+
+def test_semantic_anomaly_rule_repontua_transacao_editada(mock_embedding_service):
+    rule = SemanticAnomalyRule(threshold_similarity=0.5)
+    rule.should_notify(
+        _despesas((1, "Compra de Pneus", "Alimentação")), pd.DataFrame(), {}
+    )
+
+    result = rule.should_notify(
+        _despesas((1, "Compra de Pneus", "Pizzaria")), pd.DataFrame(), {}
+    )
+
+    assert result.triggered is True
+    assert "Pizzaria" in result.message_template
@@ -1,4 +1,7 @@
 # src/application/notifications/rules/economy/semantic_anomaly_rule.py
+import hashlib
+import json
+import os
 from typing import Any
 
 import pandas as pd
@@ -17,22 +20,66 @@ class SemanticAnomalyRule(IFinancialRule):
     """
     Regra: Detecta se o conteúdo semântico de uma transação não condiz com sua categoria.
     Ex: "Compra de Pneus" na categoria "Alimentação".
+
+    Cada transação é pontuada uma única vez: a chave (ID + descrição +
+    categoria) e a similaridade ficam salvas em 'scores_path'. Execuções
+    seguintes só pontuam (e notificam) transações novas ou editadas; sem
+    novidades, nenhuma chamada de embedding é feita.
     """
 
-    def __init__(self, threshold_similarity: float = 0.3, lookback_n: int = 10):
+    def __init__(
+        self,
+        threshold_similarity: float = 0.3,
+        lookback_n: int = 10,
+        scores_path: str | None = None,
+        embedding_service: EmbeddingService | None = None,
+    ):
         """
         Args:
             threshold_similarity: Se a similaridade for menor que isso, é anomalia.
             lookback_n: Quantas últimas transações analisar.
+            scores_path: Arquivo JSON com as pontuações já calculadas
+                (sem ele, as pontuações ficam só em memória).
+            embedding_service: Serviço de embeddings (idealmente com cache).
         """
         self.threshold = threshold_similarity
         self.lookback_n = lookback_n
-        self._embedding_service = EmbeddingService()
+        self.scores_path = scores_path
+        self._embedding_service = embedding_service or EmbeddingService()
+        self._scores: dict[str, float] | None = None
 
     @property
     def rule_name(self) -> str:
         return "semantic_anomaly"
 
+    @staticmethod
+    def _score_key(tx_id: Any, desc: str, cat_name: str) -> str:
+        raw = f"{tx_id}|{desc}|{cat_name}".encode()
+        return hashlib.sha1(raw).hexdigest()
+
+    def _load_scores(self) -> dict[str, float]:
+        if self._scores is None:
+            self._scores = {}
+            if self.scores_path and os.path.exists(self.scores_path):
+                try:
+                    with open(self.scores_path, encoding="utf-8") as f:
+                        self._scores = json.load(f).get("scores", {})
+                except (OSError, json.JSONDecodeError) as e:
+                    logger.warning(f"Pontuações semânticas ilegíveis: {e}")
+        return self._scores
+
+    def _save_scores(self, scores: dict[str, float]) -> None:
+        self._scores = scores
+        if not self.scores_path:
+            return
+        temp_file = self.scores_path + ".tmp"
+        try:
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump({"scores": scores}, f)
+            os.replace(temp_file, self.scores_path)
+        except OSError as e:
+            logger.warning(f"Falha ao salvar pontuações semânticas: {e}")
+
     def should_notify(
         self,
         transactions_df: pd.DataFrame,
@@ -50,24 +97,49 @@ class SemanticAnomalyRule(IFinancialRule):
         if last_txs.empty:
             return RuleResult(triggered=False)
 
-        anomalies = []
-
-        for _, row in last_txs.iterrows():
-            desc = str(row[config.ColunasTransacoes.DESCRICAO])
-            cat_name = str(row[config.ColunasTransacoes.CATEGORIA])
+        ids = (
+            last_txs[config.ColunasTransacoes.ID]
+            if config.ColunasTransacoes.ID in last_txs.columns
+            else pd.Series("", index=last_txs.index)
+        )
+        pairs = {
+            self._score_key(tx_id, desc, cat_name): (desc, cat_name)
+            for tx_id, desc, cat_name in zip(
+                ids,
+                last_txs[config.ColunasTransacoes.DESCRICAO].astype(str),
+                last_txs[config.ColunasTransacoes.CATEGORIA].astype(str),
+                strict=True,
+            )
+            if desc and cat_name and cat_name not in ["Outros", "Desconhecido"]
+        }
+
+        known = self._load_scores()
+        pending = {key: pair for key, pair in pairs.items() if key not in known}
+        # Mantém apenas as chaves da janela atual (o arquivo não cresce)
+        scores = {key: known[key] for key in pairs if key in known}
+        if not pending:
+            if scores.keys() != known.keys():
+                self._save_scores(scores)
+            return RuleResult(triggered=False)
 
-            if not desc or not cat_name or cat_name in ["Outros", "Desconhecido"]:
-                continue
+        # Gera os embeddings que faltam (descrições + categorias) num único lote
+        texts = list(dict.fromkeys(t for pair in pending.values() for t in pair))
+        vectors = dict(
+            zip(texts, self._embedding_service.get_embeddings(texts), strict=True)
+        )
 
-            # Gera embeddings
-            desc_vec = self._embedding_service.get_embedding(desc)
-            cat_vec = self._embedding_service.get_embedding(cat_name)
+        anomalies = []
+        for key, (desc, cat_name) in pending.items():
+            desc_vec = vectors[desc]
+            cat_vec = vectors[cat_name]
 
             if not desc_vec or not cat_vec:
+                # Sem vetor (falha do provedor): tenta de novo na próxima execução
                 continue
 
             # Calcula similaridade
             sim = self._embedding_service.cosine_similarity(desc_vec, cat_vec)
+            scores[key] = sim
 
             if sim < self.threshold:
                 logger.info(
@@ -77,6 +149,8 @@ class SemanticAnomalyRule(IFinancialRule):
                     f"- **{desc}** na categoria **{cat_name}** (Baixa coerência)"
                 )
 
+        self._save_scores(scores)
+
         if anomalies:
             msg = "🤔 **Gasto Estranho Detectado**\n\n"
             msg += "Encontrei alguns gastos que parecem estar na categoria errada:\n"
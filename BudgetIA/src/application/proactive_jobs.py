@@ -1,5 +1,6 @@
 # src/app/proactive_jobs.py
 import asyncio
+import os
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
@@ -39,12 +40,22 @@ from application.services.push_notification_service import (  # noqa: E402
 )
 
 
+def _semantic_scores_path(user_config_service: UserConfigService) -> str:
+    """Pontuações da regra semântica, persistidas por usuário."""
+    return os.path.join(user_config_service.get_user_dir(), "semantic_scores.json")
+
+
 # Helper para API de Inteligência listar o que temos
-def get_default_rules(user_config_service: UserConfigService = None):
+def get_default_rules(
+    user_config_service: UserConfigService = None,
+    semantic_scores_path: str | None = None,
+):
     """
     Retorna as regras padrão do sistema.
     Algumas regras podem precisar de config para inicialização (ex: ler keywords).
     """
+    from finance.factory import get_embedding_service
+
     # Ler keywords do config se disponível para o SubscriptionAuditor
     sub_keywords = None
     if user_config_service:
@@ -53,6 +64,8 @@ def get_default_rules(user_config_service: UserConfigService = None):
             sub_keywords = config.get("comunicacao", {}).get("subscription_keywords")
         except Exception:
             pass
+        if semantic_scores_path is None:
+            semantic_scores_path = _semantic_scores_path(user_config_service)
 
     return [
         BudgetOverrunRule(threshold_percent=0.9),
@@ -60,7 +73,12 @@ def get_default_rules(user_config_service: UserConfigService = None):
         AnomalyDetectionRule(std_dev_threshold=3.0, lookback_days=2),
         SubscriptionAuditorRule(days_lookback=30, custom_keywords=sub_keywords),
         RecurringExpenseMonitor(days_lookback=30, threshold_percent=1.2),
-        SemanticAnomalyRule(threshold_similarity=0.35, lookback_n=15),  # Nova Regra
+        SemanticAnomalyRule(
+            threshold_similarity=0.35,
+            lookback_n=15,
+            scores_path=semantic_scores_path,
+            embedding_service=get_embedding_service(),
+        ),
     ]
 
 
@@ -93,7 +111,9 @@ async def run_proactive_notifications(
 
         # 3. Registrar regras de negócio
         # Regras "Hardcoded" do sistema
-        rules = get_default_rules()
+        rules = get_default_rules(
+            semantic_scores_path=_semantic_scores_path(config_service)
+        )
 
         # Regras Dinâmicas (Jarvis Guard)
         repo = RuleRepository(config_service.get_user_dir())
@@ -211,6 +211,48 @@ if UPSTASH_REDIS_URL:
 if not UPSTASH_REDIS_URL:
     print("Aviso: UPSTASH_REDIS_URL não encontrada. O cache não funcionará.")
 
+# CACHE EM MEMÓRIA DE MANAGERS/AGENTES (API multi-usuário)
+# Máximo de planilhas carregadas ao mesmo tempo, teto de memória estimada
+# e tempo ocioso até o manager ser descarregado.
+MANAGER_CACHE_MAX_ENTRIES = int(os.getenv("MANAGER_CACHE_MAX_ENTRIES", "50"))
+MANAGER_CACHE_MAX_MB = int(os.getenv("MANAGER_CACHE_MAX_MB", "512"))
+MANAGER_CACHE_IDLE_TTL_SECONDS = int(
+    os.getenv("MANAGER_CACHE_IDLE_TTL_SECONDS", "1800")
+)
+# Intervalo da varredura em segundo plano (expira ociosos e remede memória)
+MANAGER_CACHE_SWEEP_SECONDS = int(os.getenv("MANAGER_CACHE_SWEEP_SECONDS", "300"))
+
+# CACHE L1 DE DATAFRAMES (em memória, na frente do Redis)
+# Válido enquanto o carimbo de revisão no Redis não mudar.
+DATA_CACHE_L1_MAX_ENTRIES = int(os.getenv("DATA_CACHE_L1_MAX_ENTRIES", "50"))
+DATA_CACHE_L1_MAX_MB = int(os.getenv("DATA_CACHE_L1_MAX_MB", "256"))
+
+# CACHE DE TOKENS DO HOME ASSISTANT (Add-on)
+# Tokens validados (e recusados) ficam em memória por pouco tempo, evitando
+# uma chamada HTTP ao HA Core a cada requisição autenticada.
+HA_TOKEN_CACHE_TTL_SECONDS = int(os.getenv("HA_TOKEN_CACHE_TTL_SECONDS", "60"))
+HA_TOKEN_NEGATIVE_TTL_SECONDS = int(os.getenv("HA_TOKEN_NEGATIVE_TTL_SECONDS", "10"))
+
+# CACHE DOS CONFIGS DE USUÁRIO (user_config.json criptografado)
+# Janela em que o stat() do arquivo é reaproveitado: alterações feitas por
+# outro processo aparecem em até esse tempo (as deste processo, na hora).
+USER_CONFIG_STAT_INTERVAL_SECONDS = float(
+    os.getenv("USER_CONFIG_STAT_INTERVAL_SECONDS", "2")
+)
+
+# VERSÃO DE ARQUIVOS NO GOOGLE DRIVE (GSheets / .xlsx no Drive)
+# Por quanto tempo a versão remota ('files.get') é reaproveitada antes de
+# consultar o Drive de novo. Escritas deste processo invalidam na hora.
+DRIVE_METADATA_TTL_SECONDS = float(os.getenv("DRIVE_METADATA_TTL_SECONDS", "5"))
+# Tamanho de cada bloco do upload resumível de .xlsx para o Drive (MB)
+DRIVE_UPLOAD_CHUNK_SIZE_MB = int(os.getenv("DRIVE_UPLOAD_CHUNK_SIZE_MB", "5"))
+
+# LEITURA DE ARQUIVOS .XLSX
+# Motor de leitura: "openpyxl" (modo read_only, padrão), "calamine"
+# (python-calamine, que não é dependência do projeto: instale à parte) ou
+# "auto" (o mais rápido disponível).
+EXCEL_READER_ENGINE = os.getenv("EXCEL_READER_ENGINE", "openpyxl")
+
 # PRESENÇA / SMART ROUTING
 # Tempo sem heartbeat para considerar offline (Default: 300s = 5 min)
 # Reduzido para 30s para testes a pedido do usuário
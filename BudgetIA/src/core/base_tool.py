@@ -12,6 +12,13 @@ class BaseTool(ABC):
     description: str
     label: str | None = None  # Nome amigável para UI
     args_schema: type[BaseModel]
+    # Abas lidas por uma ferramenta somente-leitura. Se declaradas, o
+    # tool_loader memoiza o resultado por (argumentos, revisão das abas).
+    reads_sheets: tuple[str, ...] = ()
+
+    def sheets_read(self, *args: Any, **kwargs: Any) -> tuple[str, ...]:
+        """Abas consultadas por uma chamada com esses argumentos."""
+        return self.reads_sheets
 
     @abstractmethod
     def run(self, **kwargs: Any) -> str:
@@ -0,0 +1,191 @@
+# src/core/embeddings/embedding_cache.py
+
+import hashlib
+import sqlite3
+import threading
+from typing import Any
+
+import numpy as np
+
+from core.logger import get_logger
+from infrastructure.caching.redis_cache_service import RedisCacheService
+
+logger = get_logger("EmbeddingCache")
+
+# Embeddings não mudam para o mesmo (modelo, texto): TTL longo no Redis.
+REDIS_TTL_SECONDS = 86400 * 30
+# Abaixo do limite de parâmetros por consulta do SQLite.
+_SELECT_CHUNK = 500
+
+
+def normalize_text(text: str) -> str:
+    """Normaliza o texto para a chave do cache (espaços e caixa)."""
+    return " ".join(text.split()).casefold()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Cache persistente de embeddings por (modelo, hash do texto normalizado).
+
+    Os vetores ficam em um SQLite local (float32) e, opcionalmente, no
+    Redis para serem compartilhados entre workers/máquinas. Falhas de
+    I/O são tratadas como miss: o cache nunca quebra a categorização.
+    """
+
+    def __init__(self, db_path: str, redis_cache: RedisCacheService | None = None):
+        self.db_path = db_path
+        self._redis = redis_cache
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+        try:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL,"
+                " text_hash TEXT NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " PRIMARY KEY (model, text_hash))"
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Cache de embeddings local indisponível ({db_path}): {e}")
+            self._conn = None
+
+    @staticmethod
+    def _redis_key(model: str, digest: str) -> str:
+        return f"emb:{model}:{digest}"
+
+    def get_many(self, model: str, texts: list[str]) -> dict[str, list[float]]:
+        """Retorna {texto: vetor} para os textos já em cache."""
+        digests = {text: text_hash(text) for text in texts}
+        found: dict[str, list[float]] = {}
+
+        local = self._select(model, list(dict.fromkeys(digests.values())))
+        for text, digest in digests.items():
+            if digest in local:
+                found[text] = local[digest]
+
+        missing = {t: d for t, d in digests.items() if t not in found}
+        shared = self._fetch_shared(model, missing) if missing else {}
+        if shared:
+            self._insert(model, shared)
+            for text, digest in missing.items():
+                if digest in shared:
+                    found[text] = shared[digest].tolist()
+
+        with self._lock:
+            self.redis_hits += len(shared)
+            self.hits += len(found)
+            self.misses += len(texts) - len(found)
+        return found
+
+    def get(self, model: str, text: str) -> list[float] | None:
+        """Retorna o vetor em cache para o texto (ou None)."""
+        return self.get_many(model, [text]).get(text)
+
+    def set_many(self, model: str, vectors: dict[str, list[float]]) -> None:
+        """Grava {texto: vetor} no SQLite e, se houver, no Redis."""
+        arrays = {
+            text_hash(text): np.asarray(vec, dtype=np.float32)
+            for text, vec in vectors.items()
+            if vec
+        }
+        if not arrays:
+            return
+        self._insert(model, arrays)
+        if self._redis is not None:
+            try:
+                self._redis.set_blobs(
+                    {
+                        self._redis_key(model, digest): arr.tobytes()
+                        for digest, arr in arrays.items()
+                    },
+                    REDIS_TTL_SECONDS,
+                )
+            except Exception as e:
+                logger.warning(f"Erro ao compartilhar embeddings: {e}")
+
+    def set(self, model: str, text: str, vector: list[float]) -> None:
+        self.set_many(model, {text: vector})
+
+    def metrics(self) -> dict[str, Any]:
+        """Métricas de uso: acertos (local + Redis), faltas e taxa de acerto."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _fetch_shared(
+        self, model: str, missing: dict[str, str]
+    ) -> dict[str, np.ndarray]:
+        """Busca no Redis (se houver) os vetores que faltam no SQLite."""
+        if self._redis is None:
+            return {}
+        digests = list(dict.fromkeys(missing.values()))
+        try:
+            blobs = self._redis.get_blobs(
+                [self._redis_key(model, digest) for digest in digests]
+            )
+            return {
+                digest: np.frombuffer(blob, dtype=np.float32)
+                for digest, blob in zip(digests, blobs, strict=True)
+                if blob
+            }
+        except Exception as e:
+            logger.warning(f"Erro ao ler embeddings compartilhados: {e}")
+            return {}
+
+    # --- SQLite ---
+
+    def _select(self, model: str, digests: list[str]) -> dict[str, list[float]]:
+        if self._conn is None or not digests:
+            return {}
+        rows: list[tuple[str, bytes]] = []
+        try:
+            with self._lock:
+                for start in range(0, len(digests), _SELECT_CHUNK):
+                    chunk = digests[start : start + _SELECT_CHUNK]
+                    rows += self._conn.execute(
+                        "SELECT text_hash, vector FROM embeddings"
+                        f" WHERE model = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                        (model, *chunk),
+                    ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao ler cache de embeddings: {e}")
+            return {}
+        return {
+            digest: np.frombuffer(blob, dtype=np.float32).tolist()
+            for digest, blob in rows
+        }
+
+    def _insert(self, model: str, arrays: dict[str, np.ndarray]) -> None:
+        if self._conn is None:
+            return
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, text_hash, vector)"
+                    " VALUES (?, ?, ?)",
+                    [(model, digest, arr.tobytes()) for digest, arr in arrays.items()],
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao gravar cache de embeddings: {e}")
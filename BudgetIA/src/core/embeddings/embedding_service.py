@@ -1,59 +1,148 @@
 # src/core/embeddings/embedding_service.py
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 from openai import OpenAI
 
 import config
+from core.embeddings.embedding_cache import EmbeddingCache
 from core.logger import get_logger
 
 logger = get_logger("EmbeddingService")
 
+# Máximo de textos por requisição aceito por cada provedor.
+OPENAI_BATCH_LIMIT = 2048
+GEMINI_BATCH_LIMIT = 100
+# Requisições simultâneas aos provedores (no processo inteiro).
+MAX_CONCURRENT_REQUESTS = 4
+_request_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+
 
 class EmbeddingService:
     """
     Serviço para geração e comparação de Embeddings (vetores semânticos).
     Essencial para categorização inteligente e busca por similaridade.
+
+    'get_embeddings' é o caminho principal: deduplica os textos, consulta
+    o cache e envia os que faltam em lotes (no limite do provedor), com
+    no máximo MAX_CONCURRENT_REQUESTS requisições em paralelo.
     """
 
-    def __init__(self, api_key: str | None = None):
+    def __init__(self, api_key: str | None = None, cache: EmbeddingCache | None = None):
         self.api_key = api_key or config.OPENAI_API_KEY
         # Prioriza a chave paga se disponível
         self.gemini_key = config.GEMINI_API_KEY_PAID or config.GOOGLE_API_KEY
 
         self.client = OpenAI(api_key=self.api_key) if self.api_key else None
         self.model = "text-embedding-3-small"
+        self.gemini_model = "models/gemini-embedding-2"
+        self.cache = cache
+        # Cliente Gemini criado sob demanda e reaproveitado entre chamadas.
+        self._gemini_client = None
+        self._gemini_lock = threading.Lock()
+
+    @property
+    def active_model(self) -> str:
+        """Modelo usado quando o provedor principal responde."""
+        return self.model if self.client and self.api_key else self.gemini_model
 
     def get_embedding(self, text: str) -> list[float]:
         """Gera o embedding para um texto (Tenta OpenAI, fallback para Gemini)."""
-        if not text or not isinstance(text, str):
-            return []
-
+        return self.get_embeddings([text])[0]
+
+    def get_embeddings(self, texts: list[str]) -> list[list[float]]:
+        """
+        Gera os embeddings de vários textos. Retorna um vetor por texto, na
+        mesma ordem ([] para textos vazios ou que falharam). Vetores já
+        calculados vêm do cache, chaveado pelo modelo ativo (active_model).
+        """
+        cleaned = [
+            text.replace("\n", " ").strip() if isinstance(text, str) else ""
+            for text in texts
+        ]
+        unique = list(dict.fromkeys(t for t in cleaned if t))
+        if not unique:
+            return [[] for _ in texts]
+
+        model_key = self.active_model
+        vectors: dict[str, list[float]] = {}
+        if self.cache is not None:
+            vectors.update(self.cache.get_many(model_key, unique))
+
+        missing = [t for t in unique if t not in vectors]
+        if missing:
+            limit = OPENAI_BATCH_LIMIT if self.client else GEMINI_BATCH_LIMIT
+            chunks = [missing[i : i + limit] for i in range(0, len(missing), limit)]
+            if len(chunks) == 1:
+                results = [self._embed_chunk(chunks[0])]
+            else:
+                workers = min(len(chunks), MAX_CONCURRENT_REQUESTS)
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(self._embed_chunk, chunks))
+
+            for chunk, (chunk_vectors, model) in zip(chunks, results, strict=True):
+                computed = {
+                    text: vec
+                    for text, vec in zip(chunk, chunk_vectors, strict=True)
+                    if vec
+                }
+                vectors.update(computed)
+                # Vetores do fallback são de outro modelo (outra dimensão):
+                # não entram no cache lido por 'model_key'.
+                if computed and self.cache is not None and model == model_key:
+                    self.cache.set_many(model_key, computed)
+
+        return [vectors.get(text, []) if text else [] for text in cleaned]
+
+    def _embed_chunk(self, chunk: list[str]) -> tuple[list[list[float]], str]:
+        """
+        Envia um lote ao provedor (OpenAI, fallback Gemini).
+        Retorna (vetores na ordem do lote, modelo que respondeu).
+        """
         # 1. Tenta OpenAI
         if self.client and self.api_key:
             try:
-                text = text.replace("\n", " ").strip()
-                response = self.client.embeddings.create(input=[text], model=self.model)
-                return response.data[0].embedding
+                with _request_slots:
+                    response = self.client.embeddings.create(
+                        input=chunk, model=self.model
+                    )
+                ordered = sorted(response.data, key=lambda item: item.index)
+                return [item.embedding for item in ordered], self.model
             except Exception as e:
                 logger.warning(f"Erro no OpenAI Embedding, tentando Gemini: {e}")
 
         # 2. Fallback para Gemini (Via LangChain para evitar conflitos)
         if self.gemini_key:
             try:
-                from langchain_google_genai import GoogleGenerativeAIEmbeddings
-
-                gemini_embeddings = GoogleGenerativeAIEmbeddings(
-                    model="models/gemini-embedding-2",
-                    google_api_key=self.gemini_key,
-                    task_type="retrieval_query",
-                )
-                return gemini_embeddings.embed_query(text)
+                gemini = self._get_gemini_client()
+                vectors: list[list[float]] = []
+                for start in range(0, len(chunk), GEMINI_BATCH_LIMIT):
+                    with _request_slots:
+                        vectors += gemini.embed_documents(
+                            chunk[start : start + GEMINI_BATCH_LIMIT],
+                            task_type="retrieval_query",
+                        )
+                return vectors, self.gemini_model
             except Exception as e:
                 logger.error(
                     f"Erro fatal ao gerar embedding no Gemini (LangChain): {e}"
                 )
 
-        return []
+        return [[] for _ in chunk], self.model
+
+    def _get_gemini_client(self):
+        with self._gemini_lock:
+            if self._gemini_client is None:
+                from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+                self._gemini_client = GoogleGenerativeAIEmbeddings(
+                    model=self.gemini_model,
+                    google_api_key=self.gemini_key,
+                    task_type="retrieval_query",
+                )
+            return self._gemini_client
 
     def cosine_similarity(self, v1: list[float], v2: list[float]) -> float:
         """Calcula a similaridade de cosseno entre dois vetores."""
@@ -10,13 +10,18 @@ Contexto:
   disponível, então o sistema cai no JWT padrão.
 """
 
+import asyncio
+import hashlib
 import os
+import time
 from dataclasses import dataclass
 
 import httpx
 
+import config
 from core.logger import get_logger
-from interfaces.api.utils.security import load_users
+from infrastructure.caching.bounded_cache import BoundedLRUCache
+from interfaces.api.utils.security import user_directory
 
 logger = get_logger("HAAuth")
 
@@ -38,14 +43,88 @@ class HAUserInfo:
     is_admin: bool
 
 
+# Resultado em cache: (expira_em, usuário ou None para token recusado)
+_TokenEntry = tuple[float, HAUserInfo | None]
+
+_token_cache: BoundedLRUCache[str, _TokenEntry] = BoundedLRUCache(
+    name="ha_tokens", max_entries=1024
+)
+_http_client: httpx.AsyncClient | None = None
+_http_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _token_key(bearer_token: str) -> str:
+    """O token em si nunca fica em memória, só o hash."""
+    return hashlib.sha256(bearer_token.encode()).hexdigest()
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """
+    Cliente HTTP compartilhado (pool de conexões keep-alive com o HA).
+    Recriado se o event loop mudar, já que o pool fica preso ao loop.
+    """
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(5.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+        _http_client_loop = loop
+    return _http_client
+
+
+async def close_ha_http_client() -> None:
+    """Fecha o cliente HTTP compartilhado (shutdown da API)."""
+    global _http_client, _http_client_loop
+    client, _http_client, _http_client_loop = _http_client, None, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+def clear_ha_token_cache() -> None:
+    """Esquece todos os tokens validados/recusados."""
+    _token_cache.clear()
+
+
 async def validate_ha_token(bearer_token: str) -> HAUserInfo | None:
     """
     Verifica se um Bearer token é um token válido do Home Assistant.
+
+    O resultado fica em cache por HA_TOKEN_CACHE_TTL_SECONDS (aceito) ou
+    HA_TOKEN_NEGATIVE_TTL_SECONDS (recusado): requisições repetidas com o
+    mesmo token não fazem chamadas HTTP. Falhas de rede não são cacheadas.
     """
     if not SUPERVISOR_TOKEN:
         logger.warning("HAAuth: SUPERVISOR_TOKEN não encontrado no ambiente.")
         return None
 
+    key = _token_key(bearer_token)
+    cached = _token_cache.get(key)
+    if cached is not None:
+        expires_at, user_info = cached
+        if time.monotonic() < expires_at:
+            return user_info
+        _token_cache.pop(key)
+
+    user_info, definitive = await _validate_with_core(bearer_token)
+    if definitive:
+        ttl = (
+            config.HA_TOKEN_CACHE_TTL_SECONDS
+            if user_info
+            else config.HA_TOKEN_NEGATIVE_TTL_SECONDS
+        )
+        _token_cache.set(key, (time.monotonic() + ttl, user_info))
+    return user_info
+
+
+async def _validate_with_core(
+    bearer_token: str,
+) -> tuple[HAUserInfo | None, bool]:
+    """
+    Consulta o HA Core. Retorna (usuário ou None, se a resposta é
+    definitiva — 200/401/403 — e portanto pode ir para o cache).
+    """
     # Estratégia Principal: Chamar o Core DIRETAMENTE via IP interno do Docker HA
     # Isso evita que o proxy do Supervisor interceptre o header Authorization.
     direct_core_url = "http://172.30.32.1:8123/api/config"
@@ -54,61 +133,57 @@ async def validate_ha_token(bearer_token: str) -> HAUserInfo | None:
     logger.debug(f"HAAuth: Tentando validação via IP Direto: {direct_core_url}")
 
     try:
-        async with httpx.AsyncClient() as client:
-            # Header padrão para o Core
-            headers = {"Authorization": f"Bearer {bearer_token}"}
-
-            # 1. Tenta IP Direto
-            try:
-                response = await client.get(
-                    direct_core_url, headers=headers, timeout=5.0
-                )
-                if response.status_code == 200:
-                    logger.info("HAAuth: Sucesso via IP Direto (172.30.32.1).")
-                    return HAUserInfo(
-                        ha_username="ha_authenticated_user",
-                        display_name="HA User",
-                        is_admin=True,
-                    )
-                logger.debug(
-                    f"HAAuth: IP Direto falhou ({response.status_code}). Tentando Proxy Supervisor..."
-                )
-            except Exception as e:
-                logger.debug(
-                    f"HAAuth: Erro no IP Direto ({e}). Tentando Proxy Supervisor..."
-                )
-
-            # 2. Fallback: Proxy do Supervisor (requer X-Supervisor-Token)
-            headers["X-Supervisor-Token"] = SUPERVISOR_TOKEN
-            response = await client.get(
-                supervisor_proxy_url, headers=headers, timeout=5.0
+        client = _get_http_client()
+        # Header padrão para o Core
+        headers = {"Authorization": f"Bearer {bearer_token}"}
+
+        # 1. Tenta IP Direto
+        try:
+            response = await client.get(direct_core_url, headers=headers)
+            if response.status_code == 200:
+                logger.info("HAAuth: Sucesso via IP Direto (172.30.32.1).")
+                return _authenticated_user(), True
+            logger.debug(
+                f"HAAuth: IP Direto falhou ({response.status_code}). Tentando Proxy Supervisor..."
+            )
+        except Exception as e:
+            logger.debug(
+                f"HAAuth: Erro no IP Direto ({e}). Tentando Proxy Supervisor..."
             )
 
+        # 2. Fallback: Proxy do Supervisor (requer X-Supervisor-Token)
+        headers["X-Supervisor-Token"] = SUPERVISOR_TOKEN
+        response = await client.get(supervisor_proxy_url, headers=headers)
+
         if response.status_code == 200:
             logger.info("HAAuth: Sucesso via Proxy Supervisor.")
-            return HAUserInfo(
-                ha_username="ha_authenticated_user",
-                display_name="HA User",
-                is_admin=True,
-            )
+            return _authenticated_user(), True
         else:
             logger.error(
                 f"HAAuth: Todas as tentativas falharam. Status final: {response.status_code}"
             )
             try:
-                logger.debug(f"HAAuth: Resposta erro: {response.text[:200]}")  # noqa: E701
+                logger.debug(f"HAAuth: Resposta erro: {response.text[:200]}")
             except Exception:
-                pass  # noqa: E701
-            return None
+                pass
+            return None, response.status_code in (401, 403)
 
     except httpx.TimeoutException:
         logger.error("HAAuth: Timeout ao contactar Supervisor/HA Core.")
-        return None
+        return None, False
     except Exception as e:
         logger.error(
             f"HAAuth: Erro inesperado na validação HA: {type(e).__name__}: {e}"
         )
-        return None
+        return None, False
+
+
+def _authenticated_user() -> HAUserInfo:
+    return HAUserInfo(
+        ha_username="ha_authenticated_user",
+        display_name="HA User",
+        is_admin=True,
+    )
 
 
 def resolve_ha_user_to_budgetia(ha_username: str) -> str | None:
@@ -123,19 +198,19 @@ def resolve_ha_user_to_budgetia(ha_username: str) -> str | None:
     Returns:
         O username do BudgetIA correspondente, ou None se não encontrado.
     """
-    data = load_users()
-    users = data.get("credentials", {}).get("usernames", {})
+    # Somente leitura: índice em memória, relido só quando o users.yaml muda
+    users = user_directory.users
 
     if not users:
         return None
 
     # Estratégia 1: Campo explícito ha_username
-    for username, info in users.items():
-        if info.get("ha_username") == ha_username:
-            logger.info(
-                f"HAAuth: Mapeamento explícito HA '{ha_username}' -> BudgetIA '{username}'"
-            )
-            return username
+    username = user_directory.username_by_ha_username(ha_username)
+    if username is not None:
+        logger.info(
+            f"HAAuth: Mapeamento explícito HA '{ha_username}' -> BudgetIA '{username}'"
+        )
+        return username
 
     # Estratégia 2: username ou email coincide
     for username, info in users.items():
@@ -1,7 +1,13 @@
 # src/core/user_config_service.py
 # (Note: 'core', não 'web_app'. Esta classe não pode importar streamlit)
+import copy
 import json
 import os
+import tempfile
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
@@ -9,6 +15,7 @@ from cryptography.fernet import Fernet, InvalidToken
 
 import config
 from core.logger import get_logger
+from infrastructure.caching.bounded_cache import BoundedLRUCache
 
 logger = get_logger("UserConfigService")
 
@@ -54,6 +61,119 @@ def _get_fernet() -> Fernet:
         raise ValueError(f"Chave de Criptografia inválida: {e}")
 
 
+@dataclass
+class _CachedConfig:
+    stamp: tuple[int, int] | None  # (mtime_ns, tamanho); None = arquivo ausente
+    data: dict[str, Any]
+    checked_at: float
+
+
+class UserConfigCache:
+    """
+    Configs já descriptografados, por arquivo, compartilhados no processo.
+
+    Cada entrada é válida enquanto (mtime_ns, tamanho) do arquivo não mudar;
+    o stat() é reaproveitado por USER_CONFIG_STAT_INTERVAL_SECONDS, então
+    várias leituras na mesma requisição não tocam o disco. save_config()
+    atualiza a entrada na hora (invalidação explícita).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[Path, _CachedConfig] = {}
+        self._decrypt_times: deque[float] = deque()
+        self.hits = 0
+        self.misses = 0
+        self.stat_calls = 0
+        self.decrypts = 0
+
+    @staticmethod
+    def _file_stamp(path: Path) -> tuple[int, int] | None:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def lookup(
+        self, path: Path
+    ) -> tuple[dict[str, Any] | None, tuple[int, int] | None]:
+        """
+        Retorna (config em cache ou None, carimbo atual do arquivo).
+        Com None, quem chamou lê o arquivo e guarda via store().
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and now - entry.checked_at < (
+                config.USER_CONFIG_STAT_INTERVAL_SECONDS
+            ):
+                self.hits += 1
+                return entry.data, entry.stamp
+            self.stat_calls += 1
+
+        stamp = self._file_stamp(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry.stamp == stamp:
+                entry.checked_at = now
+                self.hits += 1
+                return entry.data, stamp
+            self.misses += 1
+        return None, stamp
+
+    def store(
+        self, path: Path, data: dict[str, Any], stamp: tuple[int, int] | None
+    ) -> None:
+        with self._lock:
+            self._entries[path] = _CachedConfig(stamp, data, time.monotonic())
+
+    def store_current(self, path: Path, data: dict[str, Any]) -> None:
+        """Guarda 'data' com o carimbo atual do arquivo (após uma escrita)."""
+        self.store(path, data, self._file_stamp(path))
+
+    def invalidate(self, path: Path) -> None:
+        with self._lock:
+            self._entries.pop(path, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def record_decrypt(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.decrypts += 1
+            self._decrypt_times.append(now)
+            self._prune_decrypts(now)
+
+    def _prune_decrypts(self, now: float) -> None:
+        while self._decrypt_times and now - self._decrypt_times[0] > 60:
+            self._decrypt_times.popleft()
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            self._prune_decrypts(time.monotonic())
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "stat_calls": self.stat_calls,
+                "decrypts": self.decrypts,
+                "decrypts_last_minute": len(self._decrypt_times),
+            }
+
+
+_config_cache = UserConfigCache()
+
+
+def get_user_config_cache() -> UserConfigCache:
+    """Cache de configs compartilhado pelo processo."""
+    return _config_cache
+
+
 class UserConfigService:
     """
     Responsabilidade Única: Gerenciar a leitura e escrita do
@@ -61,6 +181,21 @@ class UserConfigService:
     É a chave para a LGPD e o Multi-Tenancy.
     """
 
+    # Registro de instâncias por (DATA_DIR, username): evita refazer o
+    # mkdir e a montagem de caminhos a cada requisição.
+    _registry: BoundedLRUCache[tuple[str, str], "UserConfigService"] = BoundedLRUCache(
+        name="user_config_services", max_entries=1000
+    )
+
+    @classmethod
+    def for_user(cls, username: str) -> "UserConfigService":
+        """Instância compartilhada do serviço para o usuário."""
+        if not username:
+            raise ValueError("Username não pode ser nulo.")
+        return cls._registry.get_or_create(
+            (str(config.DATA_DIR), username), lambda: cls(username)
+        )
+
     def __init__(self, username: str):
         # Garante que o sistema de criptografia está pronto
         # Isso vai falhar AQUI se a chave não existir, mas agora temos certeza
@@ -100,31 +235,23 @@ class UserConfigService:
             logger.error(f"ERRO ao descriptografar: {e}")
             return None
 
-    # Class-level Cache (Shared across instances)
-    _CONFIG_CACHE: dict[str, dict[str, Any]] = {}
-    _CONFIG_MTIME_CACHE: dict[str, float] = {}
-
     def load_config(self) -> dict[str, Any]:
-        """Carrega a configuração do arquivo JSON deste usuário (L1 Cached)."""
-        cache_key = self.username
+        """
+        Carrega a configuração deste usuário. O JSON descriptografado fica
+        no UserConfigCache; só há nova descriptografia se o arquivo mudar.
+        """
+        cached, stamp = _config_cache.lookup(self.config_file_path)
+        if cached is not None:
+            # Cópia profunda: quem chama altera dicts aninhados antes de salvar
+            return copy.deepcopy(cached)
 
-        # 1. Verifica existência física
-        if not self.config_file_path.exists():
-            return {}
+        data = self._read_config_file() if stamp is not None else {}
+        _config_cache.store(self.config_file_path, data, stamp)
+        return copy.deepcopy(data)
 
+    def _read_config_file(self) -> dict[str, Any]:
+        """Lê e descriptografa o arquivo (sem cache)."""
         try:
-            current_mtime = self.config_file_path.stat().st_mtime
-
-            # 2. Check Cache
-            if cache_key in self._CONFIG_CACHE:
-                cached_mtime = self._CONFIG_MTIME_CACHE.get(cache_key, 0)
-                if current_mtime == cached_mtime:
-                    # Cache Hit
-                    return self._CONFIG_CACHE[
-                        cache_key
-                    ].copy()  # Return copy to prevent mutation bugs
-
-            # 3. Cache Miss (Load from Disk)
             with open(self.config_file_path, "rb") as f:
                 encrypted_data = f.read()
 
@@ -132,14 +259,12 @@ class UserConfigService:
                 logger.warning("Arquivo vazio!")
                 return {}
 
+            _config_cache.record_decrypt()
             json_string = self._decrypt_data(encrypted_data)
 
             if json_string:
                 data: dict[str, Any] = json.loads(json_string)
-                # Update Cache
-                self._CONFIG_CACHE[cache_key] = data
-                self._CONFIG_MTIME_CACHE[cache_key] = current_mtime
-                return data.copy()
+                return data
             else:
                 logger.error("Falha na descriptografia")
                 return {}
@@ -148,32 +273,37 @@ class UserConfigService:
             return {}
 
     def save_config(self, config_data: dict[str, Any]) -> None:
-        """Salva a configuração no arquivo JSON deste usuário e atualiza Cache."""
+        """Salva a configuração (escrita atômica) e atualiza o cache."""
         self._ensure_dir_exists()
         try:
             json_string = json.dumps(config_data, indent=4)
             encrypted_data = self._encrypt_data(json_string)
 
-            # Write to disk
-            with open(self.config_file_path, "wb") as f:
-                f.write(encrypted_data)
-
-            # Update Cache immediately (Optimistic UI style)
-            # We need to update mtime too, but FS mtime might lag slightly or be precise.
-            # Best to reload mtime or set it explicitly?
-            # Let's just update cache content. Next load_config will check mtime.
-            # If filesystem is slow, mtime check might see "old" mtime and trigger reload.
-            # To be safe, we update the cache content so subsequent calls *in same request* use it.
-            self._CONFIG_CACHE[self.username] = config_data.copy()
-            # Force mtime update to avoid immediate reload if stat() is fast
-            if self.config_file_path.exists():
-                self._CONFIG_MTIME_CACHE[self.username] = (
-                    self.config_file_path.stat().st_mtime
-                )
+            fd, temp_path = tempfile.mkstemp(
+                dir=self.config_dir, prefix=".user_config-", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(encrypted_data)
+                os.replace(temp_path, self.config_file_path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+                raise
+
+            # Invalidação explícita: o cache passa a ter o que acabou de ser salvo
+            _config_cache.store_current(
+                self.config_file_path, copy.deepcopy(config_data)
+            )
 
         except OSError as e:
+            _config_cache.invalidate(self.config_file_path)
             logger.error(f"Erro ao salvar config do usuário {self.username}: {e}")
 
+    def invalidate_cache(self) -> None:
+        """Descarta o config em cache (força releitura do disco)."""
+        _config_cache.invalidate(self.config_file_path)
+
     # --- Métodos de Negócio (extraídos do utils/manager) ---
 
     def get_planilha_path(self) -> str | None:
@@ -19,11 +19,12 @@ class AddTransactionUseCase:
 
     def execute(self, transaction: Transaction) -> Transaction:
         # 1. Salva a transação
+        version = self._budget_service.transactions_version()
         saved_transaction = self._transaction_repo.save(transaction)
 
-        # 2. Recalcula orçamentos para o mês/ano da transação
-        self._budget_service.recalculate_budgets(
-            month=saved_transaction.data.month, year=saved_transaction.data.year
+        # 2. Soma o valor ao gasto da categoria (incremental)
+        self._budget_service.apply_transaction_change(
+            None, saved_transaction, base_version=version
         )
 
         return saved_transaction
@@ -16,18 +16,19 @@ class DeleteTransactionUseCase:
         self._budget_service = budget_service
 
     def execute(self, transaction_id: int) -> bool:
-        # 1. Busca antes de deletar para saber qual mês/ano recalcular
+        # 1. Busca antes de deletar para saber o que descontar dos orçamentos
         transaction = self._transaction_repo.get_by_id(transaction_id)
         if not transaction:
             return False
 
         # 2. Deleta
+        version = self._budget_service.transactions_version()
         success = self._transaction_repo.delete(transaction_id)
 
-        # 3. Recalcula se teve sucesso
+        # 3. Desconta o valor do gasto da categoria se teve sucesso
         if success:
-            self._budget_service.recalculate_budgets(
-                month=transaction.data.month, year=transaction.data.year
+            self._budget_service.apply_transaction_change(
+                transaction, None, base_version=version
             )
 
         return success
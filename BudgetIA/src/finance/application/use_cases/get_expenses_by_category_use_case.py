@@ -9,5 +9,9 @@ class GetExpensesByCategoryUseCase:
     def __init__(self, transaction_service: TransactionDomainService):
         self._service = transaction_service
 
-    def execute(self, top_n: int = 5) -> dict[str, float]:
-        return self._service.get_expenses_by_category(top_n=top_n)
+    def execute(
+        self, top_n: int = 5, month: int | None = None, year: int | None = None
+    ) -> dict[str, float]:
+        return self._service.get_expenses_by_category(
+            top_n=top_n, month=month, year=year
+        )
@@ -0,0 +1,13 @@
+from finance.domain.services.transaction_service import TransactionDomainService
+
+
+class GetMonthlySummaryUseCase:
+    """
+    Caso de Uso: Recuperar receitas, despesas e saldo agrupados por mês.
+    """
+
+    def __init__(self, transaction_service: TransactionDomainService):
+        self._service = transaction_service
+
+    def execute(self, year: int | None = None) -> dict[str, dict[str, float]]:
+        return self._service.get_monthly_summary(year=year)
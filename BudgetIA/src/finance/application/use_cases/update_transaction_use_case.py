@@ -17,24 +17,18 @@ class UpdateTransactionUseCase:
         self._budget_service = budget_service
 
     def execute(self, transaction: Transaction) -> Transaction | None:
-        # 1. Busca a original para saber se mudou o mês/ano (precisa recalcular ambos se mudou)
+        # 1. Busca a original para calcular a diferença nos orçamentos
         original = self._transaction_repo.get_by_id(transaction.id)  # type: ignore
         if not original:
             return None
 
         # 2. Salva a nova versão
+        version = self._budget_service.transactions_version()
         updated = self._transaction_repo.save(transaction)
 
-        # 3. Recalcula o mês atual
-        self._budget_service.recalculate_budgets(updated.data.month, updated.data.year)
-
-        # 4. Se o mês/ano mudou, recalcula o original também
-        if (
-            original.data.month != updated.data.month
-            or original.data.year != updated.data.year
-        ):
-            self._budget_service.recalculate_budgets(
-                original.data.month, original.data.year
-            )
+        # 3. Aplica a diferença (original -> nova) nos orçamentos afetados
+        self._budget_service.apply_transaction_change(
+            original, updated, base_version=version
+        )
 
         return updated
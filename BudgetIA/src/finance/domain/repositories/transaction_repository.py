@@ -9,6 +9,10 @@ class ITransactionRepository(ABC):
     Define como o domínio interage com a persistência de transações.
     """
 
+    # Agrupamentos suportados por sum_by()
+    GROUP_CATEGORIA = "categoria"
+    GROUP_MES = "mes"
+
     @abstractmethod
     def save(self, transaction: Transaction) -> Transaction:
         """Salva ou atualiza uma transação."""
@@ -35,3 +39,24 @@ class ITransactionRepository(ABC):
     ) -> list[Transaction]:
         """Lista transações, opcionalmente filtradas por mês/ano."""
         pass
+
+    @abstractmethod
+    def totals(
+        self, month: int | None = None, year: int | None = None
+    ) -> dict[str, float]:
+        """Retorna a soma dos valores por tipo (ex: Receita/Despesa) no período."""
+        pass
+
+    @abstractmethod
+    def sum_by(
+        self,
+        group_by: str,
+        tipo: str | None = None,
+        month: int | None = None,
+        year: int | None = None,
+    ) -> dict[str, float]:
+        """
+        Retorna a soma dos valores agrupada por GROUP_CATEGORIA ou GROUP_MES
+        (chave 'AAAA-MM'), com filtros opcionais de tipo e período.
+        """
+        pass
@@ -1,23 +1,50 @@
+from collections.abc import Callable
 from datetime import date
 
 from ..models.budget import Budget
+from ..models.transaction import Transaction
 from ..repositories.budget_repository import IBudgetRepository
 from ..repositories.transaction_repository import ITransactionRepository
 
+# A cada N ajustes incrementais, um recálculo completo confere os totais.
+FULL_RECALC_EVERY = 50
+
 
 class BudgetDomainService:
     """
     Serviço de Domínio para Orçamentos.
     Orquestra a lógica de recálculo baseada em transações.
+
+    Mantém o total gasto por categoria de cada (ano, mês) já calculado, para
+    aplicar alterações de transações como deltas. Os totais só valem para a
+    versão da aba de transações em que foram conferidos: qualquer escrita
+    feita por fora (reload, faxina, importação) força o recálculo completo.
     """
 
     def __init__(
         self,
         budget_repository: IBudgetRepository,
         transaction_repository: ITransactionRepository,
+        transactions_version: Callable[[], int] | None = None,
     ):
         self._budget_repo = budget_repository
         self._transaction_repo = transaction_repository
+        # Revisão da aba de transações (muda a cada escrita ou reload)
+        self._transactions_version = transactions_version or (lambda: 0)
+        # Versão em que os totais abaixo foram conferidos pela última vez
+        self._synced_version: int | None = None
+        # Gasto por categoria de cada (ano, mês) e ajustes desde o recálculo
+        self._spending: dict[tuple[int, int], dict[str, float]] = {}
+        self._deltas_since_recalc: dict[tuple[int, int], int] = {}
+        # (ano, mês) refletido no gasto_atual dos orçamentos
+        self._budget_period: tuple[int, int] | None = None
+
+    def transactions_version(self) -> int:
+        """
+        Versão atual da aba de transações. Quem vai gravar uma transação e
+        depois chamar apply_transaction_change lê a versão antes da escrita.
+        """
+        return self._transactions_version()
 
     def recalculate_budgets(
         self, month: int | None = None, year: int | None = None
@@ -31,27 +58,102 @@ class BudgetDomainService:
             month = month or today.month
             year = year or today.year
 
+        version = self._transactions_version()
+        if version != self._synced_version:
+            self._forget_spending()
+            self._synced_version = version
+
         # 1. Busca todos os orçamentos cadastrados
         budgets = self._budget_repo.list_all()
         if not budgets:
             return 0
 
-        # 2. Busca todas as transações do período
-        transactions = self._transaction_repo.list_all(month=month, year=year)
+        # 2. Total gasto (despesas) por categoria no período, já agregado
+        spending_by_category = self._transaction_repo.sum_by(
+            ITransactionRepository.GROUP_CATEGORIA,
+            tipo="Despesa",
+            month=month,
+            year=year,
+        )
+        self._spending[(year, month)] = dict(spending_by_category)
+        self._deltas_since_recalc[(year, month)] = 0
+
+        # 3. Atualiza cada orçamento
+        return self._show_period(year, month, budgets)
+
+    def apply_transaction_change(
+        self,
+        old: Transaction | None,
+        new: Transaction | None,
+        base_version: int | None = None,
+    ) -> int:
+        """
+        Atualiza o gasto dos orçamentos a partir da diferença entre a versão
+        antiga ('old') e a nova ('new') de uma transação — None para
+        inclusão/remoção. 'base_version' é a transactions_version() lida
+        antes de gravar a transação.
+
+        Os totais do período em memória recebem o delta; sem totais
+        conferidos (outra escrita desde a última conferência, período nunca
+        calculado ou hora da conferência periódica), cai no recálculo
+        completo do período.
+        """
+        deltas: dict[tuple[int, int], dict[str, float]] = {}
+        # A nova versão primeiro: numa troca de mês, o período da
+        # transação original é o último a ser aplicado.
+        for tx, sign in ((new, 1.0), (old, -1.0)):
+            if tx is None or not tx.eh_despesa:
+                continue
+            by_category = deltas.setdefault((tx.data.year, tx.data.month), {})
+            by_category[tx.categoria] = (
+                by_category.get(tx.categoria, 0.0) + sign * tx.valor
+            )
+
+        # Só a nossa escrita aconteceu desde a conferência: os deltas a cobrem
+        if base_version is None or base_version != self._synced_version:
+            self._forget_spending()
+        self._synced_version = self._transactions_version()
+
+        updated_count = 0
+        for (year, month), by_category in deltas.items():
+            period = (year, month)
+            totals = self._spending.get(period)
+            if (
+                totals is None
+                or self._deltas_since_recalc.get(period, 0) >= FULL_RECALC_EVERY
+            ):
+                updated_count += self.recalculate_budgets(month=month, year=year)
+                continue
+
+            self._deltas_since_recalc[period] += 1
+            for categoria, delta in by_category.items():
+                totals[categoria] = totals.get(categoria, 0.0) + delta
 
-        # Filtra apenas despesas
-        expenses = [tx for tx in transactions if tx.eh_despesa]
+            if period != self._budget_period:
+                updated_count += self._show_period(year, month)
+                continue
 
-        # 3. Mapeia total gasto por categoria
-        spending_by_category = {}
-        for tx in expenses:
-            cat = tx.categoria
-            spending_by_category[cat] = spending_by_category.get(cat, 0.0) + tx.valor
+            for categoria, delta in by_category.items():
+                if delta == 0:
+                    continue
+                budget = self._budget_repo.get_by_category(categoria)
+                if budget is None:
+                    continue
+                budget.gasto_atual = totals[categoria]
+                self._budget_repo.save(budget)
+                updated_count += 1
+
+        return updated_count
 
-        # 4. Atualiza cada orçamento
+    def _show_period(
+        self, year: int, month: int, budgets: list[Budget] | None = None
+    ) -> int:
+        """Grava nos orçamentos o gasto já calculado de (ano, mês)."""
+        self._budget_period = (year, month)
+        spending = self._spending[(year, month)]
         updated_count = 0
-        for budget in budgets:
-            new_spending = spending_by_category.get(budget.categoria, 0.0)
+        for budget in self._budget_repo.list_all() if budgets is None else budgets:
+            new_spending = spending.get(budget.categoria, 0.0)
 
             # Só atualiza se o valor mudou (otimização)
             if budget.gasto_atual != new_spending:
@@ -61,6 +163,11 @@ class BudgetDomainService:
 
         return updated_count
 
+    def _forget_spending(self) -> None:
+        self._spending.clear()
+        self._deltas_since_recalc.clear()
+        self._budget_period = None
+
     def add_or_update_budget(
         self,
         categoria: str,
@@ -1,5 +1,4 @@
-import json
-from typing import Any
+import numpy as np
 
 from core.embeddings.embedding_service import EmbeddingService
 from core.logger import get_logger
@@ -9,109 +8,119 @@ from ..repositories.category_repository import ICategoryRepository
 
 logger = get_logger("SemanticCategoryService")
 
+# Similaridade mínima para aceitar a sugestão (evita associações muito loucas)
+MIN_SIMILARITY = 0.35
+
+
+def _normalize_rows(vectors: list[list[float]]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Empilha os vetores numa matriz float32 com linhas de norma 1.
+    Retorna (matriz, máscara das linhas válidas — norma > 0).
+    """
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1)
+    valid = norms > 0
+    matrix[valid] /= norms[valid, None]
+    return matrix, valid
+
 
 class SemanticCategoryService:
     """
     Serviço que utiliza inteligência semântica para sugerir categorias.
+
+    As categorias ficam numa matriz float32 pré-normalizada por tipo
+    (Receita/Despesa): sugerir é um produto matriz-vetor + argmax.
     """
 
     def __init__(
         self,
         embedding_service: EmbeddingService,
         category_repo: ICategoryRepository,
-        cache_service: Any | None = None,
     ):
         self._embedding_service = embedding_service
         self._category_repo = category_repo
-        self._cache = cache_service
-        self._category_vectors: list[tuple[Category, list[float]]] = []
+        # tipo -> (categorias, matriz n x d normalizada)
+        self._category_matrices: dict[str, tuple[list[Category], np.ndarray]] = {}
 
     def refresh_category_map(self):
-        """Atualiza o mapa de vetores das categorias atuais."""
-        categories = self._category_repo.list_all()
-        new_map = []
+        """Atualiza as matrizes de vetores das categorias atuais."""
+        by_type: dict[str, tuple[list[Category], list[list[float]]]] = {}
+        dimension: int | None = None
 
-        for cat in categories:
-            # Texto para embedding: Nome + Tags (se existirem)
-            content = f"{cat.name} {cat.tags or ''}".strip()
+        categories = self._category_repo.list_all()
+        # Texto para embedding: Nome + Tags (se existirem). Um único lote;
+        # o EmbeddingService guarda os vetores no cache persistente.
+        contents = [f"{cat.name} {cat.tags or ''}".strip() for cat in categories]
+        embeddings = self._embedding_service.get_embeddings(contents)
 
-            # Tenta buscar do cache primeiro
-            vec = self._get_cached_vector(content, prefix="cat")
+        for cat, vec in zip(categories, embeddings, strict=True):
             if not vec:
-                logger.info(f"Gerando novo embedding para categoria: {cat.name}")
-                vec = self._embedding_service.get_embedding(content)
-                self._cache_vector(content, vec, prefix="cat")
-
-            if vec:
-                new_map.append((cat, vec))
+                continue
+            dimension = dimension or len(vec)
+            if len(vec) != dimension:
+                logger.warning(f"Embedding de '{cat.name}' com dimensão diferente.")
+                continue
+            cats, vectors = by_type.setdefault(cat.type, ([], []))
+            cats.append(cat)
+            vectors.append(vec)
+
+        matrices = {}
+        for cat_type, (cats, vectors) in by_type.items():
+            matrix, valid = _normalize_rows(vectors)
+            matrices[cat_type] = (
+                [c for c, ok in zip(cats, valid, strict=True) if ok],
+                matrix[valid],
+            )
+        self._category_matrices = matrices
 
-        self._category_vectors = new_map
-        logger.info(
-            f"Mapa semântico atualizado com {len(self._category_vectors)} categorias."
-        )
+        total = sum(len(cats) for cats, _ in matrices.values())
+        logger.info(f"Mapa semântico atualizado com {total} categorias.")
 
     def suggest_category(
         self, description: str, transaction_type: str = "Despesa"
     ) -> Category | None:
         """Sugere a melhor categoria para uma descrição dada."""
-        if not self._category_vectors:
+        return self.suggest_categories([description], transaction_type)[0]
+
+    def suggest_categories(
+        self, descriptions: list[str], transaction_type: str = "Despesa"
+    ) -> list[Category | None]:
+        """
+        Sugere categorias para várias descrições de uma vez (um único
+        produto de matrizes). Retorna uma sugestão (ou None) por descrição.
+        """
+        suggestions: list[Category | None] = [None] * len(descriptions)
+        if not descriptions:
+            return suggestions
+
+        if not self._category_matrices:
             self.refresh_category_map()
 
-        if not self._category_vectors:
-            return None
-
         # Filtra categorias pelo tipo (Receita/Despesa)
-        candidates = [
-            cv for cv in self._category_vectors if cv[0].type == transaction_type
-        ]
-        if not candidates:
-            return None
-
-        # Tenta buscar embedding da descrição no cache (Optimization)
-        target_vec = self._get_cached_vector(description, prefix="desc")
-
-        if not target_vec:
-            logger.debug(f"Cache miss para descrição: '{description}'. Chamando API...")
-            target_vec = self._embedding_service.get_embedding(description)
-            if target_vec:
-                self._cache_vector(description, target_vec, prefix="desc")
-
-        if not target_vec:
-            return None
-
-        # Encontra o melhor match
-        best_cat = None
-        max_sim = -1.0
-
-        for cat, vec in candidates:
-            sim = self._embedding_service.cosine_similarity(target_vec, vec)
-            # Threshold de 0.35 para evitar associações muito loucas
-            if sim > max_sim and sim > 0.35:
-                max_sim = sim
-                best_cat = cat
-
-        if best_cat:
-            logger.debug(
-                f"Match Semântico: '{description}' -> '{best_cat.name}' (Sim: {max_sim:.4f})"
-            )
-
-        return best_cat
-
-    def _get_cached_vector(self, text: str, prefix: str = "cat") -> list[float] | None:
-        if not self._cache:
-            return None
-        try:
-            key = f"emb:{prefix}:{text}"
-            val = self._cache.get(key)
-            return json.loads(val) if val else None
-        except Exception:
-            return None
-
-    def _cache_vector(self, text: str, vector: list[float], prefix: str = "cat"):
-        if not self._cache or not vector:
-            return
-        try:
-            key = f"emb:{prefix}:{text}"
-            self._cache.set(key, json.dumps(vector), ex=86400 * 30)  # 30 dias para descrições
-        except Exception:
-            pass
+        categories, matrix = self._category_matrices.get(transaction_type, ([], None))
+        if not categories:
+            return suggestions
+
+        rows: list[int] = []
+        vectors: list[list[float]] = []
+        embeddings = self._embedding_service.get_embeddings(descriptions)
+        for i, vec in enumerate(embeddings):
+            if len(vec) == matrix.shape[1]:
+                rows.append(i)
+                vectors.append(vec)
+        if not vectors:
+            return suggestions
+
+        targets, valid = _normalize_rows(vectors)
+        scores = targets @ matrix.T
+        best = scores.argmax(axis=1)
+        best_scores = scores[np.arange(len(best)), best]
+
+        for row, idx, sim, ok in zip(rows, best, best_scores, valid, strict=True):
+            if ok and sim > MIN_SIMILARITY:
+                suggestions[row] = categories[idx]
+                logger.debug(
+                    f"Match Semântico: '{descriptions[row]}' -> "
+                    f"'{categories[idx].name}' (Sim: {sim:.4f})"
+                )
+        return suggestions
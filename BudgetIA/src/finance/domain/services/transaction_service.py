@@ -21,14 +21,36 @@ class TransactionDomainService:
         Cria uma transação no sistema. Se 'parcelas' for informado,
         gera a série de transações futuras.
         """
+        transactions = self._build_transactions(data)
+
+        if len(transactions) == 1:
+            # Transação única
+            return self._repository.save(transactions[0])
+
+        self._repository.save_batch(transactions)
+        return transactions
+
+    def add_transactions(self, items: list[dict[str, Any]]) -> list[Transaction]:
+        """
+        Cria várias transações (com parcelas, se houver) numa única
+        gravação em lote no repositório.
+        """
+        transactions: list[Transaction] = []
+        for data in items:
+            transactions.extend(self._build_transactions(data))
+
+        if transactions:
+            self._repository.save_batch(transactions)
+        return transactions
+
+    def _build_transactions(self, data: dict[str, Any]) -> list[Transaction]:
+        """Monta a entidade (ou a série de parcelas) a partir do payload."""
         parcelas = int(data.get("parcelas", 1))
 
         if parcelas <= 1:
-            # Transação única
             tx_data = data.copy()
             tx_data.pop("parcelas", None)
-            tx = Transaction(**tx_data)
-            return self._repository.save(tx)
+            return [Transaction(**tx_data)]
 
         # Gerar Parcelas
         transactions: list[Transaction] = []
@@ -47,23 +69,20 @@ class TransactionDomainService:
             # Ajusta data e descrição
             current_date = base_date + relativedelta(months=+i)
             tx_payload["data"] = current_date
-
-            if parcelas > 1:
-                tx_payload["descricao"] = f"{data['descricao']} ({i + 1}/{parcelas})"
+            tx_payload["descricao"] = f"{data['descricao']} ({i + 1}/{parcelas})"
 
             transactions.append(Transaction(**tx_payload))
 
-        self._repository.save_batch(transactions)
         return transactions
 
     def get_summary(
         self, month: int | None = None, year: int | None = None
     ) -> dict[str, float]:
-        """Calcula resumo financeiro baseado nas entidades do repositório."""
-        transactions = self._repository.list_all(month=month, year=year)
+        """Calcula resumo financeiro a partir dos totais agregados do repositório."""
+        totals = self._repository.totals(month=month, year=year)
 
-        receitas = sum(tx.valor for tx in transactions if not tx.eh_despesa)
-        despesas = sum(tx.valor for tx in transactions if tx.eh_despesa)
+        despesas = sum(v for tipo, v in totals.items() if tipo.lower() == "despesa")
+        receitas = sum(v for tipo, v in totals.items() if tipo.lower() != "despesa")
 
         return {
             "total_receitas": receitas,
@@ -89,19 +108,41 @@ class TransactionDomainService:
         self._repository.save(updated_tx)
         return True
 
-    def get_expenses_by_category(self, top_n: int = 5) -> dict[str, float]:
+    def get_expenses_by_category(
+        self, top_n: int = 5, month: int | None = None, year: int | None = None
+    ) -> dict[str, float]:
         """Retorna as top N categorias de despesa."""
-        transactions = self._repository.list_all()
-        expenses = [tx for tx in transactions if tx.eh_despesa]
-
-        sums: dict[str, float] = {}
-        for tx in expenses:
-            sums[tx.categoria] = sums.get(tx.categoria, 0.0) + tx.valor
+        sums = self._repository.sum_by(
+            ITransactionRepository.GROUP_CATEGORIA,
+            tipo="Despesa",
+            month=month,
+            year=year,
+        )
 
         # Ordena por valor e pega os top N
         sorted_sums = sorted(sums.items(), key=lambda item: item[1], reverse=True)
         return dict(sorted_sums[:top_n])
 
+    def get_monthly_summary(
+        self, year: int | None = None
+    ) -> dict[str, dict[str, float]]:
+        """Resumo (receitas, despesas, saldo) por mês, chaveado por 'AAAA-MM'."""
+        totais = self._repository.sum_by(ITransactionRepository.GROUP_MES, year=year)
+        despesas = self._repository.sum_by(
+            ITransactionRepository.GROUP_MES, tipo="Despesa", year=year
+        )
+
+        monthly: dict[str, dict[str, float]] = {}
+        for periodo, total in totais.items():
+            despesa = despesas.get(periodo, 0.0)
+            receita = total - despesa
+            monthly[periodo] = {
+                "total_receitas": receita,
+                "total_despesas": despesa,
+                "saldo": receita - despesa,
+            }
+        return monthly
+
     def update_category_names(self, old_name: str, new_name: str) -> int:
         """
         Atualiza em cascata o nome de uma categoria em todas as transações.
@@ -1,10 +1,14 @@
 # src/finance/factory.py
 import importlib.util
+import os
 import sys
+import threading
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+import config
 from config import LAYOUT_PLANILHA
+from core.embeddings.embedding_cache import EmbeddingCache
 from core.embeddings.embedding_service import EmbeddingService
 from core.logger import get_logger
 
@@ -47,6 +51,9 @@ from finance.application.use_cases.generate_proactive_insights_use_case import (
 from finance.application.use_cases.get_expenses_by_category_use_case import (
     GetExpensesByCategoryUseCase,
 )  # noqa: E402
+from finance.application.use_cases.get_monthly_summary_use_case import (
+    GetMonthlySummaryUseCase,
+)  # noqa: E402
 from finance.application.use_cases.get_profile import GetProfileUseCase  # noqa: E402
 from finance.application.use_cases.get_summary_use_case import (
     GetSummaryUseCase,  # noqa: E402
@@ -114,9 +121,64 @@ from finance.planilha_manager import PlanilhaManager  # noqa: E402
 from finance.strategies.base_strategy import BaseMappingStrategy  # noqa: E402
 from finance.strategies.default_strategy import DefaultStrategy  # noqa: E402
 from infrastructure.caching.redis_cache_service import RedisCacheService  # noqa: E402
+from infrastructure.caching.tiered_cache_service import (  # noqa: E402
+    TieredCacheService,
+)
 
 logger = get_logger("FinanceFactory")
 
+# Cache de DataFrames compartilhado pelo processo: uma conexão Redis e um
+# único L1 em memória para todos os managers.
+_cache_service: TieredCacheService | None = None
+_cache_service_lock = threading.Lock()
+# Cache de embeddings (SQLite local + Redis) compartilhado pelo processo.
+_embedding_cache: EmbeddingCache | None = None
+# Serviço de embeddings compartilhado (clientes HTTP de vida longa).
+_embedding_service: EmbeddingService | None = None
+
+
+def get_cache_service() -> TieredCacheService:
+    """Retorna (criando na primeira chamada) o cache compartilhado."""
+    global _cache_service
+    with _cache_service_lock:
+        if _cache_service is None:
+            _cache_service = TieredCacheService(RedisCacheService())
+        return _cache_service
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Retorna (criando na primeira chamada) o cache de embeddings."""
+    global _embedding_cache
+    db_path = os.path.join(config.DATA_DIR, "embeddings.sqlite")
+    redis_cache = get_cache_service().l2
+    with _cache_service_lock:
+        if _embedding_cache is None or _embedding_cache.db_path != db_path:
+            _embedding_cache = EmbeddingCache(db_path, redis_cache=redis_cache)
+        return _embedding_cache
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Retorna o EmbeddingService compartilhado, ligado ao cache atual."""
+    global _embedding_service
+    cache = get_embedding_cache()
+    with _cache_service_lock:
+        if _embedding_service is None or _embedding_service.cache is not cache:
+            _embedding_service = EmbeddingService(cache=cache)
+        return _embedding_service
+
+
+def close_cache_service() -> None:
+    """Fecha os caches compartilhados (shutdown do processo)."""
+    global _cache_service, _embedding_cache, _embedding_service
+    with _cache_service_lock:
+        cache_service, _cache_service = _cache_service, None
+        embedding_cache, _embedding_cache = _embedding_cache, None
+        _embedding_service = None
+    if embedding_cache is not None:
+        embedding_cache.close()
+    if cache_service is not None:
+        cache_service.close()
+
 
 def _load_strategy_from_file(
     strategy_path: Path, module_name: str
@@ -161,7 +223,7 @@ class FinancialSystemFactory:
         logger.debug(f"Criando sistema para usuário '{config_service.username}'")
 
         # 1. Cache Service
-        cache_service = RedisCacheService()
+        cache_service = get_cache_service()
         cache_key = f"dfs:{config_service.username}"
 
         # 2. Estratégia de Mapeamento
@@ -198,6 +260,9 @@ class FinancialSystemFactory:
         budget_domain_service = BudgetDomainService(
             budget_repository=new_budget_repo,
             transaction_repository=new_transaction_repo,
+            transactions_version=lambda: context.sheet_revision(
+                config.NomesAbas.TRANSACOES
+            ),
         )
 
         new_category_repo = ExcelCategoryRepository(context=context)
@@ -209,11 +274,10 @@ class FinancialSystemFactory:
         new_goal_repo = ExcelGoalRepository(context=context)
 
         # --- NOVO: SERVIÇOS DE INTELIGÊNCIA ---
-        embedding_service = EmbeddingService()
+        embedding_service = get_embedding_service()
         semantic_category_service = SemanticCategoryService(
             embedding_service=embedding_service,
             category_repo=new_category_repo,
-            cache_service=cache_service,
         )
 
         # 5. Use Cases
@@ -257,6 +321,9 @@ class FinancialSystemFactory:
         get_expenses_by_category_use_case = GetExpensesByCategoryUseCase(
             transaction_service=transaction_domain_service
         )
+        get_monthly_summary_use_case = GetMonthlySummaryUseCase(
+            transaction_service=transaction_domain_service
+        )
         delete_budget_use_case = DeleteBudgetUseCase(
             repository=new_budget_repo, budget_service=budget_domain_service
         )
@@ -337,6 +404,7 @@ class FinancialSystemFactory:
             delete_debt_use_case=delete_debt_use_case,
             get_summary_use_case=get_summary_use_case,
             get_expenses_by_category_use_case=get_expenses_by_category_use_case,
+            get_monthly_summary_use_case=get_monthly_summary_use_case,
             delete_budget_use_case=delete_budget_use_case,
             update_budget_use_case=update_budget_use_case,
             sanitize_transactions_use_case=sanitize_transactions_use_case,
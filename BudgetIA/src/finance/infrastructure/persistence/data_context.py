@@ -1,5 +1,6 @@
 # src/finance/repositories/data_context.py
 
+import threading
 import time
 
 import pandas as pd
@@ -8,10 +9,21 @@ import config
 from core.logger import get_logger
 from finance.storage.base_storage_handler import BaseStorageHandler
 from finance.strategies.base_strategy import BaseMappingStrategy
-from infrastructure.caching.redis_cache_service import RedisCacheService
+from infrastructure.caching.tiered_cache_service import TieredCacheService
 
 logger = get_logger("DataContext")
 
+# Copy-on-Write (padrão a partir do pandas 3.0): DataFrames derivados
+# compartilham os buffers do original e só copiam a coluna no momento
+# em que alguém escreve nela. Permite que get_dataframe() devolva um
+# snapshot barato em vez de uma cópia profunda a cada leitura.
+pd.set_option("mode.copy_on_write", True)
+
+# Poll (em background) do timestamp de backends remotos após um save.
+# O Drive/GSheets leva alguns instantes para refletir a escrita nos metadados.
+VERSION_POLL_ATTEMPTS = 5
+VERSION_POLL_INTERVAL_SECONDS = 0.5
+
 
 class FinancialDataContext:
     """
@@ -24,7 +36,7 @@ class FinancialDataContext:
         self,
         storage_handler: BaseStorageHandler,
         strategy: BaseMappingStrategy,
-        cache_service: RedisCacheService,
+        cache_service: TieredCacheService,
         cache_key: str,
     ) -> None:
         """
@@ -46,8 +58,29 @@ class FinancialDataContext:
 
         self.is_cache_hit = False
         self.data: dict[str, pd.DataFrame] = {}
+        # Abas alteradas via update_dataframe desde o último save/reload.
+        self._dirty_sheets: set[str] = set()
+        # Linhas novas ainda não persistidas, por aba (gravadas via append).
+        self._pending_appends: dict[str, list[pd.DataFrame]] = {}
+        # Revisão monotônica dos dados em memória (incrementa a cada escrita).
+        # Carimba o que vai para o cache em background: um snapshot só é
+        # gravado se ainda for da revisão atual (checagem e escrita atômicas).
+        self.revision = 0
+        self._revision_lock = threading.Lock()
+        # O cliente do storage (gspread/Drive) não é thread-safe: o poll em
+        # background só o usa com este lock, como o save e o reload.
+        self._storage_lock = threading.RLock()
+        # Revisão da última escrita em cada aba (para caches derivados).
+        self._sheet_revisions: dict[str, int] = {}
+        # Abas cujo conteúdo em memória ainda não foi gravado no cache.
+        self._cache_stale: set[str] = set()
+        self._source_timestamp: str | None = None
         self.is_new_file = self._load_data()
 
+        # Arquivo novo (ou com abas faltando): tudo precisa ir para o storage.
+        if self.is_new_file:
+            self._dirty_sheets = set(self.data.keys())
+
     def _load_data(self) -> bool:
         """
         Usa o handler e a estratégia para carregar os dados.
@@ -55,6 +88,7 @@ class FinancialDataContext:
         start_load = time.time()
         cached_data, cached_timestamp = self.cache.get_entry(self.cache_key)
         source_timestamp = self.storage.get_source_modified_time()
+        self._source_timestamp = source_timestamp
 
         # --- 3. VALIDAÇÃO MAIS RIGOROSA DE CACHE ---
         is_valid_cache = False
@@ -77,6 +111,7 @@ class FinancialDataContext:
             )
             self.data = cached_data
             self.is_cache_hit = True
+            self._cache_stale.clear()
             return False
 
         if cached_data is not None:
@@ -93,9 +128,11 @@ class FinancialDataContext:
         self.data = dataframes
 
         self.is_cache_hit = False
+        self._cache_stale = set(self.data)
         if not is_new_file:
             final_source_timestamp = self.storage.get_source_modified_time()
-            self.cache.set_entry(self.cache_key, self.data, final_source_timestamp)
+            self._source_timestamp = final_source_timestamp
+            self._write_cache(self.data, final_source_timestamp, set(self.data))
 
         logger.info(
             f"⏱️ Contexto carregado em {time.time() - start_load:.2f}s (Cache Hit: {self.is_cache_hit})"
@@ -105,10 +142,15 @@ class FinancialDataContext:
     def get_dataframe(self, sheet_name: str) -> pd.DataFrame:
         """
         Obtém um DataFrame do contexto pelo nome padrão (interno).
+
+        Retorna um snapshot Copy-on-Write: leitores compartilham os buffers
+        do contexto sem custo de cópia, e quem altera o snapshot paga só
+        pela(s) coluna(s) alterada(s), sem afetar o contexto. Para persistir
+        a alteração, devolva o DataFrame via update_dataframe().
         """
         if sheet_name not in self.data:
             raise ValueError(f"Aba '{sheet_name}' não encontrada no contexto.")
-        return self.data[sheet_name].copy()
+        return self.data[sheet_name].copy(deep=False)
 
     def update_dataframe(self, sheet_name: str, new_df: pd.DataFrame) -> None:
         """
@@ -118,28 +160,222 @@ class FinancialDataContext:
             raise ValueError(f"Aba '{sheet_name}' não pode ser atualizada.")
 
         self.data[sheet_name] = new_df
+        self._dirty_sheets.add(sheet_name)
+        # A aba inteira será regravada: os appends pendentes já estão nela.
+        self._pending_appends.pop(sheet_name, None)
+        self._bump_revision(sheet_name)
+
+    def append_rows(self, sheet_name: str, rows: pd.DataFrame) -> None:
+        """
+        Acrescenta linhas novas ao final de uma aba. No save, essas linhas
+        são gravadas via 'storage.append_rows' (O(1) de I/O) em vez de
+        regravar a aba inteira, se o backend suportar.
+        """
+        if sheet_name not in self.data:
+            raise ValueError(f"Aba '{sheet_name}' não pode ser atualizada.")
+        if rows.empty:
+            return
+
+        self.data[sheet_name] = pd.concat(
+            [self.data[sheet_name], rows], ignore_index=True
+        )
+        if sheet_name not in self._dirty_sheets:
+            self._pending_appends.setdefault(sheet_name, []).append(rows)
+        self._bump_revision(sheet_name)
+
+    def _bump_revision(self, sheet_name: str) -> None:
+        with self._revision_lock:
+            self.revision += 1
+            self._sheet_revisions[sheet_name] = self.revision
+            self._cache_stale.add(sheet_name)
+
+    def _write_cache(
+        self,
+        data: dict[str, pd.DataFrame],
+        timestamp: str | None,
+        sheets: set[str],
+        revision: int | None = None,
+    ) -> bool:
+        """
+        Grava no cache as abas 'sheets' (as demais já estão lá). Com
+        'revision', só grava se os dados ainda forem dessa revisão.
+        """
+        with self._revision_lock:
+            if revision is not None and revision != self.revision:
+                return False
+            self._source_timestamp = timestamp
+            if not self.cache.set_entry(self.cache_key, data, timestamp, sheets=sheets):
+                return False
+            self._cache_stale -= sheets
+            return True
+
+    def sheet_revision(self, sheet_name: str) -> int:
+        """
+        Revisão da última escrita (ou reload) na aba. Permite que caches
+        derivados de uma aba se invalidem só quando ela muda.
+        """
+        return self._sheet_revisions.get(sheet_name, 0)
+
+    @property
+    def dirty_sheets(self) -> set[str]:
+        """Abas alteradas em memória e ainda não persistidas."""
+        return set(self._dirty_sheets)
+
+    @property
+    def has_pending_changes(self) -> bool:
+        """Indica se há alterações em memória ainda não persistidas."""
+        return bool(self._dirty_sheets or self._pending_appends)
+
+    def estimated_bytes(self) -> int:
+        """Memória estimada ocupada pelas abas carregadas."""
+        return int(sum(df.memory_usage(deep=True).sum() for df in self.data.values()))
+
+    def close(self) -> None:
+        """
+        Finaliza o contexto persistindo alterações pendentes. O cache é
+        compartilhado pelo processo e não é fechado aqui.
+        """
+        if self.has_pending_changes:
+            logger.info("Salvando alterações pendentes antes de fechar o contexto.")
+            self.save()
+
+    def reload(self) -> None:
+        """
+        Recarrega todas as abas direto do storage, descartando
+        alterações em memória que ainda não foram salvas.
+        """
+        with self._storage_lock:
+            dataframes, _ = self.storage.load_sheets(self.layout_config, self.strategy)
+        with self._revision_lock:
+            self.data = dataframes
+            self._dirty_sheets.clear()
+            self._pending_appends.clear()
+            self.revision += 1
+            self._sheet_revisions = dict.fromkeys(self.data, self.revision)
+            self._cache_stale = set(self.data)
 
     def save(self, add_intelligence: bool = False) -> None:
         """
-        Salva TODOS os DataFrames em memória de volta no
-        arquivo de origem (Excel), usando o handler.
+        Salva as abas alteradas (dirty) de volta no arquivo de origem,
+        usando o handler. Linhas novas vão por append; abas não tocadas
+        desde o último save são ignoradas; 'add_intelligence' força a
+        regravação completa.
         """
+        if (
+            not self._dirty_sheets
+            and not self._pending_appends
+            and not add_intelligence
+        ):
+            logger.info(
+                "Nenhuma aba alterada desde o último salvamento. Nada a salvar."
+            )
+            return
+
         start_save = time.time()
-        # 1. Salva no GDrive/Excel (lento)
-        logger.info("Salvando no armazenamento persistente (StorageHandler)...")
-        self.storage.save_sheets(self.data, self.strategy, add_intelligence)
+        with self._storage_lock:
+            self._save_locked(add_intelligence)
+        logger.info(f"⏱️ Contexto salvo em {time.time() - start_save:.2f}s")
 
-        try:
-            # Espera 1s para garantir que o GDrive atualize seus metadados
-            time.sleep(1)
-        except Exception:
-            pass  # (Não é crítico se o sleep falhar)
+    def _save_locked(self, add_intelligence: bool) -> None:
+        # 1. Linhas novas: append direto no storage (sem regravar a aba)
+        if not add_intelligence:
+            self._flush_pending_appends()
+        self._pending_appends.clear()
+
+        # 2. Abas alteradas: regrava no GDrive/Excel (lento)
+        if self._dirty_sheets or add_intelligence:
+            dirty_sheets = None if add_intelligence else set(self._dirty_sheets)
+            logger.info(
+                f"Salvando no armazenamento persistente (StorageHandler). Abas: {dirty_sheets or 'todas'}"
+            )
+            saved = self.storage.save_sheets(
+                self.data, self.strategy, add_intelligence, dirty_sheets=dirty_sheets
+            )
+            if not saved:
+                # Mantém as abas sujas (e o cache como estava): o próximo
+                # save tenta gravá-las de novo.
+                logger.error(
+                    f"Falha ao salvar no armazenamento. Abas mantidas como pendentes: {sorted(self._dirty_sheets)}"
+                )
+                return
+        self._dirty_sheets.clear()
 
-        final_source_timestamp = self.storage.get_source_modified_time()
+        # 3. Atualiza o cache com o timestamp pós-escrita (sem bloquear)
+        if self.storage.metadata_is_immediate:
+            final_source_timestamp = self.storage.get_source_modified_time()
+            logger.info(f"Atualizando o cache. Abas: {self._cache_stale or 'nenhuma'}")
+            self._write_cache(self.data, final_source_timestamp, set(self._cache_stale))
+        else:
+            # Backend remoto: o timestamp ainda pode não refletir a escrita.
+            # Invalida já (nenhum worker lê dados velhos com carimbo "válido")
+            # e carimba o cache em background quando a versão remota mudar.
+            self.cache.invalidate(self.cache_key)
+            self._schedule_version_poll(
+                dict(self.data),
+                self.revision,
+                self._source_timestamp,
+                set(self._cache_stale),
+            )
 
-        # 3. Atualiza o cache (rápido)
-        logger.info("Atualizando o cache (CacheService)...")
-        self.cache.set_entry(self.cache_key, self.data, final_source_timestamp)
+        logger.info("Salvamento concluído.")
 
-        logger.info(f"⏱️ Contexto salvo em {time.time() - start_save:.2f}s")
-        logger.info("Salvamento e atualização de cache concluídos.")
+    def _flush_pending_appends(self) -> None:
+        """
+        Grava as linhas pendentes via append. Se o backend não suportar
+        (ou falhar), a aba é marcada como dirty e regravada por inteiro.
+        """
+        for sheet_name, chunks in self._pending_appends.items():
+            if sheet_name in self._dirty_sheets:
+                continue
+            rows = pd.concat(chunks, ignore_index=True)
+            if self.storage.append_rows(sheet_name, rows, self.strategy):
+                logger.info(f"{len(rows)} linha(s) acrescentada(s) em '{sheet_name}'.")
+            else:
+                logger.debug(f"Append indisponível para '{sheet_name}'. Regravando.")
+                self._dirty_sheets.add(sheet_name)
+
+    def _schedule_version_poll(
+        self,
+        snapshot: dict[str, pd.DataFrame],
+        saved_revision: int,
+        previous_timestamp: str | None,
+        stale_sheets: set[str],
+    ) -> None:
+        """Dispara o poll do timestamp remoto em uma thread daemon."""
+        thread = threading.Thread(
+            target=self._poll_source_version,
+            args=(snapshot, saved_revision, previous_timestamp, stale_sheets),
+            name=f"version-poll:{self.cache_key}",
+            daemon=True,
+        )
+        thread.start()
+
+    def _poll_source_version(
+        self,
+        snapshot: dict[str, pd.DataFrame],
+        saved_revision: int,
+        previous_timestamp: str | None,
+        stale_sheets: set[str],
+    ) -> None:
+        """
+        Espera o timestamp remoto sair de 'previous_timestamp' e então
+        carimba o cache com ele. Se outra escrita aconteceu nesse meio
+        tempo (revisão mudou), desiste: o save mais novo cuida do cache.
+        O lock do storage só é segurado na consulta, não nas esperas.
+        """
+        source_timestamp = previous_timestamp
+        for attempt in range(VERSION_POLL_ATTEMPTS):
+            time.sleep(VERSION_POLL_INTERVAL_SECONDS * (2**attempt))
+            if self.revision != saved_revision:
+                return
+            with self._storage_lock:
+                source_timestamp = self.storage.get_source_modified_time()
+            if source_timestamp != previous_timestamp:
+                break
+        else:
+            logger.warning(
+                "Timestamp remoto não mudou após o save. Carimbando cache com o último valor lido."
+            )
+
+        if self._write_cache(snapshot, source_timestamp, stale_sheets, saved_revision):
+            logger.debug(f"Cache carimbado em background (ts={source_timestamp}).")
@@ -1,11 +1,152 @@
+from dataclasses import dataclass
+
+import numpy as np
 import pandas as pd
 
 import config
 from config import ColunasTransacoes
+from core.logger import get_logger
 from finance.domain.models.transaction import Transaction
 from finance.domain.repositories.transaction_repository import ITransactionRepository
 from finance.infrastructure.persistence.data_context import FinancialDataContext
 
+logger = get_logger("TransactionRepository")
+
+
+def _linhas_validas(datas: pd.Series, valores: pd.Series) -> pd.Series:
+    """Linhas que viram transação: data válida e valor numérico não negativo."""
+    return datas.notna() & valores.notna() & (valores >= 0)
+
+
+@dataclass(frozen=True)
+class _ColunasAgregadas:
+    """
+    Colunas da aba de transações já convertidas em arrays NumPy, prontas
+    para agregação. Colunas categóricas ficam como códigos inteiros
+    (pd.factorize) + rótulos, para somar com np.bincount. 'valida' marca
+    as mesmas linhas que '_to_entities' aceita; as demais não entram nas somas.
+    """
+
+    valida: np.ndarray
+    valor: np.ndarray
+    ano: np.ndarray
+    mes: np.ndarray
+    tipo_codes: np.ndarray
+    tipos: np.ndarray
+    categoria_codes: np.ndarray
+    categorias: np.ndarray
+    periodo_codes: np.ndarray
+    periodos: np.ndarray
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "_ColunasAgregadas":
+        datas = pd.to_datetime(df[ColunasTransacoes.DATA], errors="coerce")
+        valor = pd.to_numeric(df[ColunasTransacoes.VALOR], errors="coerce")
+        tipo_codes, tipos = pd.factorize(df[ColunasTransacoes.TIPO].astype(str))
+        categoria_codes, categorias = pd.factorize(
+            df[ColunasTransacoes.CATEGORIA].astype(str)
+        )
+        ano = datas.dt.year.fillna(-1).to_numpy(dtype=int)
+        mes = datas.dt.month.fillna(-1).to_numpy(dtype=int)
+        # Chave AAAAMM inteira; NaT vira código -1 e fica fora das agregações
+        chave = np.where(ano >= 0, ano * 100 + mes, np.nan)
+        periodo_codes, chaves = pd.factorize(chave, sort=True)
+        periodos = np.array([f"{int(k) // 100:04d}-{int(k) % 100:02d}" for k in chaves])
+        return cls(
+            valida=_linhas_validas(datas, valor).to_numpy(dtype=bool),
+            valor=valor.fillna(0.0).to_numpy(dtype=float),
+            ano=ano,
+            mes=mes,
+            tipo_codes=tipo_codes,
+            tipos=np.asarray(tipos),
+            categoria_codes=categoria_codes,
+            categorias=np.asarray(categorias),
+            periodo_codes=periodo_codes,
+            periodos=np.asarray(periodos),
+        )
+
+
+class _IndiceTransacoes:
+    """
+    Índices da aba de transações: ID -> posição da linha, maior ID
+    conhecido e a ordem das linhas por data. Buscas por ID são O(1) e
+    filtros de mês/ano viram uma fatia obtida por busca binária.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        # reindex tolera abas sem alguma das colunas (ficam vazias)
+        df = df.reindex(columns=[ColunasTransacoes.ID, ColunasTransacoes.DATA])
+        ids = pd.to_numeric(df[ColunasTransacoes.ID], errors="coerce").to_numpy(
+            dtype=float
+        )
+        self.posicoes: dict[int, int] = {}
+        # Percorre de trás para frente: IDs duplicados apontam para a 1ª linha
+        for pos in range(len(ids) - 1, -1, -1):
+            if not np.isnan(ids[pos]):
+                self.posicoes[int(ids[pos])] = pos
+        validos = ids[~np.isnan(ids)]
+        self.max_id = max(int(validos.max()), 0) if len(validos) else 0
+
+        datas = pd.to_datetime(df[ColunasTransacoes.DATA], errors="coerce")
+        datas_np = datas.to_numpy(dtype="datetime64[ns]")
+        # Ordenação estável: empates mantêm a ordem da planilha; NaT vai ao fim
+        self.ordem = np.argsort(datas_np, kind="stable")
+        self.datas_ordenadas = datas_np[self.ordem]
+
+    def proximo_id(self) -> int:
+        return self.max_id + 1
+
+    def posicao(self, transaction_id: int) -> int | None:
+        return self.posicoes.get(transaction_id)
+
+    def registrar_novas(self, inicio: int, ids: list[int], datas: pd.Series) -> None:
+        """Inclui linhas acrescentadas ao fim da aba sem reconstruir o índice."""
+        novas_posicoes = np.arange(inicio, inicio + len(ids))
+        for pos, tx_id in zip(novas_posicoes, ids):
+            self.posicoes.setdefault(tx_id, int(pos))
+        self.max_id = max([self.max_id, *ids])
+
+        datas_np = pd.to_datetime(datas).to_numpy(dtype="datetime64[ns]")
+        insercao = np.searchsorted(self.datas_ordenadas, datas_np, side="right")
+        # Insere as novas já ordenadas entre si para manter a estabilidade
+        ordem_novas = np.argsort(datas_np, kind="stable")
+        self.ordem = np.insert(
+            self.ordem, insercao[ordem_novas], novas_posicoes[ordem_novas]
+        )
+        self.datas_ordenadas = np.insert(
+            self.datas_ordenadas, insercao[ordem_novas], datas_np[ordem_novas]
+        )
+
+    def atualizar_data(self, pos: int, data: pd.Timestamp) -> None:
+        """Reposiciona uma linha cuja data mudou no índice ordenado."""
+        atual = np.flatnonzero(self.ordem == pos)
+        self.ordem = np.delete(self.ordem, atual)
+        self.datas_ordenadas = np.delete(self.datas_ordenadas, atual)
+        nova = np.datetime64(pd.Timestamp(data).to_datetime64(), "ns")
+        insercao = np.searchsorted(self.datas_ordenadas, nova, side="right")
+        self.ordem = np.insert(self.ordem, insercao, pos)
+        self.datas_ordenadas = np.insert(self.datas_ordenadas, insercao, nova)
+
+    def posicoes_periodo(self, month: int | None, year: int | None) -> np.ndarray:
+        """Posições (ordenadas por data) das linhas do mês/ano informado."""
+        if year:
+            if month:
+                inicio = np.datetime64(f"{year:04d}-{month:02d}", "M")
+                fim = inicio + np.timedelta64(1, "M")
+            else:
+                inicio = np.datetime64(f"{year:04d}", "Y")
+                fim = inicio + np.timedelta64(1, "Y")
+            limites = np.searchsorted(
+                self.datas_ordenadas,
+                np.array([inicio, fim]).astype("datetime64[ns]"),
+            )
+            return self.ordem[limites[0] : limites[1]]
+
+        # Só o mês (qualquer ano): não há fatia contígua, filtra o índice
+        validas = ~np.isnat(self.datas_ordenadas)
+        meses = self.datas_ordenadas.astype("datetime64[M]").astype(int) % 12 + 1
+        return self.ordem[validas & (meses == month)]
+
 
 class ExcelTransactionRepository(ITransactionRepository):
     """
@@ -16,22 +157,73 @@ class ExcelTransactionRepository(ITransactionRepository):
     def __init__(self, context: FinancialDataContext):
         self._context = context
         self._sheet_name = config.NomesAbas.TRANSACOES
+        # (revisão da aba, colunas) — reconstruído só quando a aba muda
+        self._colunas_cache: tuple[int, _ColunasAgregadas] | None = None
+        # (revisão da aba, índices por ID e por data)
+        self._indice_cache: tuple[int, _IndiceTransacoes] | None = None
 
-    def _to_entity(self, row: pd.Series) -> Transaction:
-        """Converte uma linha do DataFrame para uma Entidade Transaction."""
-        return Transaction(
-            id=int(row[ColunasTransacoes.ID])
-            if pd.notna(row[ColunasTransacoes.ID])
-            else None,
-            data=pd.to_datetime(row[ColunasTransacoes.DATA]).date(),
-            tipo=str(row[ColunasTransacoes.TIPO]),
-            categoria=str(row[ColunasTransacoes.CATEGORIA]),
-            descricao=str(row[ColunasTransacoes.DESCRICAO]),
-            valor=float(row[ColunasTransacoes.VALOR]),
-            status=str(row[ColunasTransacoes.STATUS])
-            if pd.notna(row[ColunasTransacoes.STATUS])
-            else "Concluído",
+    def _to_entities(self, df: pd.DataFrame) -> list[Transaction]:
+        """
+        Converte o DataFrame inteiro em entidades de uma vez, trabalhando por
+        coluna em vez de linha a linha.
+
+        Usa `model_construct` (sem validação por linha): as regras do
+        modelo que dependem da planilha (data válida, valor numérico e não
+        negativo) são conferidas aqui, uma vez por coluna. Linhas que não
+        passam são descartadas com aviso.
+        """
+        if df.empty:
+            return []
+
+        datas = pd.to_datetime(df[ColunasTransacoes.DATA], errors="coerce")
+        valores = pd.to_numeric(df[ColunasTransacoes.VALOR], errors="coerce")
+        invalidas = ~_linhas_validas(datas, valores)
+        if invalidas.any():
+            ids_invalidos = df.loc[invalidas, ColunasTransacoes.ID].tolist()
+            logger.warning(
+                f"{len(ids_invalidos)} transação(ões) ignorada(s) por data ou "
+                f"valor inválido (IDs: {ids_invalidos})."
+            )
+            validas = ~invalidas.to_numpy()
+            df, datas, valores = df[validas], datas[validas], valores[validas]
+
+        ids = pd.to_numeric(df[ColunasTransacoes.ID], errors="coerce").to_numpy(
+            dtype=float
         )
+        status = df[ColunasTransacoes.STATUS]
+        columns = {
+            "id": [None if np.isnan(v) else int(v) for v in ids],
+            "data": datas.dt.date.tolist(),
+            "tipo": df[ColunasTransacoes.TIPO].astype(str).tolist(),
+            "categoria": df[ColunasTransacoes.CATEGORIA].astype(str).tolist(),
+            "descricao": (
+                df[ColunasTransacoes.DESCRICAO].astype(str).str.strip().tolist()
+            ),
+            "valor": valores.astype(float).tolist(),
+            "status": status.where(status.notna(), "Concluído").astype(str).tolist(),
+        }
+        fields = list(columns)
+        return [
+            Transaction.model_construct(**dict(zip(fields, values)))
+            for values in zip(*columns.values())
+        ]
+
+    def _indice(self) -> _IndiceTransacoes:
+        """
+        Retorna os índices da aba. Só são reconstruídos quando a aba muda
+        por fora deste repositório (reload, update_dataframe de terceiros);
+        escritas feitas aqui atualizam o índice incrementalmente.
+        """
+        revision = self._context.sheet_revision(self._sheet_name)
+        if self._indice_cache is None or self._indice_cache[0] != revision:
+            df = self._context.get_dataframe(self._sheet_name)
+            self._indice_cache = (revision, _IndiceTransacoes(df))
+        return self._indice_cache[1]
+
+    def _sincronizar_indice(self, indice: _IndiceTransacoes) -> None:
+        """Associa o índice já atualizado à nova revisão da aba."""
+        revision = self._context.sheet_revision(self._sheet_name)
+        self._indice_cache = (revision, indice)
 
     def _to_row(self, tx: Transaction) -> dict:
         """Converte uma Entidade Transaction para um dicionário de linha do DataFrame."""
@@ -48,73 +240,97 @@ class ExcelTransactionRepository(ITransactionRepository):
     def save(self, transaction: Transaction) -> Transaction:
         """Salva ou atualiza uma transação no DataFrame em memória."""
         df = self._context.get_dataframe(self._sheet_name)
+        indice = self._indice()
 
         if transaction.id is None:
-            # Geração de ID Incremental
-            next_id = 1
-            if not df.empty and ColunasTransacoes.ID in df.columns:
-                next_id = (
-                    pd.to_numeric(df[ColunasTransacoes.ID], errors="coerce")
-                    .fillna(0)
-                    .max()
-                    + 1
-                )
-            transaction.id = int(next_id)
-
-            # Adiciona nova linha
-            new_row_dict = self._to_row(transaction)
-            # Garantir que todas as colunas do layout estejam presentes para evitar erros de concat
-            new_row = pd.DataFrame([new_row_dict])
-            df = pd.concat([df, new_row], ignore_index=True)
-        else:
-            # Atualização de registro existente
-            mask = df[ColunasTransacoes.ID] == transaction.id
-            idx = df.index[mask]
-
-            if not idx.empty:
-                row_data = self._to_row(transaction)
-                for col, val in row_data.items():
-                    if col in df.columns:
-                        if isinstance(val, str) and pd.api.types.is_numeric_dtype(
-                            df[col]
-                        ):
-                            df[col] = df[col].astype(object)
-                        df.at[idx[0], col] = val
-            else:
-                raise ValueError(
-                    f"Transação com ID {transaction.id} não encontrada para atualização."
-                )
+            # Geração de ID Incremental (maior ID mantido pelo índice)
+            transaction.id = indice.proximo_id()
+
+            # Adiciona nova linha (append-only: o save grava só esta linha)
+            new_row = pd.DataFrame([self._to_row(transaction)])
+            self._context.append_rows(self._sheet_name, new_row)
+            indice.registrar_novas(
+                len(df), [transaction.id], new_row[ColunasTransacoes.DATA]
+            )
+            self._sincronizar_indice(indice)
+            return transaction
+
+        # Atualização de registro existente
+        pos = indice.posicao(transaction.id)
+        if pos is None:
+            raise ValueError(
+                f"Transação com ID {transaction.id} não encontrada para atualização."
+            )
+
+        label = df.index[pos]
+        data_anterior = df.at[label, ColunasTransacoes.DATA]
+        row_data = self._to_row(transaction)
+        for col, val in row_data.items():
+            if col in df.columns:
+                if isinstance(val, str) and pd.api.types.is_numeric_dtype(df[col]):
+                    df[col] = df[col].astype(object)
+                df.at[label, col] = val
 
         self._context.update_dataframe(self._sheet_name, df)
+        if pd.to_datetime(data_anterior) != row_data[ColunasTransacoes.DATA]:
+            indice.atualizar_data(pos, row_data[ColunasTransacoes.DATA])
+        self._sincronizar_indice(indice)
         return transaction
 
     def save_batch(self, transactions: list[Transaction]) -> int:
-        """Otimiza a gravação de múltiplas transações."""
-        # Para simplificar nesta fase inicial, usamos o save individual
-        # mas mantendo a interface correta.
+        """
+        Grava múltiplas transações de uma vez: as novas recebem IDs em
+        sequência e entram num único DataFrame/append; as que já têm ID
+        seguem pelo caminho de atualização.
+        """
+        novas = [tx for tx in transactions if tx.id is None]
         for tx in transactions:
-            self.save(tx)
+            if tx.id is not None:
+                self.save(tx)
+        if not novas:
+            return len(transactions)
+
+        df = self._context.get_dataframe(self._sheet_name)
+        indice = self._indice()
+        ids = np.arange(indice.proximo_id(), indice.proximo_id() + len(novas))
+        for tx, tx_id in zip(novas, ids.tolist()):
+            tx.id = tx_id
+
+        new_rows = pd.DataFrame(
+            {
+                ColunasTransacoes.ID: ids,
+                ColunasTransacoes.DATA: pd.to_datetime([tx.data for tx in novas]),
+                ColunasTransacoes.TIPO: [tx.tipo for tx in novas],
+                ColunasTransacoes.CATEGORIA: [tx.categoria for tx in novas],
+                ColunasTransacoes.DESCRICAO: [tx.descricao for tx in novas],
+                ColunasTransacoes.VALOR: [tx.valor for tx in novas],
+                ColunasTransacoes.STATUS: [tx.status for tx in novas],
+            }
+        )
+        self._context.append_rows(self._sheet_name, new_rows)
+        indice.registrar_novas(len(df), ids.tolist(), new_rows[ColunasTransacoes.DATA])
+        self._sincronizar_indice(indice)
         return len(transactions)
 
     def get_by_id(self, transaction_id: int) -> Transaction | None:
         """Busca uma transação específica."""
-        df = self._context.get_dataframe(self._sheet_name)
-        if df.empty:
+        pos = self._indice().posicao(transaction_id)
+        if pos is None:
             return None
 
-        row = df[df[ColunasTransacoes.ID] == transaction_id]
-        if row.empty:
-            return None
-        return self._to_entity(row.iloc[0])
+        df = self._context.get_dataframe(self._sheet_name)
+        entities = self._to_entities(df.iloc[pos : pos + 1])
+        return entities[0] if entities else None
 
     def delete(self, transaction_id: int) -> bool:
         """Remove uma transação do DataFrame."""
-        df = self._context.get_dataframe(self._sheet_name)
-        mask = df[ColunasTransacoes.ID] == transaction_id
-        if not mask.any():
+        if self._indice().posicao(transaction_id) is None:
             return False
 
-        df = df[~mask]
+        # Remover desloca as posições seguintes: o índice é reconstruído
+        # na próxima consulta (a revisão da aba muda).
+        df = self._context.get_dataframe(self._sheet_name)
+        df = df[df[ColunasTransacoes.ID] != transaction_id]
         self._context.update_dataframe(self._sheet_name, df)
         return True
 
@@ -125,16 +341,77 @@ class ExcelTransactionRepository(ITransactionRepository):
         df = self._context.get_dataframe(self._sheet_name)
         if df.empty:
             return []
+        if not month and not year:
+            return self._to_entities(df)
 
-        # Filtros de tempo usando as capacidades do pandas
-        temp_df = df.copy()
-        temp_df[ColunasTransacoes.DATA] = pd.to_datetime(
-            temp_df[ColunasTransacoes.DATA]
-        )
+        # Fatia do índice ordenado por data, devolvida na ordem da planilha
+        posicoes = np.sort(self._indice().posicoes_periodo(month, year))
+        return self._to_entities(df.iloc[posicoes])
+
+    def _colunas(self) -> _ColunasAgregadas:
+        """Retorna as colunas agregáveis, reconstruindo-as se a aba mudou."""
+        revision = self._context.sheet_revision(self._sheet_name)
+        if self._colunas_cache is None or self._colunas_cache[0] != revision:
+            df = self._context.get_dataframe(self._sheet_name)
+            self._colunas_cache = (revision, _ColunasAgregadas.from_dataframe(df))
+        return self._colunas_cache[1]
 
+    def _sum_codes(
+        self,
+        codes: np.ndarray,
+        labels: np.ndarray,
+        mask: np.ndarray,
+        valor: np.ndarray,
+    ) -> dict[str, float]:
+        """Soma 'valor' por código com np.bincount, ignorando grupos vazios."""
+        mask = mask & (codes >= 0)
+        selected = codes[mask]
+        sums = np.bincount(selected, weights=valor[mask], minlength=len(labels))
+        counts = np.bincount(selected, minlength=len(labels))
+        return {str(labels[i]): float(sums[i]) for i in np.flatnonzero(counts)}
+
+    def _period_mask(
+        self,
+        cols: _ColunasAgregadas,
+        tipo: str | None,
+        month: int | None,
+        year: int | None,
+    ) -> np.ndarray:
+        mask = cols.valida.copy()
         if year:
-            temp_df = temp_df[temp_df[ColunasTransacoes.DATA].dt.year == year]
+            mask &= cols.ano == year
         if month:
-            temp_df = temp_df[temp_df[ColunasTransacoes.DATA].dt.month == month]
+            mask &= cols.mes == month
+        if tipo:
+            matching = np.flatnonzero(
+                np.char.lower(cols.tipos.astype(str)) == tipo.lower()
+            )
+            mask &= np.isin(cols.tipo_codes, matching)
+        return mask
+
+    def totals(
+        self, month: int | None = None, year: int | None = None
+    ) -> dict[str, float]:
+        """Soma os valores por tipo direto nas colunas, sem criar entidades."""
+        cols = self._colunas()
+        mask = self._period_mask(cols, None, month, year)
+        return self._sum_codes(cols.tipo_codes, cols.tipos, mask, cols.valor)
+
+    def sum_by(
+        self,
+        group_by: str,
+        tipo: str | None = None,
+        month: int | None = None,
+        year: int | None = None,
+    ) -> dict[str, float]:
+        """Soma os valores por categoria ou por mês direto nas colunas."""
+        cols = self._colunas()
+        if group_by == self.GROUP_CATEGORIA:
+            codes, labels = cols.categoria_codes, cols.categorias
+        elif group_by == self.GROUP_MES:
+            codes, labels = cols.periodo_codes, cols.periodos
+        else:
+            raise ValueError(f"Agrupamento '{group_by}' não suportado.")
 
-        return [self._to_entity(row) for _, row in temp_df.iterrows()]
+        mask = self._period_mask(cols, tipo, month, year)
+        return self._sum_codes(codes, labels, mask, cols.valor)
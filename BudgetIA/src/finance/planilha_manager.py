@@ -36,6 +36,9 @@ if TYPE_CHECKING:
     from finance.application.use_cases.get_expenses_by_category_use_case import (
         GetExpensesByCategoryUseCase,
     )
+    from finance.application.use_cases.get_monthly_summary_use_case import (
+        GetMonthlySummaryUseCase,
+    )
     from finance.application.use_cases.get_profile import GetProfileUseCase
     from finance.application.use_cases.get_summary_use_case import (
         GetSummaryUseCase,
@@ -124,6 +127,7 @@ class PlanilhaManager:
         delete_debt_use_case: DeleteDebtUseCase,
         get_summary_use_case: GetSummaryUseCase,
         get_expenses_by_category_use_case: GetExpensesByCategoryUseCase,
+        get_monthly_summary_use_case: GetMonthlySummaryUseCase,
         delete_budget_use_case: DeleteBudgetUseCase,
         update_budget_use_case: UpdateBudgetUseCase,
         sanitize_transactions_use_case: SanitizeTransactionsUseCase,
@@ -164,6 +168,7 @@ class PlanilhaManager:
         self.delete_debt_use_case = delete_debt_use_case
         self.get_summary_use_case = get_summary_use_case
         self.get_expenses_by_category_use_case = get_expenses_by_category_use_case
+        self.get_monthly_summary_use_case = get_monthly_summary_use_case
         self.delete_budget_use_case = delete_budget_use_case
         self.update_budget_use_case = update_budget_use_case
         self.sanitize_transactions_use_case = sanitize_transactions_use_case
@@ -191,10 +196,7 @@ class PlanilhaManager:
         """
         start = time.time()
         logger.debug("Recarregando dados do disco (Atomic Refresh)...")
-        dfs, _ = self._context.storage.load_sheets(
-            self._context.layout_config, self._context.strategy
-        )
-        self._context.data = dfs
+        self._context.reload()
         logger.info(
             f"⏱️ PlanilhaManager.atualizar_dados concluído em {time.time() - start:.2f}s"
         )
@@ -210,6 +212,25 @@ class PlanilhaManager:
         """Alias público de atualizar_dados() para compatibilidade com os roteadores da API."""
         self.atualizar_dados()
 
+    def sheet_revision(self, sheet_name: str) -> int:
+        """Revisão da última escrita na aba (para caches derivados)."""
+        return self._context.sheet_revision(sheet_name)
+
+    def estimated_bytes(self) -> int:
+        """Memória estimada dos dados carregados (para métricas de cache)."""
+        return self._context.estimated_bytes()
+
+    def close(self) -> None:
+        """
+        Finaliza o manager ao sair do cache: grava pendências (sob o lock
+        do arquivo) e libera conexões.
+        """
+        if self._context.has_pending_changes:
+            with self.lock_file():
+                self._context.close()
+        else:
+            self._context.close()
+
     def visualizar_dados(self, sheet_name: str) -> pd.DataFrame:
         return self._context.get_dataframe(sheet_name=sheet_name)  # type: ignore[no-any-return]
 
@@ -275,12 +296,11 @@ class PlanilhaManager:
 
     def adicionar_registros_lote(self, transacoes: list[dict[str, Any]]) -> int:
         """
-        Adiciona múltiplas transações delegando para o serviço de domínio.
+        Adiciona múltiplas transações delegando para o serviço de domínio,
+        numa única gravação em lote.
         """
-        count = 0
-        for tx_data in transacoes:
-            self.transaction_domain_service.add_transaction(tx_data)
-            count += 1
+        self.transaction_domain_service.add_transactions(transacoes)
+        count = len(transacoes)
 
         if count > 0:
             self.recalcular_orcamentos()
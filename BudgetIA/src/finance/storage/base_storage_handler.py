@@ -22,6 +22,11 @@ class BaseStorageHandler(ABC):
     # o que o seu código JÁ FAZ.
     # --- FIM DA CORREÇÃO ---
 
+    # Indica se get_source_modified_time() já reflete uma escrita assim que
+    # save_sheets() retorna (arquivo local). Backends remotos (Drive/GSheets)
+    # atualizam os metadados com atraso e devem sobrescrever com False.
+    metadata_is_immediate: bool = True
+
     @abstractmethod
     def load_sheets(
         self,
@@ -40,13 +45,36 @@ class BaseStorageHandler(ABC):
         dataframes: dict[str, pd.DataFrame],
         strategy: BaseMappingStrategy,
         add_intelligence: bool = False,
-    ) -> None:
+        dirty_sheets: set[str] | None = None,
+    ) -> bool:
         """
-        Salva todos os dataframes, aplicando a estratégia de mapeamento
+        Salva os dataframes, aplicando a estratégia de mapeamento
         para "traduzir de volta" para o formato do usuário.
+
+        'dirty_sheets' lista os nomes internos das abas alteradas. Quando
+        informado, o handler deve gravar apenas essas abas (se o backend
+        permitir). None significa "salvar todas".
+
+        Retorna False se a escrita falhou: o chamador mantém as abas como
+        alteradas para tentar de novo no próximo save.
         """
         pass
 
+    def append_rows(
+        self,
+        sheet_name: str,
+        rows: pd.DataFrame,
+        strategy: BaseMappingStrategy,
+    ) -> bool:
+        """
+        Acrescenta linhas ao final de uma aba existente sem regravá-la.
+        'sheet_name' é o nome interno; 'rows' está no formato interno.
+
+        Retorna False se o backend não suporta append (ou se a aba ainda
+        não existe); nesse caso o chamador deve regravar a aba inteira.
+        """
+        return False
+
     @abstractmethod
     def ping(self) -> tuple[bool, str]:
         """
@@ -0,0 +1,155 @@
+# src/finance/storage/drive_metadata.py
+"""
+Detecção de mudança de arquivos do Google Drive (Planilhas Google e .xlsx).
+
+Uma chamada 'files.get(fields="modifiedTime,version")' devolve o número de
+versão do arquivo, que só muda quando o conteúdo muda. O resultado fica
+memoizado por alguns segundos (por File ID, compartilhado entre handlers),
+então criar vários managers seguidos para o mesmo arquivo custa uma única
+chamada de metadados.
+
+Depois de uma escrita, a versão remota demora a refletir a mudança: o arquivo
+fica "pendente" e cada consulta vai à API até a versão sair da que tínhamos
+antes da escrita (é o que o poll do FinancialDataContext espera ver).
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import config
+from core.logger import get_logger
+
+logger = get_logger("DriveMetadata")
+
+# Campos mínimos para detectar mudança (handlers podem pedir mais)
+VERSION_FIELDS = "modifiedTime,version"
+
+# Teto para esperar a versão mudar após uma escrita (uma escrita que não
+# altera nada nunca muda a versão; depois disso volta a memoizar)
+PENDING_WRITE_MAX_SECONDS = 60.0
+
+
+def version_token(metadata: dict[str, Any]) -> str | None:
+    """
+    Carimbo de versão usado no cache do FinancialDataContext. Prefere o
+    'version' do Drive (monotônico); sem ele, cai para o 'modifiedTime'.
+    """
+    version = metadata.get("version")
+    if version is not None:
+        return f"v{version}"
+    modified_time = metadata.get("modifiedTime")
+    return str(modified_time) if modified_time else None
+
+
+@dataclass
+class _Entry:
+    metadata: dict[str, Any]
+    fetched_at: float
+    # Versão vista antes da última escrita; None = nenhuma escrita pendente
+    written_from: str | None = None
+    written_at: float = 0.0
+
+    def is_pending(self, now: float) -> bool:
+        return (
+            self.written_from is not None
+            and now - self.written_at < PENDING_WRITE_MAX_SECONDS
+        )
+
+
+class DriveMetadataCache:
+    """Memoiza os metadados de arquivos do Drive por 'ttl_seconds'."""
+
+    def __init__(self, ttl_seconds: float | None = None):
+        self.ttl_seconds = (
+            config.DRIVE_METADATA_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        )
+        self._entries: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        file_id: str,
+        fetch: Callable[[], dict[str, Any]],
+        fresh: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Retorna os metadados memoizados ou chama 'fetch()'. Com 'fresh',
+        sempre consulta a API (e atualiza a memória). Erros de 'fetch'
+        sobem para o chamador e não são memoizados.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(file_id)
+            if (
+                not fresh
+                and entry is not None
+                and not entry.is_pending(now)
+                and now - entry.fetched_at < self.ttl_seconds
+            ):
+                self.hits += 1
+                return entry.metadata
+            self.misses += 1
+
+        metadata = fetch()
+        token = version_token(metadata)
+        with self._lock:
+            current = self._entries.get(file_id)
+            entry = _Entry(metadata, now)
+            if current is not None and current.is_pending(now):
+                if token == current.written_from:
+                    entry.written_from = current.written_from
+                    entry.written_at = current.written_at
+                else:
+                    logger.debug(f"Versão remota de '{file_id}' mudou para {token}.")
+            self._entries[file_id] = entry
+        return metadata
+
+    def mark_written(self, file_id: str) -> None:
+        """
+        Registra uma escrita no arquivo: a partir daqui, nada é servido da
+        memória até a versão remota mudar.
+        """
+        with self._lock:
+            entry = self._entries.get(file_id)
+            if entry is None:
+                return
+            if not entry.is_pending(time.monotonic()):
+                entry.written_from = version_token(entry.metadata)
+                entry.written_at = time.monotonic()
+
+    def store(self, file_id: str, metadata: dict[str, Any]) -> None:
+        """
+        Grava metadados já conhecidos (ex.: resposta de um upload), que
+        refletem a escrita: encerra qualquer espera por versão nova.
+        """
+        with self._lock:
+            self._entries[file_id] = _Entry(metadata, time.monotonic())
+
+    def invalidate(self, file_id: str) -> None:
+        with self._lock:
+            self._entries.pop(file_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+# Compartilhado por todos os handlers do processo
+drive_metadata_cache = DriveMetadataCache()
@@ -0,0 +1,139 @@
+# src/finance/storage/excel_reader.py
+"""
+Leitura de arquivos .xlsx com motor plugável.
+
+- "calamine": python-calamine (Rust) via pandas, quando instalado. É o mais
+  rápido: não monta objetos de célula nem lê estilos.
+- "openpyxl": openpyxl em modo 'read_only' com linhas em streaming
+  (values_only), sem o custo de estilos/células do modo padrão.
+
+O motor vem de config.EXCEL_READER_ENGINE (padrão "openpyxl", sempre
+instalado; "auto" escolhe o melhor disponível). Os tipos conhecidos do layout (LAYOUT_DTYPES) são aplicados
+já na leitura.
+"""
+
+import importlib.util
+import os
+from collections.abc import Iterable
+from typing import IO, Any
+
+import pandas as pd
+from openpyxl import load_workbook
+
+import config
+from core.logger import get_logger
+from finance.storage.layout_dtypes import apply_layout_dtypes
+
+logger = get_logger("ExcelReader")
+
+ENGINE_CALAMINE = "calamine"
+ENGINE_OPENPYXL = "openpyxl"
+
+ExcelSource = str | os.PathLike[str] | IO[bytes]
+
+
+def available_engines() -> list[str]:
+    """Motores instalados, do mais rápido para o mais lento."""
+    engines = [ENGINE_OPENPYXL]
+    if importlib.util.find_spec("python_calamine") is not None:
+        engines.insert(0, ENGINE_CALAMINE)
+    return engines
+
+
+def resolve_engine(engine: str | None = None) -> str:
+    """Motor a usar: o pedido (ou o do config) se disponível, senão o melhor."""
+    requested = (engine or config.EXCEL_READER_ENGINE).lower()
+    engines = available_engines()
+    if requested in engines:
+        return requested
+    if requested != "auto":
+        logger.warning(
+            f"Motor de leitura '{requested}' indisponível. Usando '{engines[0]}'."
+        )
+    return engines[0]
+
+
+def read_workbook(
+    source: ExcelSource,
+    sheet_names: Iterable[str] | None = None,
+    engine: str | None = None,
+    dtypes: dict[str, str] | None = None,
+) -> dict[str, pd.DataFrame]:
+    """
+    Lê as abas de um .xlsx (todas, ou só as de 'sheet_names' que existirem)
+    e devolve {nome da aba: DataFrame} com os tipos do layout aplicados.
+    """
+    engine = resolve_engine(engine)
+    wanted = None if sheet_names is None else set(sheet_names)
+    if engine == ENGINE_CALAMINE:
+        sheets = _read_calamine(source, wanted)
+    else:
+        sheets = _read_openpyxl(source, wanted)
+    return {name: apply_layout_dtypes(df, dtypes=dtypes) for name, df in sheets.items()}
+
+
+def _read_calamine(
+    source: ExcelSource, wanted: set[str] | None
+) -> dict[str, pd.DataFrame]:
+    with pd.ExcelFile(source, engine=ENGINE_CALAMINE) as xls:
+        names = [n for n in xls.sheet_names if wanted is None or n in wanted]
+        return {name: xls.parse(name) for name in names}
+
+
+def _read_openpyxl(
+    source: ExcelSource, wanted: set[str] | None
+) -> dict[str, pd.DataFrame]:
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        return {
+            worksheet.title: _rows_to_dataframe(worksheet.iter_rows(values_only=True))
+            for worksheet in workbook.worksheets
+            if wanted is None or worksheet.title in wanted
+        }
+    finally:
+        workbook.close()
+
+
+def _rows_to_dataframe(rows: Iterable[tuple[Any, ...]]) -> pd.DataFrame:
+    """
+    Monta o DataFrame como o pd.read_excel faria: primeira linha não vazia
+    é o cabeçalho (nomes repetidos viram "Valor", "Valor.1", ...) e linhas
+    vazias no fim da aba são descartadas.
+    """
+    iterator = iter(rows)
+    header: list[Any] = []
+    for row in iterator:
+        if any(value is not None for value in row):
+            header = list(row)
+            break
+    while header and header[-1] is None:
+        header.pop()
+    if not header:
+        return pd.DataFrame()
+
+    width = len(header)
+    columns = _dedup_columns(
+        [f"Unnamed: {i}" if name is None else name for i, name in enumerate(header)]
+    )
+    data = []
+    for row in iterator:
+        values = list(row[:width])
+        data.append(values + [None] * (width - len(values)))
+    while data and all(value is None for value in data[-1]):
+        data.pop()
+    return pd.DataFrame(data, columns=columns).infer_objects()
+
+
+def _dedup_columns(names: list[Any]) -> list[Any]:
+    """Renomeia cabeçalhos repetidos com o sufixo ".N", na regra do pandas."""
+    counts: dict[Any, int] = {}
+    columns = []
+    for name in names:
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[name] = count + 1
+            name = f"{name}.{count}"
+            count = counts.get(name, 0)
+        counts[name] = count + 1
+        columns.append(name)
+    return columns
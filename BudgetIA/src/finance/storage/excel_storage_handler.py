@@ -3,7 +3,12 @@ import os
 import time
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.styles import Alignment, Border, Font, Side
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.worksheet import Worksheet
 
 import config  # Importar config para NomesAbas
 from config import (
@@ -16,8 +21,22 @@ from core.logger import get_logger
 
 logger = get_logger("ExcelStorage")
 
+CURRENCY_FORMAT = "R$ #,##0.00"
+PERCENTAGE_FORMAT = "0.0%"
+CURRENCY_COLUMNS = (
+    ColunasTransacoes.VALOR,
+    ColunasOrcamentos.LIMITE,
+    ColunasOrcamentos.GASTO,
+    ColunasDividas.VALOR_ORIGINAL,
+    ColunasDividas.SALDO_DEVEDOR,
+    ColunasDividas.VALOR_PARCELA,
+    ColunasMetas.VALOR_ALVO,
+    ColunasMetas.VALOR_ATUAL,
+)
+
 # --- 1. IMPORTAR A INTERFACE CORRIGIDA ---
 from finance.storage.base_storage_handler import BaseStorageHandler  # noqa: E402
+from finance.storage.excel_reader import read_workbook  # noqa: E402
 from finance.strategies.base_strategy import BaseMappingStrategy  # noqa: E402
 
 
@@ -81,8 +100,15 @@ class ExcelStorageHandler(BaseStorageHandler):  # type: ignore[misc]
         else:
             logger.info(f"Carregando planilha existente de '{self.file_path}'.")
             try:
-                xls = pd.ExcelFile(self.file_path)
-                abas_existentes = xls.sheet_names
+                # Lê de uma vez só as abas do layout (motor plugável, com
+                # os tipos do LAYOUT_DTYPES já aplicados)
+                abas_existentes = read_workbook(
+                    self.file_path,
+                    sheet_names=[
+                        strategy.get_sheet_name_to_save(sheet_name)
+                        for sheet_name in layout_config
+                    ],
+                )
 
                 # 1. Carrega a aba de TRANSAÇÕES usando a estratégia
                 # A estratégia nos diz qual o nome real da aba
@@ -92,9 +118,7 @@ class ExcelStorageHandler(BaseStorageHandler):  # type: ignore[misc]
 
                 df_bruto_transacoes: pd.DataFrame
                 if nome_aba_transacoes in abas_existentes:
-                    df_bruto_transacoes = pd.read_excel(
-                        xls, sheet_name=nome_aba_transacoes
-                    )
+                    df_bruto_transacoes = abas_existentes[nome_aba_transacoes]
                 else:
                     # Se a aba principal falta, trata como arquivo incompleto
                     logger.warning(
@@ -121,10 +145,8 @@ class ExcelStorageHandler(BaseStorageHandler):  # type: ignore[misc]
                     )
 
                     df_bruto_outra: pd.DataFrame
-                    if sheet_name_padrao in abas_existentes:
-                        df_bruto_outra = pd.read_excel(
-                            xls, sheet_name=nome_aba_para_ler
-                        )
+                    if nome_aba_para_ler in abas_existentes:
+                        df_bruto_outra = abas_existentes[nome_aba_para_ler]
                     else:
                         logger.warning(
                             f"Aba do sistema '{sheet_name_padrao}' não encontrada. Criando vazia."
@@ -171,65 +193,174 @@ class ExcelStorageHandler(BaseStorageHandler):  # type: ignore[misc]
 
         return clean_df
 
+    def _prepare_sheet_for_save(
+        self,
+        internal_sheet_name: str,
+        df_interno: pd.DataFrame,
+        strategy: BaseMappingStrategy,
+    ) -> tuple[str, pd.DataFrame]:
+        """
+        Traduz uma aba interna para o formato do usuário e a deixa pronta
+        para ser gravada. Retorna (nome real da aba, DataFrame a salvar).
+        """
+        # 1. Pergunta à estratégia qual o nome "real" da aba para salvar
+        sheet_name_to_save = strategy.get_sheet_name_to_save(internal_sheet_name)
+
+        df_para_salvar: pd.DataFrame
+
+        # 2. Pergunta à estratégia para "traduzir de volta" o DataFrame
+        if internal_sheet_name == config.NomesAbas.TRANSACOES:
+            df_para_salvar = strategy.unmap_transactions(df_interno)
+        else:
+            # Outras abas (Orçamento, Dívidas) são salvas como estão
+            df_para_salvar = strategy.map_other_sheet(df_interno, internal_sheet_name)
+
+        # --- SECURITY: EXCEL FORMULA INJECTION PREVENTION ---
+        df_para_salvar = self._sanitize_dataframe_for_excel(df_para_salvar)
+
+        # 3. Tratar NaT (Not a Time) antes de salvar
+        for col in df_para_salvar.select_dtypes(include=["datetime64[ns]"]).columns:
+            df_para_salvar[col] = (
+                df_para_salvar[col]
+                .astype(object)
+                .where(df_para_salvar[col].notna(), None)
+            )
+
+        return sheet_name_to_save, df_para_salvar
+
     def save_sheets(
         self,
         dataframes: dict[str, pd.DataFrame],
         strategy: BaseMappingStrategy,
         add_intelligence: bool = False,
-    ) -> None:
+        dirty_sheets: set[str] | None = None,
+    ) -> bool:
         """
         Salva os DataFrames em um arquivo Excel, usando a Estratégia
         para "traduzir de volta" os dados para o formato do usuário.
+
+        Se 'dirty_sheets' for informado e o arquivo já existir, apenas
+        essas abas são regravadas (openpyxl em modo append); as demais
+        permanecem intactas. Caso contrário, o arquivo é gerado do zero.
         """
         start_save = time.time()
         try:
-            with pd.ExcelWriter(self.file_path, engine="xlsxwriter") as writer:
-                for internal_sheet_name, df_interno in dataframes.items():
-                    # 1. Pergunta à estratégia qual o nome "real" da aba para salvar
-                    sheet_name_to_save = strategy.get_sheet_name_to_save(
-                        internal_sheet_name
-                    )
+            if dirty_sheets is not None and os.path.exists(self.file_path):
+                self._save_dirty_sheets(dataframes, strategy, dirty_sheets)
+            else:
+                self._save_all_sheets(dataframes, strategy, add_intelligence)
 
-                    df_para_salvar: pd.DataFrame
+            logger.info(f"Planilha salva com sucesso em {self.file_path}")
+            logger.info(f"⏱️ Excel.save_sheets total: {time.time() - start_save:.2f}s")
+            return True
 
-                    # 2. Pergunta à estratégia para "traduzir de volta" o DataFrame
-                    if internal_sheet_name == config.NomesAbas.TRANSACOES:
-                        df_para_salvar = strategy.unmap_transactions(df_interno)
-                    else:
-                        # Outras abas (Orçamento, Dívidas) são salvas como estão
-                        df_para_salvar = strategy.map_other_sheet(
-                            df_interno, internal_sheet_name
-                        )
+        except Exception as e:
+            logger.critical(f"ERRO CRÍTICO ao salvar a planilha: {e}")
+            return False
 
-                    # --- SECURITY: EXCEL FORMULA INJECTION PREVENTION ---
-                    df_para_salvar = self._sanitize_dataframe_for_excel(df_para_salvar)
-
-                    # 3. Tratar NaT (Not a Time) antes de salvar
-                    for col in df_para_salvar.select_dtypes(
-                        include=["datetime64[ns]"]
-                    ).columns:
-                        df_para_salvar[col] = (
-                            df_para_salvar[col]
-                            .astype(object)
-                            .where(df_para_salvar[col].notna(), None)
-                        )
+    def _save_all_sheets(
+        self,
+        dataframes: dict[str, pd.DataFrame],
+        strategy: BaseMappingStrategy,
+        add_intelligence: bool,
+    ) -> None:
+        """Gera o arquivo inteiro com xlsxwriter (arquivo novo ou reformatação)."""
+        with pd.ExcelWriter(self.file_path, engine="xlsxwriter") as writer:
+            for internal_sheet_name, df_interno in dataframes.items():
+                sheet_name_to_save, df_para_salvar = self._prepare_sheet_for_save(
+                    internal_sheet_name, df_interno, strategy
+                )
+
+                # 4. Salva o DataFrame traduzido na aba correta
+                df_para_salvar.to_excel(
+                    writer, sheet_name=sheet_name_to_save, index=False
+                )
 
-                    # 4. Salva o DataFrame traduzido na aba correta
-                    df_para_salvar.to_excel(
-                        writer, sheet_name=sheet_name_to_save, index=False
+                # 5. Aplica formatação (apenas se for nosso layout padrão)
+                if add_intelligence and internal_sheet_name == sheet_name_to_save:
+                    self._apply_formatting(writer, sheet_name_to_save, df_para_salvar)
+
+    def _save_dirty_sheets(
+        self,
+        dataframes: dict[str, pd.DataFrame],
+        strategy: BaseMappingStrategy,
+        dirty_sheets: set[str],
+    ) -> None:
+        """
+        Substitui apenas as abas alteradas no arquivo existente. A troca da
+        aba descarta a formatação gravada por '_apply_formatting'; se a aba
+        antiga a tinha, ela é refeita na aba nova.
+        """
+        abas_para_salvar = [nome for nome in dataframes if nome in dirty_sheets]
+        if not abas_para_salvar:
+            logger.debug("Nenhuma aba alterada para salvar no Excel.")
+            return
+
+        with pd.ExcelWriter(
+            self.file_path, engine="openpyxl", mode="a", if_sheet_exists="replace"
+        ) as writer:
+            for internal_sheet_name in abas_para_salvar:
+                sheet_name_to_save, df_para_salvar = self._prepare_sheet_for_save(
+                    internal_sheet_name, dataframes[internal_sheet_name], strategy
+                )
+                formatted = sheet_name_to_save in writer.book.sheetnames and (
+                    _has_layout_formatting(writer.book[sheet_name_to_save])
+                )
+                df_para_salvar.to_excel(
+                    writer, sheet_name=sheet_name_to_save, index=False
+                )
+                if formatted:
+                    _apply_openpyxl_formatting(
+                        writer.sheets[sheet_name_to_save], df_para_salvar
                     )
 
-                    # 5. Aplica formatação (apenas se for nosso layout padrão)
-                    if add_intelligence and internal_sheet_name == sheet_name_to_save:
-                        self._apply_formatting(
-                            writer, sheet_name_to_save, df_para_salvar
-                        )
+        logger.debug(f"Abas regravadas no Excel: {abas_para_salvar}")
 
-            logger.info(f"Planilha salva com sucesso em {self.file_path}")
-            logger.info(f"⏱️ Excel.save_sheets total: {time.time() - start_save:.2f}s")
+    def append_rows(
+        self,
+        sheet_name: str,
+        rows: pd.DataFrame,
+        strategy: BaseMappingStrategy,
+    ) -> bool:
+        """
+        Acrescenta linhas ao final da aba via openpyxl, sem converter as
+        demais linhas de volta de DataFrame. As colunas são alinhadas pelo
+        cabeçalho existente na aba.
+
+        Um .xlsx não aceita append barato: é um zip de XMLs, então o arquivo
+        é lido e salvo por inteiro. Ainda assim sai mais barato que regravar
+        a aba suja (o fallback); regerar tudo com xlsxwriter é mais rápido,
+        mas reescreve as abas intocadas a partir da memória. Ver
+        tests/performance/bench_excel_append.py.
+        """
+        if not os.path.exists(self.file_path):
+            return False
+
+        start_append = time.time()
+        sheet_name_to_save, df_para_salvar = self._prepare_sheet_for_save(
+            sheet_name, rows, strategy
+        )
+        try:
+            wb = load_workbook(self.file_path)
+            if sheet_name_to_save not in wb.sheetnames:
+                return False
+
+            ws = wb[sheet_name_to_save]
+            header = [cell.value for cell in ws[1]]
+            if not any(header):
+                return False
 
+            for record in df_para_salvar.to_dict("records"):
+                ws.append([_to_cell_value(record.get(col)) for col in header])
+
+            wb.save(self.file_path)
+            logger.info(
+                f"⏱️ Excel.append_rows ({len(df_para_salvar)} linhas): {time.time() - start_append:.2f}s"
+            )
+            return True
         except Exception as e:
-            logger.critical(f"ERRO CRÍTICO ao salvar a planilha: {e}")
+            logger.error(f"Falha no append em '{sheet_name_to_save}': {e}")
+            return False
 
     def _apply_formatting(
         self, writer: pd.ExcelWriter, sheet_name: str, df: pd.DataFrame
@@ -240,21 +371,12 @@ class ExcelStorageHandler(BaseStorageHandler):  # type: ignore[misc]
         header_format = workbook.add_format(
             {"bold": True, "text_wrap": True, "valign": "top", "border": 1}
         )
-        currency_format = workbook.add_format({"num_format": "R$ #,##0.00"})
-        percentage_format = workbook.add_format({"num_format": "0.0%"})
+        currency_format = workbook.add_format({"num_format": CURRENCY_FORMAT})
+        percentage_format = workbook.add_format({"num_format": PERCENTAGE_FORMAT})
 
         for col_num, value in enumerate(df.columns.values):
             worksheet.write(0, col_num, value, header_format)
-            if value in [
-                ColunasTransacoes.VALOR,
-                ColunasOrcamentos.LIMITE,
-                ColunasOrcamentos.GASTO,
-                ColunasDividas.VALOR_ORIGINAL,
-                ColunasDividas.SALDO_DEVEDOR,
-                ColunasDividas.VALOR_PARCELA,
-                ColunasMetas.VALOR_ALVO,
-                ColunasMetas.VALOR_ATUAL,
-            ]:
+            if value in CURRENCY_COLUMNS:
                 worksheet.set_column(col_num, col_num, 15, currency_format)
             elif value == ColunasOrcamentos.PERCENTUAL:
                 worksheet.set_column(col_num, col_num, 15, percentage_format)
@@ -275,3 +397,49 @@ class ExcelStorageHandler(BaseStorageHandler):  # type: ignore[misc]
             return datetime.fromtimestamp(timestamp).isoformat() + "Z"
         except OSError:
             return None
+
+
+def _has_layout_formatting(worksheet: Worksheet) -> bool:
+    """O cabeçalho com quebra de texto só existe após '_apply_formatting'."""
+    return bool(worksheet["A1"].alignment.wrap_text)
+
+
+def _apply_openpyxl_formatting(worksheet: Worksheet, df: pd.DataFrame) -> None:
+    """Mesma formatação do '_apply_formatting' (xlsxwriter), via openpyxl."""
+    thin = Side(style="thin")
+    header_font = Font(bold=True)
+    header_alignment = Alignment(wrap_text=True, vertical="top")
+    header_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+
+    for col_num, value in enumerate(df.columns.values, start=1):
+        header = worksheet.cell(row=1, column=col_num)
+        header.font = header_font
+        header.alignment = header_alignment
+        header.border = header_border
+        worksheet.column_dimensions[get_column_letter(col_num)].width = 15
+
+        if value in CURRENCY_COLUMNS:
+            number_format = CURRENCY_FORMAT
+        elif value == ColunasOrcamentos.PERCENTUAL:
+            number_format = PERCENTAGE_FORMAT
+        else:
+            continue
+        for row in worksheet.iter_rows(
+            min_row=2, min_col=col_num, max_col=col_num, max_row=len(df) + 1
+        ):
+            row[0].number_format = number_format
+
+
+def _to_cell_value(value: object) -> object:
+    """Converte um valor do pandas/NumPy para um tipo aceito pelo openpyxl."""
+    if value is None:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return None if pd.isna(value) else value.to_pydatetime()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return value
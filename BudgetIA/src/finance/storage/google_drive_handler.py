@@ -1,6 +1,12 @@
 # src/finance/storage/google_drive_file_handler.py
+import hashlib
 import io
+import json
+import os
 import re
+import tempfile
+from pathlib import Path
+from typing import Any
 
 import pandas as pd
 from google.oauth2.service_account import Credentials
@@ -16,6 +22,12 @@ from core.logger import get_logger  # noqa: E402
 
 logger = get_logger("GDriveHandler")
 from finance.storage.base_storage_handler import BaseStorageHandler  # noqa: E402
+from finance.storage.drive_metadata import (  # noqa: E402
+    VERSION_FIELDS,
+    drive_metadata_cache,
+    version_token,
+)
+from finance.storage.excel_reader import read_workbook  # noqa: E402
 from finance.strategies.base_strategy import BaseMappingStrategy  # noqa: E402
 
 # Define o caminho para a chave de serviço (reutilizando a mesma)
@@ -26,6 +38,11 @@ CREDENTIALS_PATH = config.GSPREAD_CREDENTIALS_PATH
 # arquivos que não foram criados pelo próprio app.
 SCOPES = ["https://www.googleapis.com/auth/drive"]
 
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Metadados pedidos ao Drive: existência, versão e checksum do conteúdo
+FILE_FIELDS = f"id,name,md5Checksum,{VERSION_FIELDS}"
+
 
 class GoogleDriveFileHandler(BaseStorageHandler):  # type: ignore[misc]
     """
@@ -33,9 +50,14 @@ class GoogleDriveFileHandler(BaseStorageHandler):  # type: ignore[misc]
     armazenados diretamente no Google Drive.
     """
 
-    def __init__(self, file_url: str):
+    metadata_is_immediate = False
+
+    def __init__(self, file_url: str, cache_dir: str | Path | None = None):
         logger.debug(f"__init__ chamado para: '{file_url}'")
         self.file_url = file_url
+        # Cópia local do .xlsx (pasta do usuário): evita baixar de novo
+        # enquanto o md5Checksum/versão no Drive não mudar.
+        self.cache_dir = Path(cache_dir or Path(config.DATA_DIR) / "drive_cache")
         self.file_id = self._extract_file_id(file_url)
         if not self.file_id:
             msg = f"URL do Google Drive inválida. Não foi possível extrair o File ID: {file_url}"
@@ -53,8 +75,9 @@ class GoogleDriveFileHandler(BaseStorageHandler):  # type: ignore[misc]
             self.drive_service = build("drive", "v3", credentials=creds)
             # --- FIM DA CORREÇÃO ---
 
-            # Verifica se o arquivo existe (apenas para definir self._is_new_file)
-            self.drive_service.files().get(fileId=self.file_id, fields="id").execute()
+            # Verifica se o arquivo existe. Os metadados (versão, md5) ficam
+            # memoizados e servem também ao load_sheets e ao cache de dados.
+            self._get_metadata()
             self._is_new_file = False
             logger.debug(f"Serviço do Drive v3 construído. File ID: {self.file_id}")
 
@@ -104,34 +127,17 @@ class GoogleDriveFileHandler(BaseStorageHandler):  # type: ignore[misc]
         strategy: BaseMappingStrategy,
     ) -> tuple[dict[str, pd.DataFrame], bool]:
         """
-        Baixa o arquivo .xlsx do Google Drive em memória, carrega todas
-        as abas, e aplica a Estratégia de Mapeamento.
+        Carrega todas as abas do .xlsx e aplica a Estratégia de Mapeamento.
+        O arquivo só é baixado se a cópia local estiver desatualizada.
         """
-        logger.debug(f"Baixando arquivo: {self.file_id}")
+        logger.debug(f"Carregando arquivo: {self.file_id}")
         dataframes: dict[str, pd.DataFrame] = {}
 
         try:
-            request = self.drive_service.files().get_media(fileId=self.file_id)
-
-            # Cria um buffer de bytes em memória para receber o arquivo
-            file_buffer = io.BytesIO()
-            downloader = MediaIoBaseDownload(file_buffer, request)
-
-            done = False
-            while not done:
-                status, done = downloader.next_chunk()
-                logger.debug(f"Download: {int(status.progress() * 100)}%.")
-
-            logger.debug("Download concluído. Lendo Excel em memória...")
-            file_buffer.seek(0)
-
-            # Lê o arquivo Excel (em memória) com pandas
-            # sheet_name=None garante que TODAS as abas sejam lidas
-            raw_sheets_data = pd.read_excel(
-                file_buffer,
-                sheet_name=None,
-                engine="openpyxl",  # openpyxl precisa estar no pyproject.toml
-            )
+            local_path = self._local_copy()
+
+            # Lê todas as abas (motor plugável, tipos do layout aplicados)
+            raw_sheets_data = read_workbook(local_path)
 
             # --- Lógica de Aplicação da Estratégia (copiada do GSheetsHandler) ---
             # Itera sobre o layout padrão do sistema
@@ -175,10 +181,17 @@ class GoogleDriveFileHandler(BaseStorageHandler):  # type: ignore[misc]
         dataframes: dict[str, pd.DataFrame],
         strategy: BaseMappingStrategy,
         add_intelligence: bool = False,  # (add_intelligence não é aplicado aqui)
-    ) -> None:
+        dirty_sheets: set[str] | None = None,
+    ) -> bool:
         """
         Salva os DataFrames de volta no arquivo .xlsx no Google Drive.
+        O Drive só aceita o arquivo inteiro, então 'dirty_sheets' serve
+        apenas para pular o upload quando nenhuma aba foi alterada.
         """
+        if dirty_sheets is not None and not dirty_sheets:
+            logger.debug("Nenhuma aba alterada. Upload para o Drive ignorado.")
+            return True
+
         logger.debug(f"Preparando para salvar (upload) arquivo: {self.file_id}")
 
         try:
@@ -214,21 +227,34 @@ class GoogleDriveFileHandler(BaseStorageHandler):  # type: ignore[misc]
             # Rebovina o buffer
             output_buffer.seek(0)
 
-            # Prepara a mídia para o upload
+            # Upload resumível em blocos: uma falha de rede refaz só o bloco
             media_body = MediaIoBaseUpload(
                 output_buffer,
-                mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                mimetype=XLSX_MIMETYPE,
+                chunksize=config.DRIVE_UPLOAD_CHUNK_SIZE_MB * 1024 * 1024,
                 resumable=True,
             )
-
-            # Executa a atualização (upload) do arquivo
-            updated_file = (
-                self.drive_service.files()
-                .update(fileId=self.file_id, media_body=media_body, fields="id, name")
-                .execute()
+            request = self.drive_service.files().update(
+                fileId=self.file_id,
+                media_body=media_body,
+                fields=FILE_FIELDS,
+                supportsAllDrives=True,
             )
 
+            drive_metadata_cache.mark_written(self.file_id)
+            updated_file = None
+            while updated_file is None:
+                status, updated_file = request.next_chunk(num_retries=3)
+                if status:
+                    logger.debug(f"Upload: {int(status.progress() * 100)}%.")
+
+            # A resposta já traz a versão/md5 novos: o conteúdo enviado vira
+            # a cópia local e o próximo load não baixa nada.
+            drive_metadata_cache.store(self.file_id, updated_file)
+            self._store_local_copy(output_buffer.getvalue(), updated_file)
+
             logger.info(f"Arquivo '{updated_file.get('name')}' atualizado no Drive!")
+            return True
 
         except Exception as e:
             logger.error(f"Erro ao salvar (upload) o arquivo para o Google Drive: {e}")
@@ -256,17 +282,108 @@ class GoogleDriveFileHandler(BaseStorageHandler):  # type: ignore[misc]
             return False, f"Erro inesperado de conexão com GDrive: {e}"
 
     def get_source_modified_time(self) -> str | None:
-        """Retorna o 'modifiedTime' do Google Drive (chamada leve)."""
+        """
+        Retorna a versão do arquivo no Drive ('modifiedTime,version'),
+        memoizada por alguns segundos (chamada leve).
+        """
         try:
-            # Pede APENAS o campo 'modifiedTime'
-            file_metadata = (
-                self.drive_service.files()
-                .get(fileId=self.file_id, fields="modifiedTime")
-                .execute()
-            )
-
-            # Retorna a string ISO 8601 (ex: "2025-11-17T18:00:00.000Z")
-            return file_metadata.get("modifiedTime")  # type: ignore[no-any-return]
+            return version_token(self._get_metadata())
         except Exception as e:
-            logger.warning(f"Não foi possível obter modifiedTime do GDrive: {e}")
+            logger.warning(f"Não foi possível obter a versão do arquivo no GDrive: {e}")
             return None
+
+    # --- Metadados e cópia local ---
+
+    def _get_metadata(self) -> dict[str, Any]:
+        """Metadados do arquivo (uma chamada 'files.get', memoizada)."""
+        return drive_metadata_cache.get(self.file_id, self._fetch_drive_metadata)
+
+    def _fetch_drive_metadata(self) -> dict[str, Any]:
+        return (  # type: ignore[no-any-return]
+            self.drive_service.files()
+            .get(fileId=self.file_id, fields=FILE_FIELDS, supportsAllDrives=True)
+            .execute()
+        )
+
+    @property
+    def _local_path(self) -> Path:
+        return self.cache_dir / f"{self.file_id}.xlsx"
+
+    @property
+    def _local_meta_path(self) -> Path:
+        return self.cache_dir / f"{self.file_id}.json"
+
+    def _local_copy(self) -> Path:
+        """Caminho da cópia local em dia com o Drive (baixa se preciso)."""
+        metadata = self._get_metadata()
+        if self._local_copy_matches(metadata):
+            logger.info(f"Cópia local de '{self.file_id}' em dia. Download ignorado.")
+            return self._local_path
+
+        logger.debug(f"Baixando arquivo: {self.file_id}")
+        request = self.drive_service.files().get_media(
+            fileId=self.file_id, supportsAllDrives=True
+        )
+        buffer = io.BytesIO()
+        downloader = MediaIoBaseDownload(buffer, request)
+        done = False
+        while not done:
+            status, done = downloader.next_chunk(num_retries=3)
+            logger.debug(f"Download: {int(status.progress() * 100)}%.")
+
+        self._store_local_copy(buffer.getvalue(), metadata)
+        return self._local_path
+
+    def _local_copy_matches(self, metadata: dict[str, Any]) -> bool:
+        """
+        Compara a cópia local com o Drive: pelo md5 do conteúdo quando o
+        Drive informa 'md5Checksum'; senão, pela versão gravada junto.
+        """
+        if not self._local_path.exists():
+            return False
+        remote_md5 = metadata.get("md5Checksum")
+        if remote_md5:
+            return _file_md5(self._local_path) == remote_md5
+        try:
+            with open(self._local_meta_path, encoding="utf-8") as f:
+                local_meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        remote_version = version_token(metadata)
+        return remote_version is not None and local_meta.get("version") == (
+            remote_version
+        )
+
+    def _store_local_copy(self, content: bytes, metadata: dict[str, Any]) -> None:
+        """Grava a cópia local (e sua versão) de forma atômica."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            _atomic_write(self._local_path, content)
+            local_meta = {
+                "version": version_token(metadata),
+                "md5Checksum": metadata.get("md5Checksum"),
+            }
+            _atomic_write(self._local_meta_path, json.dumps(local_meta).encode())
+        except OSError as e:
+            # Sem cópia local o próximo load apenas baixa de novo
+            logger.warning(f"Não foi possível gravar a cópia local do GDrive: {e}")
+
+
+def _file_md5(path: Path) -> str:
+    digest = hashlib.md5()  # noqa: S324 (comparação com o md5Checksum do Drive)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _atomic_write(path: Path, content: bytes) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
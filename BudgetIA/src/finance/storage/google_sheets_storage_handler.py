@@ -1,16 +1,33 @@
 # src/finance/storage/google_sheets_storage_handler.py
 
 
+from collections.abc import Iterable
 from pathlib import Path
 from typing import Any
 
 import gspread  # noqa: E402
 import pandas as pd  # noqa: E402
-from gspread_dataframe import get_as_dataframe, set_with_dataframe  # noqa: E402
+from gspread.urls import DRIVE_FILES_API_V3_URL  # noqa: E402
+from gspread.utils import absolute_range_name  # noqa: E402
 
 import config  # noqa: E402
 from core.logger import get_logger  # noqa: E402
 from finance.storage.base_storage_handler import BaseStorageHandler  # noqa: E402
+from finance.storage.drive_metadata import (  # noqa: E402
+    VERSION_FIELDS,
+    drive_metadata_cache,
+    version_token,
+)
+from finance.storage.layout_dtypes import (  # noqa: E402
+    apply_layout_dtypes,
+    is_dayfirst,
+)
+from finance.storage.sheet_diff import (  # noqa: E402
+    Grid,
+    cell_value,
+    diff_ranges,
+    frame_to_grid,
+)
 
 logger = get_logger("GSheetsHandler")
 from finance.strategies.base_strategy import BaseMappingStrategy  # noqa: E402
@@ -29,8 +46,27 @@ class GoogleSheetsStorageHandler(BaseStorageHandler):  # type: ignore[misc]
     em uma Planilha Google (Google Sheets).
     """
 
+    metadata_is_immediate = False
+
+    # Mesma leitura que o gspread-dataframe faz com evaluate_formulas=True
+    READ_PARAMS = {
+        "valueRenderOption": "UNFORMATTED_VALUE",
+        "dateTimeRenderOption": "FORMATTED_STRING",
+    }
+
     def __init__(self, spreadsheet_url_or_key: str, credentials: Any | None = None):
         logger.debug(f"__init__ chamado para: '{spreadsheet_url_or_key}'")
+        # Conteúdo de cada aba (nome real) na última leitura/escrita: base
+        # do diff que permite salvar só as células alteradas.
+        self._snapshots: dict[str, Grid] = {}
+        # Versão do arquivo no Drive em que cada snapshot foi lido/escrito
+        # (None = desconhecida). O save relê a aba se a versão atual for
+        # outra, em vez de confiar num snapshot velho.
+        self._snapshot_versions: dict[str, str | None] = {}
+        # Abas da planilha (título -> Worksheet), para não listar a cada
+        # save; descartado quando a planilha muda por fora ou algo falha.
+        self._worksheets: dict[str, gspread.Worksheet] | None = None
+        self._dayfirst = True
         try:
             gc = None
             # 1. Tenta usar credenciais de usuário explicitamente fornecidas (OAuth)
@@ -58,6 +94,11 @@ class GoogleSheetsStorageHandler(BaseStorageHandler):  # type: ignore[misc]
             # Abre a planilha (seja por URL ou pela Chave/ID)
             self.spreadsheet = gc.open_by_url(spreadsheet_url_or_key)
             self._is_new_file = False  # Assumimos que não é nova se conseguiu abrir
+            # Ordem dia/mês das datas formatadas (FORMATTED_STRING) da planilha
+            try:
+                self._dayfirst = is_dayfirst(self.spreadsheet.locale)
+            except (AttributeError, KeyError):
+                pass
             logger.debug(f"Planilha '{self.spreadsheet.title}' aberta com sucesso.")
 
         except gspread.exceptions.SpreadsheetNotFound:
@@ -113,27 +154,32 @@ class GoogleSheetsStorageHandler(BaseStorageHandler):  # type: ignore[misc]
     ) -> tuple[dict[str, pd.DataFrame], bool]:
         """
         Carrega as abas da Planilha Google usando a Estratégia de Mapeamento.
+        Todas as abas vêm num único 'values_batch_get' (com retry de cota).
         """
         logger.debug("Iniciando load_sheets")
         dataframes: dict[str, pd.DataFrame] = {}
         is_new_file = False  # Flag para saber se *abas* estão faltando
 
         try:
-            abas_existentes = [ws.title for ws in self.spreadsheet.worksheets()]
-            logger.debug(f"Abas encontradas na planilha: {abas_existentes}")
+            # Pergunta à estratégia qual o nome "real" de cada aba
+            nomes_reais = {
+                sheet_name_padrao: strategy.get_sheet_name_to_save(sheet_name_padrao)
+                for sheet_name_padrao in layout_config
+            }
+            # Versão lida antes dos dados: se mudar no meio, o save relê
+            versao = self._remote_version()
+            grades = self._read_sheets(list(dict.fromkeys(nomes_reais.values())))
+            logger.debug(f"Abas lidas da planilha: {list(grades)}")
 
             # Itera sobre o layout padrão do sistema (Transacoes, Orcamentos...)
-            for sheet_name_padrao, columns_padrao in layout_config.items():
-                # Pergunta à estratégia qual o nome "real" da aba
-                nome_aba_para_ler = strategy.get_sheet_name_to_save(sheet_name_padrao)
-
+            for sheet_name_padrao, nome_aba_para_ler in nomes_reais.items():
                 df_bruto: pd.DataFrame
 
-                if nome_aba_para_ler in abas_existentes:
-                    logger.debug(f"Lendo aba: '{nome_aba_para_ler}'")
-                    worksheet = self.spreadsheet.worksheet(nome_aba_para_ler)
-                    # Usa gspread-dataframe para ler
-                    df_bruto = get_as_dataframe(worksheet, evaluate_formulas=True)
+                if nome_aba_para_ler in grades:
+                    values = grades[nome_aba_para_ler]
+                    self._snapshots[nome_aba_para_ler] = values
+                    self._snapshot_versions[nome_aba_para_ler] = versao
+                    df_bruto = self._grid_to_dataframe(values, self._dayfirst)
                 else:
                     logger.warning(
                         f"Aba '{nome_aba_para_ler}' (padrão: '{sheet_name_padrao}') não encontrada."
@@ -155,36 +201,82 @@ class GoogleSheetsStorageHandler(BaseStorageHandler):  # type: ignore[misc]
             logger.critical(f"ERRO CRÍTICO ao carregar abas do Google Sheets: {e}")
             return {}, False
 
-    def get_source_modified_time(self) -> str | None:
+    def _read_sheets(self, titles: list[str]) -> dict[str, Grid]:
         """
-        Retorna o timestamp 'updated' dos metadados da Planilha Google.
+        Lê várias abas numa única chamada. Se alguma não existir (a API
+        recusa o lote inteiro com 400), lista as abas e relê só as que existem.
         """
-        try:
-            # Em gspread moderno, propriedades são carregadas automaticamente ou via fetch_sheet_metadata
-            # Tentar acessar lastUpdateTime diretamente se disponível
-            # Caso contrário, forçar refresh simula o fetch_properties antigo
-            try:
-                pass
-            except Exception:
-                pass
 
-            # A propriedade 'updated' costumava vir do drive API, gspread mapeia alguns
-            # Vamos tentar 'lastUpdateTime' se existir no modelo
-            if hasattr(self.spreadsheet, "lastUpdateTime"):
-                return str(self.spreadsheet.lastUpdateTime)
+        def batch_get(sheet_titles: list[str]) -> list[dict[str, Any]]:
+            if not sheet_titles:
+                return []
+            response = self._retry_on_quota_error(
+                self.spreadsheet.values_batch_get,
+                [absolute_range_name(title) for title in sheet_titles],
+                params=self.READ_PARAMS,
+            )
+            return response.get("valueRanges", [])  # type: ignore[no-any-return]
 
-            # Se não, tentar via _properties que é o dict cru
-            props = self.spreadsheet._properties
-            if "modifiedTime" in props:
-                return str(props["modifiedTime"])
+        try:
+            value_ranges = batch_get(titles)
+        except gspread.exceptions.APIError as e:
+            if e.code != 400:
+                raise
+            existentes = {
+                ws.title
+                for ws in self._retry_on_quota_error(self.spreadsheet.worksheets)
+            }
+            titles = [title for title in titles if title in existentes]
+            value_ranges = batch_get(titles)
+
+        return {
+            title: value_range.get("values", [])
+            for title, value_range in zip(titles, value_ranges, strict=True)
+        }
+
+    @staticmethod
+    def _grid_to_dataframe(values: Grid, dayfirst: bool = True) -> pd.DataFrame:
+        """Converte a grade lida (cabeçalho + linhas) em DataFrame."""
+        if not values:
+            return pd.DataFrame()
+        header = [str(col) for col in values[0]]
+        width = len(header)
+        rows = [list(row[:width]) + [""] * (width - len(row)) for row in values[1:]]
+        df = pd.DataFrame(rows, columns=header, dtype=object)
+        # Células vazias viram NaN; linhas totalmente vazias são descartadas
+        df = df.replace("", float("nan")).dropna(how="all")
+        df = df.infer_objects().reset_index(drop=True)
+        # Tipos conhecidos do layout (datas, valores, IDs) já na leitura
+        return apply_layout_dtypes(df, dayfirst=dayfirst)
 
-            return None
-        except Exception as e:
-            logger.warning(
-                f"Não foi possível obter modifiedTime (updated) do GSheet: {e}"
+    def get_source_modified_time(self) -> str | None:
+        """
+        Retorna a versão da Planilha Google no Drive ('files.get' com
+        'modifiedTime,version'), memoizada por alguns segundos.
+        """
+        return self._remote_version()
+
+    def _remote_version(self, fresh: bool = False) -> str | None:
+        """Versão atual no Drive ('fresh' ignora a memoização)."""
+        try:
+            metadata = drive_metadata_cache.get(
+                self.resource_id, self._fetch_drive_metadata, fresh=fresh
             )
+            return version_token(metadata)
+        except Exception as e:
+            logger.warning(f"Não foi possível obter a versão do GSheet no Drive: {e}")
             return None
 
+    def _fetch_drive_metadata(self) -> dict[str, Any]:
+        """Metadados de versão pela Drive API v3, com o mesmo cliente do gspread."""
+        response = self._retry_on_quota_error(
+            self.spreadsheet.client.request,
+            "get",
+            f"{DRIVE_FILES_API_V3_URL}/{self.spreadsheet.id}",
+            params={"fields": VERSION_FIELDS, "supportsAllDrives": True},
+        )
+        return response.json()  # type: ignore[no-any-return]
+
     def _retry_on_quota_error(self, func, *args, **kwargs):
         """
         Executa uma função com retry automático para erros de cota (429).
@@ -223,18 +315,34 @@ class GoogleSheetsStorageHandler(BaseStorageHandler):  # type: ignore[misc]
         dataframes: dict[str, pd.DataFrame],
         strategy: BaseMappingStrategy,
         add_intelligence: bool = False,  # (add_intelligence é mais complexo no GSheets)
-    ) -> None:
+        dirty_sheets: set[str] | None = None,
+    ) -> bool:
         """
         Salva os DataFrames de volta na Planilha Google.
+        Se 'dirty_sheets' for informado, as abas não alteradas nem são
+        tocadas (nenhuma chamada de API para elas).
+
+        Cada aba é comparada com o snapshot da última leitura/escrita e só
+        os intervalos alterados são enviados, todos num único
+        'values_batch_update' (sem clear(): a aba nunca fica vazia). Abas
+        cujo snapshot não é da versão atual do arquivo são relidas antes.
         """
         logger.debug("Iniciando save_sheets")
+        written: dict[str, Grid] = {}
         try:
-            # Pega lista de abas (com retry também, pois é chamada de API)
-            abas_existentes = self._retry_on_quota_error(
-                lambda: [ws.title for ws in self.spreadsheet.worksheets()]
+            abas_a_salvar = [
+                name
+                for name in dataframes
+                if dirty_sheets is None or name in dirty_sheets
+            ]
+            versao_base = self._refresh_stale_snapshots(
+                [strategy.get_sheet_name_to_save(name) for name in abas_a_salvar]
             )
+            worksheets = self._worksheet_map()
 
-            for internal_sheet_name, df_interno in dataframes.items():
+            value_ranges: list[dict[str, Any]] = []
+            for internal_sheet_name in abas_a_salvar:
+                df_interno = dataframes[internal_sheet_name]
                 # 1. Pergunta à estratégia o nome real da aba
                 sheet_name_to_save = strategy.get_sheet_name_to_save(
                     internal_sheet_name
@@ -250,61 +358,210 @@ class GoogleSheetsStorageHandler(BaseStorageHandler):  # type: ignore[misc]
                     )
 
                 # 3. Pega ou Cria a aba
-                worksheet: gspread.Worksheet
-                if sheet_name_to_save not in abas_existentes:
+                snapshot = self._snapshots.get(sheet_name_to_save)
+                worksheet = worksheets.get(sheet_name_to_save)
+                if worksheet is None:
                     logger.info(f"Criando aba: '{sheet_name_to_save}'")
                     # Retry na criação
                     worksheet = self._retry_on_quota_error(
                         self.spreadsheet.add_worksheet,
                         title=sheet_name_to_save,
-                        rows=100,
-                        cols=20,
-                    )
-                else:
-                    # Retry na obtenção
-                    worksheet = self._retry_on_quota_error(
-                        self.spreadsheet.worksheet, sheet_name_to_save
+                        rows=max(100, len(df_para_salvar) + 1),
+                        cols=max(20, len(df_para_salvar.columns)),
                     )
+                    worksheets[sheet_name_to_save] = worksheet
+                    snapshot = []
 
                 # --- 4. SAFE SAVE GUARD (Proteção contra Wipe) ---
-                if df_para_salvar.empty or len(df_para_salvar) == 0:
-                    # Verifica se a aba atual TEM dados
-                    # (Tenta pegar A1 para ver se não está vazia, sem gastar muita cota)
-                    try:
-                        cell_a1 = self._retry_on_quota_error(worksheet.acell, "A1")
-                        has_data = cell_a1.value is not None and cell_a1.value != ""
-                    except Exception:
-                        # Se der erro ou não tiver A1, vamos assumir que pode ter dados por segurança
-                        # ou tentar row_count (mas row_count sempre tem valor)
-                        # Vamos tentar get_all_values limitados? Não, gasta cota.
-                        # Melhor: Se A1 está vazio, chance alta de ser vazia.
-                        has_data = False
-
-                    if has_data:
-                        logger.warning(
-                            f"[PROTECTION] ABORTANDO SALVAMENTO na aba '{sheet_name_to_save}'."
-                        )
-                        logger.warning(
-                            "[PROTECTION] MOTIVO: O DataFrame interno está VAZIO, mas a aba destino NÃO está."
-                        )
-                        logger.warning(
-                            "[PROTECTION] Isso previne perda de dados acidental. Verifique se o carregamento falhou."
-                        )
-                        continue  # Pula para a próxima aba, NÃO limpa e não salva essa
-
-                # 5. Limpa e salva os dados usando gspread-dataframe (com retry)
-                def save_operation():
-                    worksheet.clear()
-                    # Converte tipos de dados que dão problema no JSON (como datas)
-                    df_str = df_para_salvar.astype(str).replace("NaT", "")
-                    set_with_dataframe(worksheet, df_str, resize=True)
-
-                self._retry_on_quota_error(save_operation)
-
-                logger.info(f"Aba '{sheet_name_to_save}' salva com sucesso.")
+                if df_para_salvar.empty and self._has_data(worksheet, snapshot):
+                    logger.warning(
+                        f"[PROTECTION] ABORTANDO SALVAMENTO na aba '{sheet_name_to_save}'."
+                    )
+                    logger.warning(
+                        "[PROTECTION] MOTIVO: O DataFrame interno está VAZIO, mas a aba destino NÃO está."
+                    )
+                    logger.warning(
+                        "[PROTECTION] Isso previne perda de dados acidental. Verifique se o carregamento falhou."
+                    )
+                    continue  # Pula para a próxima aba, NÃO limpa e não salva essa
+
+                # 5. Diff contra o snapshot: só as células que mudaram
+                new_grid = frame_to_grid(
+                    df_para_salvar, header=snapshot[0] if snapshot else None
+                )
+                rows_needed = len(new_grid)
+                cols_needed = len(new_grid[0])
+                if (
+                    rows_needed > worksheet.row_count
+                    or cols_needed > worksheet.col_count
+                ):
+                    self._retry_on_quota_error(
+                        worksheet.resize,
+                        rows=max(rows_needed, worksheet.row_count),
+                        cols=max(cols_needed, worksheet.col_count),
+                    )
+
+                value_ranges.extend(
+                    diff_ranges(
+                        sheet_name_to_save,
+                        snapshot,
+                        new_grid,
+                        bounds=(worksheet.row_count, worksheet.col_count),
+                        dayfirst=self._dayfirst,
+                    )
+                )
+                written[sheet_name_to_save] = new_grid
+
+            # 6. Uma única chamada de escrita para todas as abas
+            if value_ranges:
+                drive_metadata_cache.mark_written(self.resource_id)
+                self._retry_on_quota_error(
+                    self.spreadsheet.values_batch_update,
+                    {"valueInputOption": "USER_ENTERED", "data": value_ranges},
+                )
+                self._snapshots.update(written)
+                self._stamp_after_write(versao_base, written)
+            else:
+                self._snapshots.update(written)
+
+            logger.info(
+                f"Abas {sorted(written)} salvas com sucesso "
+                f"({len(value_ranges)} intervalo(s) alterado(s))."
+            )
+            return True
 
         except Exception as e:
+            # O conteúdo remoto pode ter ficado parcial: o próximo save regrava tudo
+            for sheet_name in written:
+                self._snapshots.pop(sheet_name, None)
+                self._snapshot_versions.pop(sheet_name, None)
+            self._worksheets = None
             logger.critical(f"ERRO CRÍTICO ao salvar no Google Sheets: {e}")
+            return False
+
+    def _refresh_stale_snapshots(self, titles: list[str]) -> str | None:
+        """
+        Relê, numa única chamada, as abas cujo snapshot não é da versão
+        atual do arquivo (outra pessoa editou a planilha). Sem snapshot, o
+        diff já regrava a aba inteira. Retorna a versão atual.
+        """
+        versao = self._remote_version(fresh=True)
+        stale = [
+            title
+            for title in dict.fromkeys(titles)
+            if title in self._snapshots
+            and (versao is None or self._snapshot_versions.get(title) != versao)
+        ]
+        if not stale:
+            return versao
+        logger.debug(f"Snapshot de {stale} desatualizado. Relendo antes do diff.")
+        # A planilha mudou por fora: abas podem ter sido criadas/redimensionadas
+        self._worksheets = None
+        grades = self._read_sheets(stale)
+        for title in stale:
+            if title in grades:
+                self._snapshots[title] = grades[title]
+                self._snapshot_versions[title] = versao
+            else:
+                self._snapshots.pop(title, None)
+                self._snapshot_versions.pop(title, None)
+        return versao
+
+    def _stamp_after_write(
+        self, versao_base: str | None, written: Iterable[str]
+    ) -> None:
+        """
+        Uma escrita nossa muda a versão do arquivo: consulta a nova uma vez
+        e carimba com ela as abas escritas e os snapshots que estavam na
+        versão anterior, para o próximo save não reler a planilha. (Uma
+        edição alheia entre a escrita e a consulta passa despercebida até
+        a próxima leitura.)
+        """
+        versao = self._remote_version(fresh=True)
+        if versao is None or versao == versao_base:
+            # O Drive ainda não refletiu a escrita: nenhum snapshot a confirma
+            self._snapshot_versions = dict.fromkeys(self._snapshot_versions)
+            return
+        self._snapshot_versions = {
+            title: versao if versao_base is not None and atual == versao_base else None
+            for title, atual in self._snapshot_versions.items()
+        }
+        self._snapshot_versions.update(dict.fromkeys(written, versao))
+
+    def _worksheet_map(self) -> dict[str, gspread.Worksheet]:
+        """Abas da planilha por título (listadas uma vez e reaproveitadas)."""
+        if self._worksheets is None:
+            # Com retry também, pois é chamada de API
+            self._worksheets = self._retry_on_quota_error(
+                lambda: {ws.title: ws for ws in self.spreadsheet.worksheets()}
+            )
+        return self._worksheets
+
+    def _has_data(self, worksheet: gspread.Worksheet, snapshot: Grid | None) -> bool:
+        """Indica se a aba tem linhas de dados (além do cabeçalho)."""
+        if snapshot is not None:
+            return len(snapshot) > 1
+        # Sem snapshot: olha só a A1 para não gastar cota
+        try:
+            cell_a1 = self._retry_on_quota_error(worksheet.acell, "A1")
+            return cell_a1.value is not None and cell_a1.value != ""
+        except Exception:
+            # Se der erro ou não tiver A1, assume que está vazia
+            return False
+
+    def append_rows(
+        self,
+        sheet_name: str,
+        rows: pd.DataFrame,
+        strategy: BaseMappingStrategy,
+    ) -> bool:
+        """
+        Acrescenta linhas ao final da aba com 'worksheet.append_rows'
+        (uma única chamada de escrita), alinhando pelo cabeçalho existente.
+        """
+        sheet_name_to_save = strategy.get_sheet_name_to_save(sheet_name)
+        df_para_salvar: pd.DataFrame
+        if sheet_name == config.NomesAbas.TRANSACOES:
+            df_para_salvar = strategy.unmap_transactions(rows)
+        else:
+            df_para_salvar = strategy.map_other_sheet(rows, sheet_name)
+
+        try:
+            worksheet = self._worksheet_map().get(sheet_name_to_save)
+            if worksheet is None:
+                return False
+            snapshot = self._snapshots.get(sheet_name_to_save)
+            if snapshot:
+                header = snapshot[0]
+            else:
+                header = self._retry_on_quota_error(worksheet.row_values, 1)
+            if not header:
+                return False
+
+            values = [
+                [cell_value(record.get(col, "")) for col in header]
+                for record in df_para_salvar.to_dict("records")
+            ]
+            # O snapshot só segue válido se era da versão anterior ao append
+            versao_base = self._remote_version(fresh=True)
+            em_dia = bool(snapshot) and (
+                self._snapshot_versions.get(sheet_name_to_save) == versao_base
+            )
+            drive_metadata_cache.mark_written(self.resource_id)
+            self._retry_on_quota_error(
+                worksheet.append_rows, values, value_input_option="USER_ENTERED"
+            )
+            if snapshot:
+                snapshot.extend(values)
+            self._stamp_after_write(versao_base, [sheet_name_to_save] if em_dia else [])
+            logger.info(
+                f"{len(values)} linha(s) acrescentada(s) em '{sheet_name_to_save}'."
+            )
+            return True
+        except Exception as e:
+            self._worksheets = None
+            logger.error(f"Falha no append em '{sheet_name_to_save}': {e}")
+            return False
 
     def ping(self) -> tuple[bool, str]:
         """Verifica se a planilha GSheet está acessível e compartilhada."""
@@ -0,0 +1,91 @@
+# src/finance/storage/layout_dtypes.py
+"""
+Aplica os tipos conhecidos do layout (config.LAYOUT_DTYPES) a um DataFrame
+lido do storage, coluna a coluna e sem derrubar a leitura. Valores que não
+convertem (ex.: "R$ 50" numa coluna de valor) ficam como estão, numa coluna
+'object': virar nulo apagaria a célula no próximo save.
+"""
+
+import numpy as np
+import pandas as pd
+
+import config
+from core.logger import get_logger
+
+logger = get_logger("LayoutDtypes")
+
+# Locales do Google Sheets que exibem o mês antes do dia (ex.: 1/31/2024)
+MONTH_FIRST_LOCALES = frozenset({"en_US", "en_PH", "es_US", "fil_PH"})
+
+
+def is_dayfirst(locale: str | None) -> bool:
+    """Se as datas formatadas no 'locale' vêm com o dia primeiro (pt_BR: sim)."""
+    return locale not in MONTH_FIRST_LOCALES
+
+
+def local_date_formats(dayfirst: bool) -> tuple[str, ...]:
+    """Formatos em que a planilha exibe datas e datas com hora."""
+    date = "%d/%m/%Y" if dayfirst else "%m/%d/%Y"
+    return (date, f"{date} %H:%M:%S", f"{date} %H:%M")
+
+
+def apply_layout_dtypes(
+    df: pd.DataFrame,
+    dtypes: dict[str, str] | None = None,
+    dayfirst: bool = False,
+) -> pd.DataFrame:
+    """
+    Converte as colunas presentes em 'dtypes' (padrão: LAYOUT_DTYPES).
+    'dayfirst' indica a ordem de datas em texto que não estão em ISO.
+    """
+    dtypes = config.LAYOUT_DTYPES if dtypes is None else dtypes
+    for column in df.columns.intersection(list(dtypes)):
+        dtype = dtypes[column]
+        original = df[column]
+        try:
+            converted = _convert(original, dtype, dayfirst)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Coluna '{column}' mantida sem conversão para {dtype}: {e}")
+            continue
+
+        unparsed = converted.isna() & original.notna()
+        if unparsed.any():
+            logger.warning(
+                f"Coluna '{column}': {int(unparsed.sum())} valor(es) fora do tipo "
+                f"{dtype} mantido(s) como estão."
+            )
+            converted = converted.astype(object).where(~unparsed, original)
+        df[column] = converted
+    return df
+
+
+def _convert(series: pd.Series, dtype: str, dayfirst: bool) -> pd.Series:
+    if dtype.startswith("datetime64"):
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+        return _to_datetime(series, dayfirst)
+
+    numbers = pd.to_numeric(series, errors="coerce")
+    if dtype == "Int64":
+        values = numbers.dropna()
+        # Só vira inteiro se não houver casas decimais (senão perderia dados)
+        if np.all(np.mod(values.to_numpy(dtype=float), 1) == 0):
+            return numbers.astype("Int64")
+        return numbers.astype("float64")
+    return numbers.astype(dtype)
+
+
+def _to_datetime(series: pd.Series, dayfirst: bool) -> pd.Series:
+    """
+    ISO primeiro, depois os formatos locais (vetorizados); o que sobrar
+    passa pelo parser genérico, célula a célula, na ordem 'dayfirst'.
+    """
+    parsed = pd.to_datetime(series, errors="coerce", format="ISO8601")
+    for fmt in (*local_date_formats(dayfirst), "mixed"):
+        missing = parsed.isna() & series.notna()
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(
+            series[missing], errors="coerce", format=fmt, dayfirst=dayfirst
+        )
+    return parsed
@@ -0,0 +1,193 @@
+# src/finance/storage/sheet_diff.py
+"""
+Diff entre o conteúdo conhecido de uma aba (snapshot da última leitura ou
+escrita) e o DataFrame a salvar. Gera o mínimo de intervalos de valores
+para um único 'values_batch_update' da API do Google Sheets: células
+alteradas, linhas novas e limpeza das linhas removidas no fim da aba.
+"""
+
+import datetime as dt
+import math
+import re
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from gspread.utils import absolute_range_name, rowcol_to_a1
+
+from finance.storage.layout_dtypes import local_date_formats
+
+# Grade de valores como a API devolve/recebe: cabeçalho + linhas
+Grid = list[list[Any]]
+
+# Células inalteradas entre duas alteradas na mesma linha que ainda valem
+# ser regravadas para juntar os dois trechos num único intervalo.
+MAX_MERGE_GAP = 3
+
+# Filtro barato antes de tentar ler um texto como data (ISO ou local)
+_DATE_LIKE = re.compile(r"^\d{1,4}[-/]\d{1,2}[-/]\d{1,4}(?:[ T]\d|$)")
+
+
+def cell_value(value: Any) -> Any:
+    """Converte um valor do DataFrame para um valor aceito pela API."""
+    if value is None or value is pd.NA or value is pd.NaT:
+        return ""
+    if isinstance(value, float) and math.isnan(value):
+        return ""
+    if isinstance(value, np.generic):
+        value = value.item()
+        if isinstance(value, float) and math.isnan(value):
+            return ""
+    if isinstance(value, dt.datetime):
+        if value.time() == dt.time(0):
+            return value.strftime("%Y-%m-%d")
+        return value.isoformat(sep=" ")
+    if isinstance(value, dt.date):
+        return value.isoformat()
+    if isinstance(value, bool | int | float | str):
+        return value
+    return str(value)
+
+
+def comparable(value: Any, dayfirst: bool = True) -> Any:
+    """
+    Normaliza um valor para comparação: a planilha devolve números como
+    números, mas "100", "100.0" e 100 representam a mesma célula. Datas
+    também: a leitura traz "05/01/2024" (formato do locale, ordem dada por
+    'dayfirst') e a escrita envia "2024-01-05".
+    """
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int | float):
+        return float(value)
+    if isinstance(value, str):
+        text = value.strip()
+        lowered = text.casefold()
+        if lowered in ("true", "false"):
+            return lowered == "true"
+        try:
+            number = float(text)
+        except ValueError:
+            return _parse_date(text, dayfirst) or text
+        return number if math.isfinite(number) else text
+    return value
+
+
+def _parse_date(text: str, dayfirst: bool) -> dt.datetime | None:
+    if _DATE_LIKE.match(text) is None:
+        return None
+    try:
+        return dt.datetime.fromisoformat(text)
+    except ValueError:
+        pass
+    for fmt in local_date_formats(dayfirst):
+        try:
+            return dt.datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def frame_to_grid(df: pd.DataFrame, header: list[Any] | None = None) -> Grid:
+    """
+    Converte o DataFrame em grade (cabeçalho + linhas). Se 'header' (o
+    cabeçalho atual da aba) tiver exatamente as mesmas colunas, mantém a
+    ordem da aba para não reescrever colunas só por estarem em outra posição.
+    """
+    columns = list(df.columns)
+    if header and set(header) == set(columns) and len(header) == len(columns):
+        columns = list(header)
+
+    grid: Grid = [[cell_value(col) for col in columns]]
+    for row in df[columns].itertuples(index=False, name=None):
+        grid.append([cell_value(value) for value in row])
+    return grid
+
+
+def _cell(row: list[Any], col: int) -> Any:
+    return row[col] if col < len(row) else ""
+
+
+def _changed_runs(old: Grid, new: Grid, dayfirst: bool) -> list[tuple[int, int, int]]:
+    """Trechos alterados por linha: (linha, coluna inicial, coluna final)."""
+    runs: list[tuple[int, int, int]] = []
+    for r in range(max(len(old), len(new))):
+        old_row = old[r] if r < len(old) else []
+        new_row = new[r] if r < len(new) else []
+        width = max(len(old_row), len(new_row))
+
+        row_runs: list[list[int]] = []
+        for c in range(width):
+            old_value = comparable(_cell(old_row, c), dayfirst)
+            if old_value == comparable(_cell(new_row, c), dayfirst):
+                continue
+            if row_runs and c - row_runs[-1][1] <= MAX_MERGE_GAP:
+                row_runs[-1][1] = c + 1
+            else:
+                row_runs.append([c, c + 1])
+        runs.extend((r, start, end) for start, end in row_runs)
+    return runs
+
+
+def diff_ranges(
+    sheet_title: str,
+    old: Grid | None,
+    new: Grid,
+    bounds: tuple[int, int] = (0, 0),
+    dayfirst: bool = True,
+) -> list[dict[str, Any]]:
+    """
+    Intervalos ({"range", "values"}) que levam a aba de 'old' para 'new'.
+    'dayfirst' é a ordem das datas formatadas lidas da aba (ver comparable).
+
+    Sem snapshot ('old' None), o conteúdo atual é desconhecido: grava a
+    grade inteira e limpa o resto da aba até 'bounds' (linhas, colunas).
+    """
+    if old is None:
+        rows = max(len(new), bounds[0], 1)
+        cols = max(max((len(row) for row in new), default=0), bounds[1], 1)
+        values = [
+            [_cell(new[r] if r < len(new) else [], c) for c in range(cols)]
+            for r in range(rows)
+        ]
+        return [_value_range(sheet_title, 0, rows, 0, cols, values)]
+
+    # Junta trechos com as mesmas colunas em linhas consecutivas num bloco
+    blocks: list[list[int]] = []  # [linha inicial, linha final, col ini, col fim]
+    open_blocks: dict[tuple[int, int], list[int]] = {}
+    for r, start, end in _changed_runs(old, new, dayfirst):
+        block = open_blocks.get((start, end))
+        if block is not None and block[1] == r:
+            block[1] = r + 1
+            continue
+        block = [r, r + 1, start, end]
+        open_blocks[(start, end)] = block
+        blocks.append(block)
+
+    ranges = []
+    for first_row, last_row, start, end in blocks:
+        values = [
+            [_cell(new[r] if r < len(new) else [], c) for c in range(start, end)]
+            for r in range(first_row, last_row)
+        ]
+        ranges.append(
+            _value_range(sheet_title, first_row, last_row, start, end, values)
+        )
+    return ranges
+
+
+def _value_range(
+    sheet_title: str,
+    first_row: int,
+    last_row: int,
+    first_col: int,
+    last_col: int,
+    values: Grid,
+) -> dict[str, Any]:
+    a1 = (
+        f"{rowcol_to_a1(first_row + 1, first_col + 1)}:"
+        f"{rowcol_to_a1(last_row, last_col)}"
+    )
+    return {"range": absolute_range_name(sheet_title, a1), "values": values}
@@ -1,3 +1,5 @@
+from pathlib import Path
+
 from finance.storage.base_storage_handler import BaseStorageHandler
 from finance.storage.excel_storage_handler import ExcelStorageHandler
 from finance.storage.google_drive_handler import GoogleDriveFileHandler
@@ -46,7 +48,10 @@ class StorageHandlerFactory:
 
     @classmethod
     def create_handler(
-        cls, path: str, credentials: object | None = None
+        cls,
+        path: str,
+        credentials: object | None = None,
+        cache_dir: str | Path | None = None,
     ) -> BaseStorageHandler:
         """
         Cria o handler apropriado baseado no path fornecido.
@@ -54,6 +59,7 @@ class StorageHandlerFactory:
         Args:
             path: Caminho ou URL do arquivo de armazenamento.
             credentials: (Opcional) Credenciais de usuário autenticadas (para GSheets).
+            cache_dir: (Opcional) Pasta da cópia local de arquivos do Drive.
 
         Returns:
             Instância do handler apropriado para o tipo de storage.
@@ -73,7 +79,7 @@ class StorageHandlerFactory:
         if storage_type == StorageType.LOCAL_EXCEL:
             return handler_class(file_path=path)
         elif storage_type == StorageType.GOOGLE_DRIVE_FILE:
-            return handler_class(file_url=path)
+            return handler_class(file_url=path, cache_dir=cache_dir)  # type: ignore[call-arg]
         elif storage_type == StorageType.GOOGLE_SHEETS:
             # Injeta as credenciais se for GSheets
             return handler_class(spreadsheet_url_or_key=path, credentials=credentials)  # type: ignore[call-arg]
@@ -1,7 +1,10 @@
 # Em: src/finance/tool_loader.py
+import functools
 import importlib
 import inspect  # Importa o inspect
 import os
+import threading
+from collections import OrderedDict
 from collections.abc import Callable  # Importa o que precisamos
 from typing import Any
 
@@ -72,6 +75,50 @@ TOOL_TRANSLATIONS = {
 }
 
 
+# Resultados memoizados por ferramenta (combinações de argumentos distintas)
+TOOL_MEMO_MAX_ENTRIES = 32
+
+
+def _memoize_run(tool: BaseTool, sheet_revision: Callable[[str], int]) -> None:
+    """
+    Envolve 'tool.run' com memoização por (argumentos, revisão das abas lidas).
+    Qualquer escrita registrada no FinancialDataContext muda a revisão da
+    aba e invalida o resultado na próxima chamada.
+    """
+    run = tool.run
+    results: OrderedDict[Any, tuple[tuple[int, ...], str]] = OrderedDict()
+    lock = threading.Lock()
+
+    @functools.wraps(run)
+    def memoized_run(*args: Any, **kwargs: Any) -> str:
+        try:
+            key = (args, frozenset(kwargs.items()))
+            hash(key)
+        except TypeError:
+            # Argumentos não hasheáveis (listas, dicts): sem memoização
+            return run(*args, **kwargs)
+
+        revisions = tuple(
+            sheet_revision(sheet) for sheet in tool.sheets_read(*args, **kwargs)
+        )
+        with lock:
+            cached = results.get(key)
+            if cached is not None and cached[0] == revisions:
+                results.move_to_end(key)
+                logger.debug(f"Resultado memoizado de '{tool.name}' reutilizado.")
+                return cached[1]
+
+        result = run(*args, **kwargs)
+        with lock:
+            results[key] = (revisions, result)
+            results.move_to_end(key)
+            while len(results) > TOOL_MEMO_MAX_ENTRIES:
+                results.popitem(last=False)
+        return result
+
+    tool.run = memoized_run  # type: ignore[method-assign]
+
+
 def load_all_financial_tools(
     manager: PlanilhaManager,
     memory_service: Any,
@@ -111,7 +158,10 @@ def load_all_financial_tools(
         "view_data_func": manager.visualizar_dados,
         "save_func": manager.salvar,
         # Transaction
-        "add_transaction_func": manager.transaction_domain_service.add_transaction,
+        # (pelos casos de uso, que já ajustam os orçamentos)
+        "add_transaction_func": manager.adicionar_registro,
+        "update_transaction_func": manager.atualizar_transacao,
+        "delete_transaction_func": manager.excluir_transacao,
         "get_summary_func": manager.get_summary,
         "get_expenses_by_category_func": manager.get_expenses_by_category,
         # Budget
@@ -190,6 +240,9 @@ def load_all_financial_tools(
                                     "_", " "
                                 ).title()
 
+                            if tool_instance.reads_sheets:
+                                _memoize_run(tool_instance, manager.sheet_revision)
+
                             tools_list.append(tool_instance)
 
                         except TypeError as e:
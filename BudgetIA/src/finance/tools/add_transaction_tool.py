@@ -1,7 +1,6 @@
 # src/finance/tools/add_transaction_tool.py
 import datetime
 from collections.abc import Callable  # Importar Callable
-from typing import Any
 
 from core.base_tool import BaseTool
 from core.logger import get_logger
@@ -21,12 +20,10 @@ class AddTransactionTool(BaseTool):  # type: ignore[misc]
         add_transaction_func: Callable[..., None],
         save_func: Callable[[], None],
         get_summary_func: Callable[[], dict[str, float]],
-        recalculate_budgets_func: Callable[[], Any],
     ) -> None:
         self.adicionar_registro = add_transaction_func
         self.save = save_func
         self.get_summary = get_summary_func
-        self.recalculate_budgets_func = recalculate_budgets_func
 
     # --- FIM DA MUDANÇA ---
 
@@ -66,11 +63,9 @@ class AddTransactionTool(BaseTool):  # type: ignore[misc]
                 status=status,
                 parcelas=parcelas,
             )
+            # O caso de uso já ajusta os orçamentos (delta); só falta persistir
             self.save()  # Salva a transação
 
-            logger.info("Transação adicionada. Acionando recálculo de orçamentos...")
-            self.recalculate_budgets_func()
-
             resumo_atual = self.get_summary()
             # --- Fim das chamadas injetadas ---
 
@@ -21,6 +21,7 @@ class AnalisarAdesaoFinanceiraTool(BaseTool):  # type: ignore[misc]
         "Use esta ferramenta sempre que o usuário perguntar sobre a saúde geral do orçamento ou a adesão a uma regra."
     )
     args_schema: type[BaseModel] = AnalisarAdesaoInput
+    reads_sheets: tuple[str, ...] = (NomesAbas.TRANSACOES,)
 
     # --- DIP: Depende de Callables ---
     def __init__(self, view_data_func: Callable[..., pd.DataFrame]) -> None:
@@ -20,6 +20,7 @@ class AnalisarDividaTool(BaseTool):  # type: ignore[misc]
         "Calcula o saldo devedor atual e projeta o tempo para quitação."
     )
     args_schema: type[BaseModel] = AnalisarDividaInput
+    reads_sheets: tuple[str, ...] = (NomesAbas.DIVIDAS,)
 
     # --- DIP: Depende de Callables ---
     def __init__(self, view_data_func: Callable[..., pd.DataFrame]) -> None:
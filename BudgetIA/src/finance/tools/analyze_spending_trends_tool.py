@@ -19,6 +19,7 @@ class AnalisarTendenciasGastosTool(BaseTool):  # type: ignore[misc]
         "Útil para identificar se os gastos estão aumentando ou diminuindo."
     )
     args_schema: type[BaseModel] = AnalisarTendenciasGastosInput
+    reads_sheets: tuple[str, ...] = (NomesAbas.TRANSACOES,)
 
     # --- DIP: Depende de Callables ---
     def __init__(self, view_data_func: Callable[..., pd.DataFrame]) -> None:
@@ -20,6 +20,7 @@ class CalcularDespesasPorCategoriaTool(BaseTool):  # type: ignore[misc]
         "'Minhas despesas por tipo', 'Distribuição dos gastos'."
     )
     args_schema: type[BaseModel] = CalcularDespesasPorCategoriaInput
+    reads_sheets: tuple[str, ...] = (NomesAbas.TRANSACOES,)
 
     # --- DIP: Depende de Callables ---
     def __init__(self, view_data_func: Callable[..., pd.DataFrame]) -> None:
@@ -1,11 +1,9 @@
 from collections.abc import Callable
-from typing import Any
 
 from pydantic import BaseModel, Field
 
 from core.base_tool import BaseTool
 from core.logger import get_logger
-from finance.domain.repositories.transaction_repository import ITransactionRepository
 
 logger = get_logger("Tool_DelTrans")
 
@@ -26,21 +24,19 @@ class DeleteTransactionTool(BaseTool):
     # --- Injeção de Dependências ---
     def __init__(
         self,
-        transaction_repo: ITransactionRepository,
+        delete_transaction_func: Callable[[int], bool],
         save_func: Callable[[], None],
-        recalculate_budgets_func: Callable[[], Any],
     ):
-        self.transaction_repo = transaction_repo
+        self.excluir_transacao = delete_transaction_func
         self.save = save_func
-        self.recalculate_budgets = recalculate_budgets_func
 
     def run(self, transaction_id: int) -> str:
         logger.info(f"Ferramenta '{self.name}' chamada para ID={transaction_id}")
         try:
-            success = self.transaction_repo.delete_transaction(transaction_id)
+            # O caso de uso já ajusta os orçamentos (gastos podem ter diminuído)
+            success = self.excluir_transacao(transaction_id)
             if success:
                 self.save()  # Salva no disco/nuvem
-                self.recalculate_budgets()  # Atualiza orçamentos (gastos podem ter diminuído)
                 return f"Transação {transaction_id} excluída com sucesso."
 
             return (
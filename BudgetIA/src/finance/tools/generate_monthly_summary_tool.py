@@ -20,6 +20,7 @@ class GerarResumoMensalTool(BaseTool):  # type: ignore[misc]
         "ou para todos os meses disponíveis se nenhum for especificado."
     )
     args_schema: type[BaseModel] = GerarResumoMensalInput
+    reads_sheets: tuple[str, ...] = (NomesAbas.TRANSACOES,)
 
     # --- DIP: Depende de Callables ---
     def __init__(self, view_data_func: Callable[..., pd.DataFrame]) -> None:
@@ -17,6 +17,7 @@ class IdentificarMaioresGastosTool(BaseTool):  # type: ignore[misc]
     name: str = "identificar_maiores_gastos"
     description: str = "Identifica e retorna as N maiores despesas individuais na planilha, útil para encontrar gastos significativos."
     args_schema: type[BaseModel] = IdentificarMaioresGastosInput
+    reads_sheets: tuple[str, ...] = (NomesAbas.TRANSACOES,)
 
     # --- DIP: Depende de Callables ---
     def __init__(self, view_data_func: Callable[..., pd.DataFrame]) -> None:
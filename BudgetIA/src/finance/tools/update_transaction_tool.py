@@ -4,7 +4,6 @@ from pydantic import BaseModel, Field
 
 from core.base_tool import BaseTool
 from core.logger import get_logger
-from finance.domain.repositories.transaction_repository import ITransactionRepository
 
 logger = get_logger("Tool_UpdTrans")
 from collections.abc import Callable  # noqa: E402
@@ -34,13 +33,11 @@ class UpdateTransactionTool(BaseTool):
     # --- Injeção de Dependências ---
     def __init__(
         self,
-        transaction_repo: ITransactionRepository,
+        update_transaction_func: Callable[[int, dict[str, Any]], bool],
         save_func: Callable[[], None],
-        recalculate_budgets_func: Callable[[], Any],
     ):
-        self.transaction_repo = transaction_repo
+        self.atualizar_transacao = update_transaction_func
         self.save = save_func
-        self.recalculate_budgets = recalculate_budgets_func
 
     def run(self, transaction_id: int, **kwargs) -> str:
         logger.info(f"Ferramenta '{self.name}' chamada para ID={transaction_id}")
@@ -51,13 +48,11 @@ class UpdateTransactionTool(BaseTool):
             if not dados_atualizados:
                 return "Nenhuma alteração foi fornecida. Informe pelo menos um campo para atualizar."
 
-            success = self.transaction_repo.update_transaction(
-                transaction_id, dados_atualizados
-            )
+            # O caso de uso já ajusta os orçamentos (gastos podem ter mudado)
+            success = self.atualizar_transacao(transaction_id, dados_atualizados)
 
             if success:
                 self.save()  # Persiste mudança
-                self.recalculate_budgets()  # Atualiza orçamentos (gastos podem ter mudado)
                 return f"Transação {transaction_id} atualizada com sucesso. Novos dados: {dados_atualizados}"
 
             return f"Transação {transaction_id} não encontrada para atualização."
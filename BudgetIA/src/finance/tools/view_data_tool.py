@@ -1,5 +1,6 @@
 # src/finance/tools/view_data_tool.py
 from collections.abc import Callable  # Importar Callable
+from typing import Any
 
 import pandas as pd
 from pydantic import BaseModel
@@ -20,6 +21,8 @@ class VisualizarDadosPlanilhaTool(BaseTool):  # type: ignore[misc]
         "Use esta ferramenta sempre que precisar de uma visão geral dos dados, transações, etc."
     )
     args_schema: type[BaseModel] = VisualizarDadosPlanilhaInput
+    # Padrão; a aba realmente lida depende de 'aba_nome' (ver sheets_read)
+    reads_sheets: tuple[str, ...] = (config.NomesAbas.TRANSACOES,)
 
     # --- DIP: Depende de Callables ---
     def __init__(self, view_data_func: Callable[..., pd.DataFrame]) -> None:
@@ -27,6 +30,11 @@ class VisualizarDadosPlanilhaTool(BaseTool):  # type: ignore[misc]
 
     # --- FIM DA MUDANÇA ---
 
+    def sheets_read(
+        self, aba_nome: str | None = None, **kwargs: Any
+    ) -> tuple[str, ...]:
+        return (aba_nome or config.NomesAbas.TRANSACOES,)
+
     def run(self, aba_nome: str | None = None) -> str:
         if aba_nome is None:
             aba_nome = config.NomesAbas.TRANSACOES
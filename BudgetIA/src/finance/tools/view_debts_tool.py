@@ -19,6 +19,7 @@ class VisualizarDividasTool(BaseTool):  # type: ignore[misc]
         "Use para 'Quais são minhas dívidas?', 'Qual o saldo das minhas dívidas?'."
     )
     args_schema: type[BaseModel] = VisualizarDividasInput
+    reads_sheets: tuple[str, ...] = (NomesAbas.DIVIDAS,)
 
     # --- DIP: Depende de Callables ---
     def __init__(self, view_data_func: Callable[..., pd.DataFrame]) -> None:
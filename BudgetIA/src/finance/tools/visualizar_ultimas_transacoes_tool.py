@@ -26,6 +26,7 @@ class VisualizarUltimasTransacoesTool(BaseTool):  # type: ignore[misc]
     name: str = "visualizar_ultimas_transacoes"
     description: str = "Visualiza as 'n' últimas transações registradas, ordenadas por data. Pode ser filtrado por tipo ('Receita' ou 'Despesa')."
     args_schema = VisualizarUltimasTransacoesInput
+    reads_sheets = (NomesAbas.TRANSACOES,)
 
     # --- DIP: Depende de Callables ---
     def __init__(self, view_data_func: Callable[..., pd.DataFrame]) -> None:
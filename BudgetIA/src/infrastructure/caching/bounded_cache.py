@@ -0,0 +1,251 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, Generic, TypeVar
+
+from core.logger import get_logger
+
+logger = get_logger("BoundedCache")
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class BoundedLRUCache(Generic[K, V]):
+    """
+    Cache LRU em memória, limitado por número de entradas, por bytes
+    estimados e por tempo ocioso (TTL desde o último acesso).
+
+    Ao remover uma entrada (por limite, TTL ou explicitamente), chama o
+    hook 'on_evict(key, value)' — fora do lock — para que o valor possa
+    salvar pendências e liberar conexões.
+
+    O tamanho de cada entrada é estimado no set() e reestimado a cada
+    sweep(), que também roda em toda criação via get_or_create().
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        max_bytes: int | None = None,
+        idle_ttl_seconds: float | None = None,
+        size_of: Callable[[V], int] | None = None,
+        on_evict: Callable[[K, V], None] | None = None,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._size_of = size_of
+        self._on_evict = on_evict
+
+        # key -> (valor, último acesso, bytes estimados)
+        self._entries: OrderedDict[K, tuple[V, float, int]] = OrderedDict()
+        self._lock = threading.RLock()
+        # Um lock de criação por chave (com contagem de usuários), para que
+        # uma carga lenta não bloqueie a criação de outras chaves.
+        self._create_locks: dict[K, list[Any]] = {}
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key: K) -> bool:
+        with self._lock:
+            return key in self._entries and not self._is_expired(key)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        """Retorna o valor (marcando-o como recém-usado) ou None."""
+        evicted: list[tuple[K, V]] = []
+        with self._lock:
+            value = self._get_locked(key, evicted)
+        self._notify(evicted)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        """Insere/atualiza um valor, removendo os menos usados se preciso."""
+        evicted: list[tuple[K, V]] = []
+        with self._lock:
+            self._set_locked(key, value, evicted)
+        self._notify(evicted)
+
+    def get_or_create(self, key: K, factory: Callable[[], V]) -> V:
+        """
+        Retorna o valor em cache ou cria via 'factory'. A criação usa um
+        lock por chave (double-checked locking): não monta duas vezes o mesmo
+        valor e não bloqueia acertos nem criações de outras chaves.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        # Aproveita a falta (já cara) para expirar ociosos e reavaliar tamanhos
+        self.sweep()
+        create_lock = self._acquire_create_lock(key)
+        try:
+            with create_lock:
+                evicted: list[tuple[K, V]] = []
+                with self._lock:
+                    value = self._get_locked(key, evicted, count=False)
+                self._notify(evicted)
+                if value is None:
+                    value = factory()
+                    self.set(key, value)
+        finally:
+            self._release_create_lock(key)
+        return value
+
+    def peek(self, key: K) -> V | None:
+        """Retorna o valor sem renovar o acesso nem contar nas métricas."""
+        with self._lock:
+            if key not in self._entries or self._is_expired(key):
+                return None
+            return self._entries[key][0]
+
+    def pop(self, key: K) -> V | None:
+        """Remove uma entrada explicitamente (o hook de remoção é chamado)."""
+        evicted: list[tuple[K, V]] = []
+        with self._lock:
+            if key in self._entries:
+                evicted.append(self._remove_locked(key))
+        self._notify(evicted)
+        return evicted[0][1] if evicted else None
+
+    def sweep(self) -> int:
+        """
+        Remove as entradas ociosas além do TTL e reestima o tamanho das
+        demais (os valores crescem depois do set()), removendo as menos
+        usadas se o total passar do limite. Retorna quantas removeu.
+        """
+        evicted: list[tuple[K, V]] = []
+        with self._lock:
+            for key in [k for k in self._entries if self._is_expired(k)]:
+                evicted.append(self._remove_locked(key))
+                self.evictions += 1
+            values = [(key, value) for key, (value, _, _) in self._entries.items()]
+
+        # Estimar pode ser caro (memory_usage profundo): fora do lock
+        sizes = [(k, v, self._estimate(v)) for k, v in values if self._size_of]
+        with self._lock:
+            for key, value, size in sizes:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] is value:
+                    self._entries[key] = (value, entry[1], size)
+                    self._total_bytes += size - entry[2]
+            self._enforce_limits_locked(evicted)
+        self._notify(evicted)
+        return len(evicted)
+
+    def clear(self) -> None:
+        """Esvazia o cache chamando o hook de remoção para cada entrada."""
+        with self._lock:
+            evicted = [self._remove_locked(k) for k in list(self._entries)]
+        self._notify(evicted)
+
+    def metrics(self) -> dict[str, Any]:
+        """Métricas do cache: acertos, faltas, remoções e bytes por entrada."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "total_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "bytes_per_entry": {
+                    str(key): size for key, (_, _, size) in self._entries.items()
+                },
+            }
+
+    def _acquire_create_lock(self, key: K) -> threading.Lock:
+        with self._lock:
+            entry = self._create_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+            return entry[0]  # type: ignore[no-any-return]
+
+    def _release_create_lock(self, key: K) -> None:
+        with self._lock:
+            entry = self._create_locks[key]
+            entry[1] -= 1
+            if not entry[1]:
+                del self._create_locks[key]
+
+    # --- Internos (chamados com o lock adquirido) ---
+
+    def _is_expired(self, key: K) -> bool:
+        if self.idle_ttl_seconds is None:
+            return False
+        _, last_access, _ = self._entries[key]
+        return time.monotonic() - last_access > self.idle_ttl_seconds
+
+    def _get_locked(
+        self, key: K, evicted: list[tuple[K, V]], count: bool = True
+    ) -> V | None:
+        if key not in self._entries or self._is_expired(key):
+            if key in self._entries:
+                evicted.append(self._remove_locked(key))
+                self.evictions += 1
+            if count:
+                self.misses += 1
+            return None
+
+        value, _, size = self._entries[key]
+        self._entries[key] = (value, time.monotonic(), size)
+        self._entries.move_to_end(key)
+        if count:
+            self.hits += 1
+        return value
+
+    def _set_locked(self, key: K, value: V, evicted: list[tuple[K, V]]) -> None:
+        if key in self._entries:
+            old_value, _, old_size = self._entries.pop(key)
+            self._total_bytes -= old_size
+            if old_value is not value:
+                evicted.append((key, old_value))
+
+        size = self._estimate(value)
+        self._entries[key] = (value, time.monotonic(), size)
+        self._total_bytes += size
+        self._enforce_limits_locked(evicted)
+
+    def _enforce_limits_locked(self, evicted: list[tuple[K, V]]) -> None:
+        # Remove os menos usados até caber nos limites (mantém o mais recente)
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._total_bytes > self.max_bytes)
+        ):
+            oldest = next(iter(self._entries))
+            evicted.append(self._remove_locked(oldest))
+            self.evictions += 1
+
+    def _remove_locked(self, key: K) -> tuple[K, V]:
+        value, _, size = self._entries.pop(key)
+        self._total_bytes -= size
+        return key, value
+
+    def _estimate(self, value: V) -> int:
+        if self._size_of is None:
+            return 0
+        try:
+            return int(self._size_of(value))
+        except Exception as e:
+            logger.warning(f"[{self.name}] Falha ao estimar tamanho: {e}")
+            return 0
+
+    def _notify(self, evicted: list[tuple[K, V]]) -> None:
+        for key, value in evicted:
+            logger.info(f"[{self.name}] Removendo '{key}' do cache.")
+            if self._on_evict is None:
+                continue
+            try:
+                self._on_evict(key, value)
+            except Exception as e:
+                logger.error(f"[{self.name}] Erro ao finalizar '{key}': {e}")
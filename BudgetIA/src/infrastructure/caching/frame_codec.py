@@ -0,0 +1,79 @@
+"""
+Serialização de DataFrames para o cache (uma chave por aba).
+
+Formato do blob: MAGIC (4 bytes) + versão (1 byte) + codec (1 byte) + payload.
+O codec padrão é Arrow IPC (stream) com compressão zstd, que preserva
+dtypes e reduz ~3x o volume trafegado em relação ao pickle; abas que o
+Arrow não representa (ex: colunas object com tipos mistos) caem para
+pickle. Blobs de outra versão são tratados como cache miss.
+"""
+
+import io
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from core.logger import get_logger
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - dependência declarada; sem ela, só pickle
+    pa = None
+
+logger = get_logger("FrameCodec")
+
+MAGIC = b"BIAF"
+FORMAT_VERSION = 1
+CODEC_ARROW = b"A"
+CODEC_PICKLE = b"P"
+_HEADER_SIZE = len(MAGIC) + 2
+
+
+class IncompatibleFrameError(ValueError):
+    """Blob em formato/versão desconhecido (deve ser tratado como miss)."""
+
+
+def encode_frame(df: pd.DataFrame) -> bytes:
+    """Serializa um DataFrame, preferindo Arrow IPC."""
+    header = MAGIC + bytes([FORMAT_VERSION])
+    if pa is not None:
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            sink = io.BytesIO()
+            options = pa.ipc.IpcWriteOptions(compression="zstd")
+            with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+                writer.write_table(table)
+            return header + CODEC_ARROW + sink.getvalue()
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            logger.debug("Aba não representável em Arrow. Usando pickle.")
+    return header + CODEC_PICKLE + pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def decode_frame(blob: bytes) -> pd.DataFrame:
+    """Desserializa um blob gerado por encode_frame()."""
+    if len(blob) < _HEADER_SIZE or blob[: len(MAGIC)] != MAGIC:
+        raise IncompatibleFrameError("Blob sem cabeçalho de cache conhecido.")
+    version = blob[len(MAGIC)]
+    if version != FORMAT_VERSION:
+        raise IncompatibleFrameError(f"Versão de cache {version} não suportada.")
+
+    codec = blob[len(MAGIC) + 1 : _HEADER_SIZE]
+    payload = memoryview(blob)[_HEADER_SIZE:]
+    if codec == CODEC_PICKLE:
+        return pickle.loads(payload)
+    if codec == CODEC_ARROW and pa is not None:
+        table = pa.ipc.open_stream(pa.py_buffer(payload)).read_all()
+        return _restore_missing(table.to_pandas())
+    raise IncompatibleFrameError(f"Codec de cache {codec!r} não suportado.")
+
+
+def _restore_missing(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Arrow devolve nulos de colunas texto como None; a leitura da planilha
+    produz NaN. Normaliza para NaN para manter o mesmo comportamento.
+    """
+    for col in df.columns:
+        if df[col].dtype == object and df[col].isna().any():
+            df[col] = df[col].where(df[col].notna(), np.nan)
+    return df
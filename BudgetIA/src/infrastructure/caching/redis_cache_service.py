@@ -1,18 +1,43 @@
-import pickle
-from typing import Any
+import json
+import os
 
+import pandas as pd
 import redis
 
 from config import UPSTASH_REDIS_URL
 from core.logger import get_logger
+from infrastructure.caching.frame_codec import (
+    FORMAT_VERSION,
+    IncompatibleFrameError,
+    decode_frame,
+    encode_frame,
+)
 
 logger = get_logger("RedisCache")
 
+# Cada blob de aba começa com o token da escrita que o gerou; o meta
+# registra o token esperado por aba, então abas de escritas diferentes
+# (ex: dois workers salvando ao mesmo tempo) nunca são misturadas.
+_TOKEN_SIZE = 8
+
 
 class RedisCacheService:
+    """
+    Cache dos DataFrames do usuário no Redis, com uma chave por aba.
+
+    Layout de uma entrada 'key':
+        {key}:meta          JSON com versão do formato, timestamp e token por aba
+        {key}:sheet:{aba}   token + DataFrame serializado (ver frame_codec)
+        {key}:rev           carimbo de revisão (muda a cada escrita/invalidação)
+
+    Permite ler só as abas necessárias e regravar só as abas alteradas.
+    """
+
     def __init__(self):
         self.redis_client = None
         self.enabled = False
+        # Tokens das abas que este processo leu/gravou, por chave.
+        self._tokens: dict[str, dict[str, str]] = {}
 
         if UPSTASH_REDIS_URL:
             try:
@@ -30,44 +55,202 @@ class RedisCacheService:
                 logger.warning(f"Falha ao conectar Redis Cache: {e}")
                 self.enabled = False
 
-    def get_entry(self, key: str) -> tuple[Any, str | None]:
-        """Recupera (Dados, Timestamp) do cache."""
+    @staticmethod
+    def _meta_key(key: str) -> str:
+        return f"{key}:meta"
+
+    @staticmethod
+    def _sheet_key(key: str, sheet: str) -> str:
+        return f"{key}:sheet:{sheet}"
+
+    @staticmethod
+    def _revision_key(key: str) -> str:
+        return f"{key}:rev"
+
+    def get_revision(self, key: str) -> str | None:
+        """Carimbo de revisão atual da entrada (um GET pequeno)."""
+        if not self.enabled:
+            return None
+        try:
+            revision = self.redis_client.get(self._revision_key(key))
+        except Exception as e:
+            logger.error(f"ERRO Cache Revision ({key}): {e}")
+            return None
+        if isinstance(revision, bytes):
+            return revision.decode()
+        return revision
+
+    def get_entry(
+        self, key: str, sheets: list[str] | None = None
+    ) -> tuple[dict[str, pd.DataFrame] | None, str | None]:
+        """
+        Recupera (Dados, Timestamp) do cache. Com 'sheets', busca apenas
+        essas abas. Qualquer aba ausente ou inconsistente é tratada como miss.
+        """
         if not self.enabled:
             return None, None
 
         try:
-            data = self.redis_client.get(key)
-            if data:
-                # Expects a tuple (data_object, timestamp_str)
-                return pickle.loads(data)
+            meta_key = self._meta_key(key)
+            if sheets is None:
+                raw_meta = self.redis_client.get(meta_key)
+                if raw_meta is None:
+                    return None, None
+                meta = json.loads(raw_meta)
+                sheets = list(meta.get("sheets", {}))
+                blobs = self.redis_client.mget(
+                    [self._sheet_key(key, s) for s in sheets]
+                )
+            else:
+                values = self.redis_client.mget(
+                    [meta_key, *(self._sheet_key(key, s) for s in sheets)]
+                )
+                if values[0] is None:
+                    return None, None
+                meta = json.loads(values[0])
+                blobs = values[1:]
+
+            if meta.get("version") != FORMAT_VERSION:
+                logger.info(f"Cache em formato antigo ({key}). Ignorando.")
+                return None, None
+
+            tokens: dict[str, str] = meta.get("sheets", {})
+            data: dict[str, pd.DataFrame] = {}
+            for sheet, blob in zip(sheets, blobs, strict=True):
+                expected = tokens.get(sheet)
+                if blob is None or expected is None:
+                    return None, None
+                if blob[:_TOKEN_SIZE].hex() != expected:
+                    logger.info(f"Cache inconsistente ({key}:{sheet}). Ignorando.")
+                    return None, None
+                data[sheet] = decode_frame(blob[_TOKEN_SIZE:])
+
+            self._tokens.setdefault(key, {}).update(
+                {sheet: tokens[sheet] for sheet in data}
+            )
+            return data, meta.get("timestamp")
+        except IncompatibleFrameError as e:
+            logger.info(f"Cache incompatível ({key}): {e}")
         except Exception as e:
             logger.error(f"ERRO Cache Read ({key}): {e}")
         return None, None
 
     def set_entry(
-        self, key: str, data: Any, timestamp: str, ttl_seconds: int = 3600
+        self,
+        key: str,
+        data: dict[str, pd.DataFrame],
+        timestamp: str,
+        ttl_seconds: int = 3600,
+        sheets: set[str] | None = None,
+        revision: str | None = None,
     ) -> bool:
-        """Salva (Dados, Timestamp) no cache."""
+        """
+        Salva (Dados, Timestamp) no cache. Com 'sheets', regrava apenas
+        essas abas e reaproveita as demais já gravadas por este processo
+        (se alguma não estiver disponível, grava todas). Com 'revision',
+        grava o carimbo de revisão na mesma transação.
+        """
         if not self.enabled:
             return False
 
+        known = self._tokens.get(key, {})
+        if sheets is None or any(s not in known for s in data if s not in sheets):
+            sheets = set(data)
+
         try:
-            payload = (data, timestamp)
-            serialized_data = pickle.dumps(payload)
-            self.redis_client.setex(key, ttl_seconds, serialized_data)
+            token = os.urandom(_TOKEN_SIZE)
+            tokens = {s: (token.hex() if s in sheets else known[s]) for s in data}
+            meta = {"version": FORMAT_VERSION, "timestamp": timestamp, "sheets": tokens}
+
+            pipe = self.redis_client.pipeline(transaction=True)
+            for sheet in data:
+                sheet_key = self._sheet_key(key, sheet)
+                if sheet in sheets:
+                    pipe.setex(
+                        sheet_key, ttl_seconds, token + encode_frame(data[sheet])
+                    )
+                else:
+                    pipe.expire(sheet_key, ttl_seconds)
+            pipe.setex(self._meta_key(key), ttl_seconds, json.dumps(meta))
+            if revision is not None:
+                pipe.set(self._revision_key(key), revision)
+            pipe.execute()
+
+            self._tokens[key] = tokens
             return True
         except Exception as e:
             logger.error(f"ERRO Cache Write ({key}): {e}")
             return False
 
-    def invalidate(self, key: str) -> bool:
-        """Remove uma chave do cache."""
+    def invalidate(self, key: str, revision: str | None = None) -> bool:
+        """
+        Invalida uma entrada (remove o meta e, se dado, troca o carimbo de
+        revisão). As abas continuam no Redis até expirar, para que o
+        próximo set_entry possa regravar só as abas alteradas.
+        """
         if not self.enabled:
             return False
 
         try:
-            self.redis_client.delete(key)
+            pipe = self.redis_client.pipeline(transaction=True)
+            pipe.delete(self._meta_key(key))
+            if revision is not None:
+                pipe.set(self._revision_key(key), revision)
+            pipe.execute()
             return True
         except Exception as e:
             logger.error(f"ERRO Cache Invalidate ({key}): {e}")
             return False
+
+    def delete(self, key: str) -> bool:
+        """Remove uma entrada por completo (meta e abas conhecidas)."""
+        if not self.enabled:
+            return False
+
+        try:
+            sheets = self._tokens.pop(key, {})
+            self.redis_client.delete(
+                self._meta_key(key),
+                self._revision_key(key),
+                *(self._sheet_key(key, s) for s in sheets),
+            )
+            return True
+        except Exception as e:
+            logger.error(f"ERRO Cache Delete ({key}): {e}")
+            return False
+
+    def get_blobs(self, keys: list[str]) -> list[bytes | None]:
+        """Lê valores binários avulsos (ex: vetores de embedding) via MGET."""
+        if not self.enabled or not keys:
+            return [None] * len(keys)
+        try:
+            return self.redis_client.mget(keys)
+        except Exception as e:
+            logger.error(f"ERRO Cache Read ({len(keys)} chaves): {e}")
+            return [None] * len(keys)
+
+    def set_blobs(self, items: dict[str, bytes], ttl_seconds: int) -> bool:
+        """Grava valores binários avulsos com expiração (um pipeline)."""
+        if not self.enabled or not items:
+            return False
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.setex(key, ttl_seconds, value)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"ERRO Cache Write ({len(items)} chaves): {e}")
+            return False
+
+    def close(self) -> None:
+        """Fecha a conexão com o Redis (se houver)."""
+        if self.redis_client is None:
+            return
+        try:
+            self.redis_client.close()
+        except Exception as e:
+            logger.warning(f"Erro ao fechar conexão Redis: {e}")
+        finally:
+            self.redis_client = None
+            self.enabled = False
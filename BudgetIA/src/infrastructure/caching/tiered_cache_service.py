@@ -0,0 +1,112 @@
+import uuid
+from dataclasses import dataclass
+
+import pandas as pd
+
+import config
+from core.logger import get_logger
+from infrastructure.caching.bounded_cache import BoundedLRUCache
+from infrastructure.caching.redis_cache_service import RedisCacheService
+
+logger = get_logger("TieredCache")
+
+
+@dataclass(frozen=True)
+class _L1Entry:
+    data: dict[str, pd.DataFrame]
+    timestamp: str | None
+    revision: str
+
+
+def _entry_bytes(entry: _L1Entry) -> int:
+    return int(sum(df.memory_usage(deep=True).sum() for df in entry.data.values()))
+
+
+class TieredCacheService:
+    """
+    Cache de DataFrames em dois níveis: L1 em memória (LRU limitado, com
+    os DataFrames já desserializados) na frente do Redis (L2).
+
+    Toda escrita/invalidação troca o carimbo '{key}:rev' no Redis, na
+    mesma transação dos dados. Uma leitura só compara esse carimbo (um
+    GET pequeno) com o do L1; o blob só é baixado se outro worker escreveu.
+    Sem Redis não há como validar entre workers, então o L1 fica desligado.
+    """
+
+    def __init__(
+        self,
+        l2: RedisCacheService,
+        max_entries: int = config.DATA_CACHE_L1_MAX_ENTRIES,
+        max_bytes: int | None = config.DATA_CACHE_L1_MAX_MB * 1024 * 1024,
+    ):
+        self.l2 = l2
+        self.l1: BoundedLRUCache[str, _L1Entry] = BoundedLRUCache(
+            name="dataframes_l1",
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            size_of=_entry_bytes,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.l2.enabled
+
+    def get_entry(
+        self, key: str, sheets: list[str] | None = None
+    ) -> tuple[dict[str, pd.DataFrame] | None, str | None]:
+        """Recupera (Dados, Timestamp), do L1 se o carimbo ainda bate."""
+        if not self.l2.enabled:
+            return None, None
+
+        # O carimbo é lido ANTES dos dados: se outro worker escrever no meio,
+        # o L1 fica com um carimbo velho e a próxima leitura rebusca.
+        revision = self.l2.get_revision(key)
+        entry = self.l1.get(key)
+        if entry is not None and revision is not None and entry.revision == revision:
+            logger.debug(f"Cache L1 HIT ({key}).")
+            if sheets is None:
+                return dict(entry.data), entry.timestamp
+            if all(s in entry.data for s in sheets):
+                return {s: entry.data[s] for s in sheets}, entry.timestamp
+
+        data, timestamp = self.l2.get_entry(key, sheets)
+        if data is not None and sheets is None and revision is not None:
+            self.l1.set(key, _L1Entry(dict(data), timestamp, revision))
+        return data, timestamp
+
+    def set_entry(
+        self,
+        key: str,
+        data: dict[str, pd.DataFrame],
+        timestamp: str,
+        ttl_seconds: int = 3600,
+        sheets: set[str] | None = None,
+    ) -> bool:
+        """Grava no Redis (só 'sheets', se dado) e guarda o dict no L1."""
+        revision = uuid.uuid4().hex
+        if not self.l2.set_entry(
+            key, data, timestamp, ttl_seconds, sheets=sheets, revision=revision
+        ):
+            self.l1.pop(key)
+            return False
+        self.l1.set(key, _L1Entry(dict(data), timestamp, revision))
+        return True
+
+    def invalidate(self, key: str) -> bool:
+        """Invalida a entrada no L1 e no Redis (troca o carimbo)."""
+        self.l1.pop(key)
+        return self.l2.invalidate(key, revision=uuid.uuid4().hex)
+
+    def delete(self, key: str) -> bool:
+        """Remove a entrada por completo nos dois níveis."""
+        self.l1.pop(key)
+        return self.l2.delete(key)
+
+    def metrics(self) -> dict:
+        """Métricas do L1 (hits, misses, remoções, bytes)."""
+        return self.l1.metrics()
+
+    def close(self) -> None:
+        """Esvazia o L1 e fecha a conexão com o Redis."""
+        self.l1.clear()
+        self.l2.close()
@@ -4,9 +4,18 @@ from fastapi.security import OAuth2PasswordBearer
 from core.agent_runner_interface import AgentRunner
 from core.llm_manager import LLMOrchestrator
 from core.logger import get_logger
-from core.user_config_service import UserConfigService  # noqa: E402
-from finance.factory import FinancialSystemFactory  # noqa: E402
+from core.user_config_service import (  # noqa: E402
+    UserConfigService,
+    get_user_config_cache,
+)
+from finance.factory import (  # noqa: E402
+    FinancialSystemFactory,
+    close_cache_service,
+    get_cache_service,
+    get_embedding_cache,
+)
 from finance.planilha_manager import PlanilhaManager  # noqa: E402
+from finance.storage.drive_metadata import drive_metadata_cache  # noqa: E402
 from infrastructure.agents.factory import AgentFactory  # noqa: E402
 from interfaces.api.utils.jwt import decode_access_token  # noqa: E402
 
@@ -59,12 +68,75 @@ def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
 
 
 # --- CACHE DE SISTEMAS FINANCEIROS ---
-# Mapeia user_id -> PlanilhaManager
-# Isso garante que não abrimos múltiplos handlers para a mesma planilha
+# Mapeia user_id:path -> PlanilhaManager
+# Isso garante que não abrimos múltiplos handlers para a mesma planilha.
+# LRU limitado (entradas, memória estimada e tempo ocioso): ao sair do
+# cache, o manager grava pendências e libera conexões via close().
 import threading  # noqa: E402
+from concurrent.futures import Future, ThreadPoolExecutor  # noqa: E402
+from concurrent.futures import wait as wait_futures  # noqa: E402
+
+import config  # noqa: E402
+from infrastructure.caching.bounded_cache import BoundedLRUCache  # noqa: E402
+
+_managers_cache: BoundedLRUCache[str, PlanilhaManager] = BoundedLRUCache(
+    name="managers",
+    max_entries=config.MANAGER_CACHE_MAX_ENTRIES,
+    max_bytes=config.MANAGER_CACHE_MAX_MB * 1024 * 1024,
+    idle_ttl_seconds=config.MANAGER_CACHE_IDLE_TTL_SECONDS,
+    size_of=lambda manager: manager.estimated_bytes(),
+    on_evict=lambda key, manager: _on_manager_evicted(key, manager),
+)
+
+# close() pode gravar no storage (segundos): roda numa thread própria, e não
+# na requisição (de outro usuário) que provocou a remoção.
+_close_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mgr-close")
+_pending_closes: dict[str, Future] = {}
+_pending_closes_lock = threading.Lock()
+
+
+def _on_manager_evicted(cache_key: str, manager: PlanilhaManager) -> None:
+    """
+    Agenda a gravação das pendências do manager removido e descarta o
+    agente montado sobre ele: um agente com o manager antigo divergiria do
+    novo (e poderia sobrescrever dados mais recentes ao salvar).
+    """
+    future = _close_executor.submit(manager.close)
+    with _pending_closes_lock:
+        _pending_closes[cache_key] = future
+    future.add_done_callback(lambda f: _forget_pending_close(cache_key, f))
+
+    user_id = cache_key.split(":", 1)[0]
+    cached = _agents_cache.peek(user_id)
+    if cached is not None and cached[0] is manager:
+        _agents_cache.pop(user_id)
+
+
+def _forget_pending_close(cache_key: str, future: Future) -> None:
+    with _pending_closes_lock:
+        if _pending_closes.get(cache_key) is future:
+            del _pending_closes[cache_key]
+    if future.exception() is not None:
+        logger.error(f"Erro ao finalizar manager '{cache_key}': {future.exception()}")
+
+
+def wait_pending_closes(cache_key: str | None = None) -> None:
+    """
+    Espera os close() agendados (de uma chave ou de todas). Um manager novo
+    da mesma planilha só carrega depois que o antigo gravou as pendências.
+    """
+    with _pending_closes_lock:
+        if cache_key is None:
+            futures = list(_pending_closes.values())
+        else:
+            futures = [f for f in [_pending_closes.get(cache_key)] if f is not None]
+    wait_futures(futures)
+
 
-_managers_cache: dict[str, PlanilhaManager] = {}
-_managers_lock = threading.Lock()
+def sweep_cached_systems() -> None:
+    """Expira ociosos e remede a memória dos caches (varredura periódica)."""
+    for cache in (_managers_cache, _agents_cache, _onboarding_cache):
+        cache.sweep()
 
 
 # @lru_cache # Cache removido pois agora depende do Header dinâmico
@@ -91,7 +163,7 @@ async def get_user_config_service(
                 logger.info(
                     f"Auth: Usuário HA '{ha_user.ha_username}' autenticado como '{budgetia_username}'"
                 )
-                return UserConfigService(username=budgetia_username)
+                return UserConfigService.for_user(budgetia_username)
         else:
             logger.debug("Auth: Token HA rejeitado pelo Core. Tentando fallback JWT...")
 
@@ -130,7 +202,7 @@ async def get_user_config_service(
     if not user_data:
         raise HTTPException(status_code=401, detail="Usuário não encontrado.")
 
-    return UserConfigService(username=username)
+    return UserConfigService.for_user(username)
 
 
 def get_planilha_manager(
@@ -153,58 +225,58 @@ def get_planilha_manager(
     user_id = config_service.username
     cache_key = f"{user_id}:{path_str}"
 
-    # Double-checked locking optimization
-    if cache_key in _managers_cache:
-        return _managers_cache[cache_key]
+    return _managers_cache.get_or_create(
+        cache_key, lambda: _create_manager(config_service, path_str)
+    )
 
-    with _managers_lock:
-        # Verifica novamente dentro do lock
-        if cache_key in _managers_cache:
-            return _managers_cache[cache_key]
 
-        logger.warning(f"CACHE MISS para {cache_key}. Criando novo Manager...")
+def _create_manager(
+    config_service: UserConfigService, path_str: str
+) -> PlanilhaManager:
+    """Monta um novo PlanilhaManager para a planilha do usuário."""
+    cache_key = f"{config_service.username}:{path_str}"
+    logger.warning(f"CACHE MISS para {cache_key}. Criando novo Manager...")
+    wait_pending_closes(cache_key)
 
-        # 3. Obtém credenciais de usuário (se houver) para acesso ao GSheets
-        from core.google_auth_service import GoogleAuthService
+    # 3. Obtém credenciais de usuário (se houver) para acesso ao GSheets
+    from core.google_auth_service import GoogleAuthService
 
-        auth_service = GoogleAuthService(config_service)
-        user_credentials = auth_service.get_user_credentials()
+    auth_service = GoogleAuthService(config_service)
+    user_credentials = auth_service.get_user_credentials()
 
-        if user_credentials:
-            logger.info("Injetando credenciais de usuário para acesso à planilha")
+    if user_credentials:
+        logger.info("Injetando credenciais de usuário para acesso à planilha")
 
-        # 4. Cria o Handler de Storage (Local, Google Sheets ou Google Drive Excel)
-        from finance.storage.storage_factory import StorageHandlerFactory
+    # 4. Cria o Handler de Storage (Local, Google Sheets ou Google Drive Excel)
+    from finance.storage.storage_factory import StorageHandlerFactory
 
-        try:
-            storage_handler = StorageHandlerFactory.create_handler(
-                path_str, credentials=user_credentials
-            )
-            logger.info(
-                f"Handler de Storage criado: {type(storage_handler).__name__} para {path_str}"
-            )
-        except ValueError as e:
-            logger.error(f"Falha ao criar handler de storage: {e}")
-            raise HTTPException(
-                status_code=500, detail=f"Erro de configuração de storage: {str(e)}"
-            )
-
-        # 4. Usa a Factory existente para montar tudo (Repositories, Services, Context)
-        llm_orchestrator = get_llm_orchestrator(config_service)
-        manager = FinancialSystemFactory.create_manager(
-            storage_handler=storage_handler,
-            config_service=config_service,
-            llm_orchestrator=llm_orchestrator,
+    try:
+        storage_handler = StorageHandlerFactory.create_handler(
+            path_str,
+            credentials=user_credentials,
+            cache_dir=config_service.config_dir / "drive_cache",
+        )
+        logger.info(
+            f"Handler de Storage criado: {type(storage_handler).__name__} para {path_str}"
+        )
+    except ValueError as e:
+        logger.error(f"Falha ao criar handler de storage: {e}")
+        raise HTTPException(
+            status_code=500, detail=f"Erro de configuração de storage: {str(e)}"
         )
 
-        # Debug:
-        logger.warning(f"Novo Manager Criado e C acheado para {cache_key}")
-        _managers_cache[cache_key] = manager
+    # 4. Usa a Factory existente para montar tudo (Repositories, Services, Context)
+    llm_orchestrator = get_llm_orchestrator(config_service)
+    manager = FinancialSystemFactory.create_manager(
+        storage_handler=storage_handler,
+        config_service=config_service,
+        llm_orchestrator=llm_orchestrator,
+    )
 
-        return manager
+    logger.warning(f"Novo Manager Criado e Cacheado para {cache_key}")
+    return manager
 
 
-import config  # noqa: E402
 from core.llm_enums import LLMProviderType  # noqa: E402
 from core.llm_factory import LLMProviderFactory  # noqa: E402
 
@@ -302,8 +374,16 @@ def get_llm_orchestrator(
 
 
 # --- CACHE DE AGENTES ---
-# Mapeia user_id -> AgentRunner
-_agents_cache: dict[str, AgentRunner] = {}
+# Mapeia user_id -> (PlanilhaManager usado, AgentRunner), com os mesmos
+# limites de quantidade/ociosidade. O agente só é reaproveitado enquanto o
+# manager em cache for o mesmo com que ele foi montado.
+_agents_cache: BoundedLRUCache[str, tuple[PlanilhaManager, AgentRunner]] = (
+    BoundedLRUCache(
+        name="agents",
+        max_entries=config.MANAGER_CACHE_MAX_ENTRIES,
+        idle_ttl_seconds=config.MANAGER_CACHE_IDLE_TTL_SECONDS,
+    )
+)
 
 
 def get_agent_runner(
@@ -317,8 +397,12 @@ def get_agent_runner(
     """
     user_id = config_service.username
 
-    if user_id in _agents_cache:
-        return _agents_cache[user_id]
+    cached = _agents_cache.get(user_id)
+    if cached is not None:
+        cached_manager, cached_agent = cached
+        if cached_manager is plan_manager:
+            return cached_agent
+        logger.info(f"Manager de '{user_id}' foi recriado. Remontando o agente.")
 
     logger.info(f"Criando Novo Agente para user='{user_id}'")
     try:
@@ -334,7 +418,10 @@ def get_agent_runner(
                 status_code=500, detail="Falha ao criar Agente Financeiro."
             )
 
-        _agents_cache[user_id] = agent
+        if cached is not None:
+            # Mantém a conversa em andamento ao trocar o manager
+            agent.chat_history = cached[1].chat_history
+        _agents_cache.set(user_id, (plan_manager, agent))
         return agent
     except Exception as e:
         logger.error(f"Erro ao inicializar agente na API: {e}")
@@ -394,7 +481,11 @@ def get_rule_repository(
 from initialization.onboarding.orchestrator import OnboardingOrchestrator  # noqa: E402
 
 # --- CACHE DE ONBOARDING ---
-_onboarding_cache: dict[str, OnboardingOrchestrator] = {}
+_onboarding_cache: BoundedLRUCache[str, OnboardingOrchestrator] = BoundedLRUCache(
+    name="onboarding",
+    max_entries=config.MANAGER_CACHE_MAX_ENTRIES,
+    idle_ttl_seconds=config.MANAGER_CACHE_IDLE_TTL_SECONDS,
+)
 
 
 def get_onboarding_orchestrator(
@@ -404,12 +495,33 @@ def get_onboarding_orchestrator(
     """Retorna o orquestrador de onboarding (Stateful per session/user)."""
     user_id = config_service.username
 
-    if user_id not in _onboarding_cache:
+    def _create() -> OnboardingOrchestrator:
         logger.info(f"Criando Novo Onboarding Orchestrator para user='{user_id}'")
-        orchestrator = OnboardingOrchestrator(config_service, llm_orchestrator)
-        _onboarding_cache[user_id] = orchestrator
-
-    return _onboarding_cache[user_id]
+        return OnboardingOrchestrator(config_service, llm_orchestrator)
+
+    return _onboarding_cache.get_or_create(user_id, _create)
+
+
+def close_cached_systems() -> None:
+    """Descarrega todos os caches, gravando pendências dos managers."""
+    for cache in (_managers_cache, _agents_cache, _onboarding_cache):
+        cache.clear()
+    wait_pending_closes()
+    close_cache_service()
+
+
+def get_cache_metrics() -> dict[str, dict]:
+    """Métricas dos caches em memória (hits, misses, remoções, bytes)."""
+    sweep_cached_systems()
+    return {
+        "managers": _managers_cache.metrics(),
+        "agents": _agents_cache.metrics(),
+        "onboarding": _onboarding_cache.metrics(),
+        "dataframes_l1": get_cache_service().metrics(),
+        "embeddings": get_embedding_cache().metrics(),
+        "user_configs": get_user_config_cache().metrics(),
+        "drive_metadata": drive_metadata_cache.metrics(),
+    }
 
 
 # --- EMAIL ---
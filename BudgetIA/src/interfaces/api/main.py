@@ -1,3 +1,4 @@
+import asyncio
 import os
 
 import uvicorn
@@ -107,6 +108,10 @@ api_router.include_router(mcp_router.router)  # <--- Novo
 app.include_router(api_router)
 
 
+# Varredura periódica dos caches de managers (ver startup_event)
+_sweep_task: asyncio.Task | None = None
+
+
 @app.on_event("startup")
 async def startup_event():
     import logging
@@ -123,6 +128,37 @@ async def startup_event():
         "Sistema Log de Acessos configurado: Filtros ativos para /pwa e /assets."
     )
 
+    # Sem a varredura, managers ociosos só expirariam no próximo acesso
+    global _sweep_task
+    _sweep_task = asyncio.create_task(_sweep_caches_periodically())
+
+
+async def _sweep_caches_periodically() -> None:
+    """Varre os caches de managers/agentes a cada MANAGER_CACHE_SWEEP_SECONDS."""
+    import config
+    from core.logger import app_logger
+    from interfaces.api.dependencies import sweep_cached_systems
+
+    while True:
+        await asyncio.sleep(config.MANAGER_CACHE_SWEEP_SECONDS)
+        try:
+            # Estimar a memória dos managers é síncrono: fora do event loop
+            await asyncio.to_thread(sweep_cached_systems)
+        except Exception as e:
+            app_logger.error(f"Erro na varredura dos caches: {e}")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Grava pendências e libera conexões dos managers em cache."""
+    from core.ha_auth_service import close_ha_http_client
+    from interfaces.api.dependencies import close_cached_systems
+
+    if _sweep_task is not None:
+        _sweep_task.cancel()
+    close_cached_systems()
+    await close_ha_http_client()
+
 
 if __name__ == "__main__":
     # Permite rodar diretamente via 'python src/api/main.py'
@@ -3,7 +3,7 @@ from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
-from interfaces.api.dependencies import get_current_user
+from interfaces.api.dependencies import get_cache_metrics, get_current_user
 from interfaces.api.utils.jwt import create_access_token
 from interfaces.api.utils.security import get_user, load_users, save_users
 
@@ -240,7 +240,7 @@ def send_broadcast(req: BroadcastRequest, admin: dict = Depends(verify_admin_rol
     for username in targets:
         try:
             # Instantiate services for specific user
-            config_service = UserConfigService(username)
+            config_service = UserConfigService.for_user(username)
             push_service = PushNotificationService(
                 config_service.config_dir
             )  # Reusing dependency logic
@@ -298,3 +298,9 @@ def send_broadcast(req: BroadcastRequest, admin: dict = Depends(verify_admin_rol
         "emails_sent": email_count,
         "banner_active": req.is_system_banner,
     }
+
+
+@router.get("/cache-metrics")
+def cache_metrics(admin: dict = Depends(verify_admin_role)) -> dict[str, dict]:
+    """Métricas dos caches em memória (managers, agentes e onboarding)."""
+    return get_cache_metrics()
@@ -11,13 +11,15 @@ router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
 @router.get("/summary")
 def get_summary(
+    month: int | None = None,
+    year: int | None = None,
     manager: PlanilhaManager = Depends(get_planilha_manager),
 ) -> dict[str, float]:
-    """Retorna saldo, receitas e despesas."""
+    """Retorna saldo, receitas e despesas (opcionalmente de um mês/ano)."""
     from config import SummaryKeys
 
     try:
-        res = manager.get_summary_use_case.execute()
+        res = manager.get_summary_use_case.execute(month=month, year=year)
         # Mapeia para as chaves esperadas pelo front
         return {
             SummaryKeys.RECEITAS: res["total_receitas"],
@@ -30,11 +32,38 @@ def get_summary(
 
 @router.get("/expenses_by_category")
 def get_expenses_chart(
-    top_n: int = 5, manager: PlanilhaManager = Depends(get_planilha_manager)
+    top_n: int = 5,
+    month: int | None = None,
+    year: int | None = None,
+    manager: PlanilhaManager = Depends(get_planilha_manager),
 ) -> dict[str, float]:
     """Retorna dados para o gráfico de despesas."""
     try:
-        return manager.get_expenses_by_category_use_case.execute(top_n=top_n)
+        return manager.get_expenses_by_category_use_case.execute(
+            top_n=top_n, month=month, year=year
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/monthly")
+def get_monthly_summary(
+    year: int | None = None,
+    manager: PlanilhaManager = Depends(get_planilha_manager),
+) -> dict[str, dict[str, float]]:
+    """Retorna receitas, despesas e saldo por mês ('AAAA-MM')."""
+    from config import SummaryKeys
+
+    try:
+        res = manager.get_monthly_summary_use_case.execute(year=year)
+        return {
+            periodo: {
+                SummaryKeys.RECEITAS: totais["total_receitas"],
+                SummaryKeys.DESPESAS: totais["total_despesas"],
+                SummaryKeys.SALDO: totais["saldo"],
+            }
+            for periodo, totais in res.items()
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1,4 +1,8 @@
+import contextlib
+import copy
 import os
+import tempfile
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any
@@ -8,39 +12,132 @@ import yaml
 
 import config
 
+_EMPTY_USERS: dict[str, Any] = {"credentials": {"usernames": {}}}
 
-def load_users() -> dict[str, Any]:
-    """Carrega o arquivo users.yaml"""
-    users_path = Path(config.USERS_FILE)
-    if not users_path.exists():
-        return {"credentials": {"usernames": {}}}
 
-    try:
-        with open(users_path) as file:
-            data = yaml.safe_load(file)
-            if not data:
-                return {"credentials": {"usernames": {}}}
+class UserDirectory:
+    """
+    Cópia em memória do users.yaml com índices por username, email e
+    ha_username. O arquivo só é relido quando muda (mtime/tamanho/inode),
+    então as consultas do caminho de autenticação não fazem parsing de YAML.
 
-            # Garante estrutura mínima se o arquivo existir mas estiver parcial
-            if "credentials" not in data:
-                data["credentials"] = {}
-            if "usernames" not in data["credentials"]:
-                data["credentials"]["usernames"] = {}
+    Os dados em cache são somente leitura: as funções públicas devolvem
+    cópias, e alterações passam por save_users() (write-through atômico).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stamp: tuple | None = None
+        self._data: dict[str, Any] = copy.deepcopy(_EMPTY_USERS)
+        self._by_email: dict[str, str] = {}
+        self._by_ha_username: dict[str, str] = {}
 
-            return data
+    @staticmethod
+    def _file_stamp(users_path: Path) -> tuple | None:
+        try:
+            st = users_path.stat()
+        except FileNotFoundError:
+            return None
+        return (str(users_path), st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _current(self) -> "UserDirectory":
+        """Relê o arquivo se ele mudou desde a última leitura."""
+        users_path = Path(config.USERS_FILE)
+        stamp = self._file_stamp(users_path)
+        with self._lock:
+            if stamp is not None and stamp == self._stamp:
+                return self
+            data = _read_users_file(users_path) if stamp else _EMPTY_USERS
+            self._index(copy.deepcopy(data), stamp)
+        return self
+
+    def _index(self, data: dict[str, Any], stamp: tuple | None) -> None:
+        users = data["credentials"]["usernames"]
+        by_email: dict[str, str] = {}
+        by_ha_username: dict[str, str] = {}
+        # setdefault: em duplicatas vale o primeiro, como nas buscas lineares
+        for username, info in users.items():
+            email = (info or {}).get("email") or ""
+            if email:
+                by_email.setdefault(email.lower(), username)
+            ha_username = (info or {}).get("ha_username")
+            if ha_username:
+                by_ha_username.setdefault(ha_username, username)
+        self._data = data
+        self._by_email = by_email
+        self._by_ha_username = by_ha_username
+        self._stamp = stamp
+
+    @property
+    def users(self) -> dict[str, dict[str, Any]]:
+        """Usuários atuais (somente leitura)."""
+        return self._current()._data["credentials"]["usernames"]
+
+    def data(self) -> dict[str, Any]:
+        """Cópia completa do users.yaml (pode ser alterada e salva)."""
+        return copy.deepcopy(self._current()._data)
+
+    def username_by_email(self, email: str) -> str | None:
+        return self._current()._by_email.get(email.lower())
+
+    def username_by_ha_username(self, ha_username: str) -> str | None:
+        return self._current()._by_ha_username.get(ha_username)
+
+    def save(self, data: dict[str, Any]) -> None:
+        """Grava o users.yaml atomicamente e atualiza o cache."""
+        users_path = Path(config.USERS_FILE)
+        # Garante que diretório existe
+        users_path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(
+            dir=users_path.parent, prefix=".users-", suffix=".yaml.tmp"
+        )
+        try:
+            with os.fdopen(fd, "w") as file:
+                yaml.dump(data, file)
+            os.replace(temp_path, users_path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(temp_path)
+            raise
+
+        with self._lock:
+            self._index(
+                _normalize_users(copy.deepcopy(data)), self._file_stamp(users_path)
+            )
+
+
+def _normalize_users(data: dict[str, Any] | None) -> dict[str, Any]:
+    """Garante estrutura mínima se o arquivo existir mas estiver parcial."""
+    if not data:
+        return copy.deepcopy(_EMPTY_USERS)
+    if "credentials" not in data:
+        data["credentials"] = {}
+    if "usernames" not in data["credentials"]:
+        data["credentials"]["usernames"] = {}
+    return data
+
+
+def _read_users_file(users_path: Path) -> dict[str, Any]:
+    try:
+        with open(users_path) as file:
+            return _normalize_users(yaml.safe_load(file))
     except Exception as e:
         print(f"Erro ao carregar users.yaml: {e}")
-        return {"credentials": {"usernames": {}}}
+        return copy.deepcopy(_EMPTY_USERS)
 
 
-def save_users(data: dict[str, Any]) -> None:
-    """Salva dados no users.yaml"""
-    users_path = Path(config.USERS_FILE)
-    # Garante que diretório existe
-    users_path.parent.mkdir(parents=True, exist_ok=True)
+user_directory = UserDirectory()
+
+
+def load_users() -> dict[str, Any]:
+    """Carrega o users.yaml (cópia do cache em memória, validado por mtime)."""
+    return user_directory.data()
+
 
-    with open(users_path, "w") as file:
-        yaml.dump(data, file)
+def save_users(data: dict[str, Any]) -> None:
+    """Salva dados no users.yaml (escrita atômica + atualização do cache)."""
+    user_directory.save(data)
 
 
 def hash_password(password: str) -> str:
@@ -70,9 +167,8 @@ def verify_password(password: str, hashed_password: str) -> bool:
 
 def get_user(username: str) -> dict[str, Any] | None:
     """Busca usuário pelo username exato."""
-    data = load_users()
-    users = data.get("credentials", {}).get("usernames", {})
-    return users.get(username)
+    user = user_directory.users.get(username)
+    return copy.deepcopy(user) if user is not None else None
 
 
 def get_user_by_identifier(identifier: str) -> tuple[str, dict[str, Any]] | None:
@@ -80,22 +176,27 @@ def get_user_by_identifier(identifier: str) -> tuple[str, dict[str, Any]] | None
     Busca usuário por username OU email.
     Retorna tupla (username, user_data) ou None.
     """
-    data = load_users()
-    users = data.get("credentials", {}).get("usernames", {})
-
     # 1. Tenta match exato pelo username (chave)
-    if identifier in users:
-        return identifier, users[identifier]
+    user = get_user(identifier)
+    if user is not None:
+        return identifier, user
 
     # 2. Tenta buscar pelo campo verificado de email
-    lower_id = identifier.lower()
-    for u_name, u_data in users.items():
-        if u_data.get("email", "").lower() == lower_id:
-            return u_name, u_data
+    username = user_directory.username_by_email(identifier)
+    if username is not None:
+        return username, get_user(username) or {}
 
     return None
 
 
+def get_user_by_ha_username(ha_username: str) -> tuple[str, dict[str, Any]] | None:
+    """Busca usuário pelo campo 'ha_username' (Home Assistant)."""
+    username = user_directory.username_by_ha_username(ha_username)
+    if username is None:
+        return None
+    return username, get_user(username) or {}
+
+
 def create_user(username: str, name: str, email: str, password: str) -> bool:
     """Cria novo usuário."""
     data = load_users()
@@ -140,10 +241,9 @@ def set_reset_token(username: str, token: str) -> bool:
 
 def get_user_by_reset_token(token: str) -> tuple[str, dict[str, Any]] | None:
     """Busca user pelo reset token."""
-    data = load_users()
-    for u, info in data.get("credentials", {}).get("usernames", {}).items():
+    for u, info in user_directory.users.items():
         if info.get("reset_token") == token:
-            return u, info
+            return u, copy.deepcopy(info)
     return None
 
 
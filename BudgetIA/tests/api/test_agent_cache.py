@@ -0,0 +1,75 @@
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from interfaces.api import dependencies
+
+
+@pytest.fixture(autouse=True)
+def clean_caches(monkeypatch: pytest.MonkeyPatch):
+    created = []
+
+    def create_agent(llm_orchestrator, plan_manager, config_service):
+        agent = SimpleNamespace(plan_manager=plan_manager, chat_history=[])
+        created.append(agent)
+        return agent
+
+    monkeypatch.setattr(dependencies.AgentFactory, "create_agent", create_agent)
+    dependencies._agents_cache.clear()
+    yield created
+    dependencies._agents_cache.clear()
+    dependencies._managers_cache.clear()
+    dependencies.wait_pending_closes()
+
+
+def _runner(manager: MagicMock):
+    return dependencies.get_agent_runner(
+        config_service=SimpleNamespace(username="ana"),
+        llm_orchestrator=MagicMock(),
+        plan_manager=manager,
+    )
+
+
+def test_agente_reaproveitado_com_o_mesmo_manager(clean_caches) -> None:
+    manager = MagicMock()
+
+    assert _runner(manager) is _runner(manager)
+    assert len(clean_caches) == 1
+
+
+def test_manager_recriado_remonta_agente_com_historico(clean_caches) -> None:
+    old_agent = _runner(MagicMock())
+    old_agent.chat_history = [{"role": "user", "content": "oi"}]
+
+    new_manager = MagicMock()
+    agent = _runner(new_manager)
+
+    assert agent is not old_agent
+    assert agent.plan_manager is new_manager
+    assert agent.chat_history == [{"role": "user", "content": "oi"}]
+
+
+def test_remover_manager_descarta_o_agente(clean_caches) -> None:
+    manager = MagicMock()
+    dependencies._managers_cache.set("ana:/tmp/planilha.xlsx", manager)
+    _runner(manager)
+
+    dependencies._managers_cache.pop("ana:/tmp/planilha.xlsx")
+    dependencies.wait_pending_closes("ana:/tmp/planilha.xlsx")
+
+    manager.close.assert_called_once()
+    assert dependencies._agents_cache.peek("ana") is None
+
+
+def test_close_do_manager_removido_roda_fora_da_requisicao(clean_caches) -> None:
+    threads = []
+    manager = MagicMock()
+    manager.close.side_effect = lambda: threads.append(threading.current_thread())
+    dependencies._managers_cache.set("ana:/tmp/planilha.xlsx", manager)
+
+    dependencies._managers_cache.pop("ana:/tmp/planilha.xlsx")
+    dependencies.wait_pending_closes()
+
+    assert threads and threads[0] is not threading.current_thread()
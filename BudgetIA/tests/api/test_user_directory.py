@@ -0,0 +1,79 @@
+import os
+from pathlib import Path
+
+import pytest
+import yaml
+
+import config
+from core.ha_auth_service import resolve_ha_user_to_budgetia
+from interfaces.api.utils import security
+
+
+@pytest.fixture
+def users_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "users.yaml"
+    path.write_text(
+        yaml.dump(
+            {
+                "credentials": {
+                    "usernames": {
+                        "ana": {"email": "Ana@Mail.com", "role": "admin"},
+                        "bia": {"email": "bia@mail.com", "ha_username": "bia_ha"},
+                    }
+                }
+            }
+        )
+    )
+    monkeypatch.setattr(config, "USERS_FILE", str(path))
+    return path
+
+
+def test_consultas_nao_releem_arquivo_inalterado(
+    users_file: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    security.get_user("ana")
+    leituras = []
+    original = security._read_users_file
+    monkeypatch.setattr(
+        security,
+        "_read_users_file",
+        lambda path: leituras.append(path) or original(path),
+    )
+
+    assert security.get_user("ana")["role"] == "admin"
+    assert security.get_user_by_identifier("ana@mail.com")[0] == "ana"
+    assert security.get_user_by_ha_username("bia_ha")[0] == "bia"
+    assert resolve_ha_user_to_budgetia("bia_ha") == "bia"
+    assert leituras == []
+
+
+def test_recarrega_quando_arquivo_muda(users_file: Path) -> None:
+    assert security.get_user("carlos") is None
+
+    data = yaml.safe_load(users_file.read_text())
+    data["credentials"]["usernames"]["carlos"] = {"email": "c@mail.com"}
+    users_file.write_text(yaml.dump(data))
+    # Garante mtime diferente mesmo em sistemas de arquivos com baixa resolução
+    stat = users_file.stat()
+    os.utime(users_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert security.get_user_by_identifier("C@mail.com")[0] == "carlos"
+
+
+def test_copias_retornadas_nao_alteram_cache(users_file: Path) -> None:
+    security.get_user("ana")["role"] = "user"
+    security.load_users()["credentials"]["usernames"].pop("bia")
+
+    assert security.get_user("ana")["role"] == "admin"
+    assert security.get_user("bia") is not None
+
+
+def test_save_users_grava_atomicamente_e_atualiza_indices(users_file: Path) -> None:
+    data = security.load_users()
+    data["credentials"]["usernames"]["bia"]["ha_username"] = "bia_casa"
+    security.save_users(data)
+
+    assert security.get_user_by_ha_username("bia_ha") is None
+    assert security.get_user_by_ha_username("bia_casa")[0] == "bia"
+    assert yaml.safe_load(users_file.read_text()) == data
+    assert [p.name for p in users_file.parent.iterdir()] == ["users.yaml"]
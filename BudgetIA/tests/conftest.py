@@ -78,10 +78,10 @@ def plan_manager_para_ferramentas(
             "finance.domain.services.budget_service.BudgetDomainService.recalculate_budgets",
             return_value=None,
         ),
-        patch("finance.factory.RedisCacheService") as mock_redis_service,
+        patch("finance.factory.get_cache_service") as mock_cache_service,
     ):
-        # Configura o mock do Redis para evitar erros
-        mock_instance = mock_redis_service.return_value
+        # Configura o mock do cache para evitar Redis real
+        mock_instance = mock_cache_service.return_value
         mock_instance.get_entry.return_value = (None, None)
         mock_instance.set_entry.return_value = True
 
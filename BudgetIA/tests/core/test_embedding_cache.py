@@ -0,0 +1,55 @@
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.embeddings.embedding_cache import EmbeddingCache
+from core.embeddings.embedding_service import EmbeddingService
+from infrastructure.caching.redis_cache_service import RedisCacheService
+from tests.infrastructure.test_redis_cache_service import FakeRedis
+
+
+@pytest.fixture
+def db_path(tmp_path: Path) -> str:
+    return str(tmp_path / "embeddings.sqlite")
+
+
+def test_persiste_no_sqlite_entre_instancias(db_path: str) -> None:
+    EmbeddingCache(db_path).set("m1", "Mercado  Extra", [0.5, 0.25])
+
+    cache = EmbeddingCache(db_path)
+
+    assert cache.get("m1", "mercado extra") == [0.5, 0.25]
+    assert cache.get("m2", "mercado extra") is None
+    assert cache.metrics() == {
+        "hits": 1,
+        "redis_hits": 0,
+        "misses": 1,
+        "hit_rate": 0.5,
+    }
+
+
+def test_compartilha_vetores_via_redis(tmp_path: Path) -> None:
+    l2 = RedisCacheService()
+    l2.redis_client = FakeRedis()
+    l2.enabled = True
+    EmbeddingCache(str(tmp_path / "a.sqlite"), redis_cache=l2).set("m", "Uber", [1.0])
+
+    other = EmbeddingCache(str(tmp_path / "b.sqlite"), redis_cache=l2)
+
+    assert other.get_many("m", ["uber", "99"]) == {"uber": [1.0]}
+    assert other.metrics()["redis_hits"] == 1
+    # O vetor vindo do Redis passa a ficar também no SQLite local
+    assert EmbeddingCache(str(tmp_path / "b.sqlite")).get("m", "uber") == [1.0]
+
+
+def test_embedding_service_so_chama_api_no_miss(db_path: str) -> None:
+    service = EmbeddingService(api_key="sk-test", cache=EmbeddingCache(db_path))
+    service.client = MagicMock()
+    service.client.embeddings.create.return_value.data = [MagicMock(embedding=[0.5])]
+
+    assert service.get_embedding("Padaria") == [0.5]
+    assert service.get_embedding("padaria ") == [0.5]
+
+    service.client.embeddings.create.assert_called_once()
+    assert service.cache.metrics()["hits"] == 1
@@ -0,0 +1,89 @@
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from core.embeddings import embedding_service as embedding_module
+from core.embeddings.embedding_cache import EmbeddingCache
+from core.embeddings.embedding_service import EmbeddingService
+
+
+class FakeEmbeddingsAPI:
+    """Provedor local: devolve [len(texto), 1.0] e conta as chamadas."""
+
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+        self._lock = threading.Lock()
+
+    def create(self, input: list[str], model: str) -> SimpleNamespace:
+        with self._lock:
+            self.batches.append(list(input))
+        # Respostas fora de ordem: o serviço deve ordenar pelo índice
+        data = [
+            SimpleNamespace(index=i, embedding=[float(len(text)), 1.0])
+            for i, text in enumerate(input)
+        ]
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+@pytest.fixture
+def fake_api() -> FakeEmbeddingsAPI:
+    return FakeEmbeddingsAPI()
+
+
+@pytest.fixture
+def service(fake_api: FakeEmbeddingsAPI) -> EmbeddingService:
+    service = EmbeddingService(api_key="sk-test")
+    service.client = SimpleNamespace(embeddings=fake_api)
+    return service
+
+
+def test_get_embeddings_deduplica_e_preserva_ordem(
+    service: EmbeddingService, fake_api: FakeEmbeddingsAPI
+) -> None:
+    vectors = service.get_embeddings(["Uber", "", "Mercado", "Uber\n", None])
+
+    assert vectors == [[4.0, 1.0], [], [7.0, 1.0], [4.0, 1.0], []]
+    assert fake_api.batches == [["Uber", "Mercado"]]
+
+
+def test_get_embeddings_divide_no_limite_do_provedor(
+    service: EmbeddingService,
+    fake_api: FakeEmbeddingsAPI,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(embedding_module, "OPENAI_BATCH_LIMIT", 3)
+    texts = [f"texto {i}" for i in range(8)]
+
+    vectors = service.get_embeddings(texts)
+
+    assert sorted(len(batch) for batch in fake_api.batches) == [2, 3, 3]
+    assert vectors == [[float(len(t)), 1.0] for t in texts]
+
+
+def test_get_embeddings_so_envia_o_que_falta_no_cache(
+    service: EmbeddingService, fake_api: FakeEmbeddingsAPI, tmp_path: Path
+) -> None:
+    service.cache = EmbeddingCache(str(tmp_path / "emb.sqlite"))
+    service.get_embeddings(["Uber", "Mercado"])
+
+    service.get_embeddings(["uber", "Padaria", "MERCADO"])
+
+    assert fake_api.batches == [["Uber", "Mercado"], ["Padaria"]]
+
+
+def test_vetores_do_fallback_nao_entram_no_cache(
+    service: EmbeddingService, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    service.cache = EmbeddingCache(str(tmp_path / "emb.sqlite"))
+    monkeypatch.setattr(
+        service,
+        "_embed_chunk",
+        lambda chunk: ([[1.0, 2.0, 3.0] for _ in chunk], service.gemini_model),
+    )
+
+    assert service.get_embeddings(["Uber"]) == [[1.0, 2.0, 3.0]]
+
+    assert service.cache.get_many(service.active_model, ["Uber"]) == {}
+    assert service.cache.get_many(service.gemini_model, ["Uber"]) == {}
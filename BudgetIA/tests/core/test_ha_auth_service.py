@@ -0,0 +1,76 @@
+import httpx
+import pytest
+
+import config
+from core import ha_auth_service
+from core.ha_auth_service import validate_ha_token
+
+TOKEN_VALIDO = "token-valido"
+
+
+class FakeHACore:
+    """Endpoint local do HA: aceita só TOKEN_VALIDO e conta as chamadas."""
+
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+        self.fail_network = False
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append(str(request.url))
+        if self.fail_network:
+            raise httpx.ConnectError("HA fora do ar", request=request)
+        if request.headers["Authorization"] == f"Bearer {TOKEN_VALIDO}":
+            return httpx.Response(200, json={"location_name": "Casa"})
+        return httpx.Response(401)
+
+
+@pytest.fixture
+def fake_core(monkeypatch: pytest.MonkeyPatch) -> FakeHACore:
+    core = FakeHACore()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(core))
+    monkeypatch.setattr(ha_auth_service, "SUPERVISOR_TOKEN", "supervisor")
+    monkeypatch.setattr(ha_auth_service, "_get_http_client", lambda: client)
+    ha_auth_service.clear_ha_token_cache()
+    yield core
+    ha_auth_service.clear_ha_token_cache()
+
+
+@pytest.mark.asyncio
+async def test_token_valido_so_consulta_o_ha_uma_vez(fake_core: FakeHACore) -> None:
+    for _ in range(5):
+        user = await validate_ha_token(TOKEN_VALIDO)
+        assert user is not None and user.is_admin
+
+    assert fake_core.calls == ["http://172.30.32.1:8123/api/config"]
+
+
+@pytest.mark.asyncio
+async def test_token_recusado_fica_em_cache_negativo(
+    fake_core: FakeHACore,
+) -> None:
+    assert await validate_ha_token("token-invalido") is None
+    assert await validate_ha_token("token-invalido") is None
+
+    # IP direto + proxy do Supervisor, só na primeira vez
+    assert len(fake_core.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_expira_apos_ttl(
+    fake_core: FakeHACore, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(config, "HA_TOKEN_CACHE_TTL_SECONDS", 0)
+
+    await validate_ha_token(TOKEN_VALIDO)
+    await validate_ha_token(TOKEN_VALIDO)
+
+    assert len(fake_core.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_falha_de_rede_nao_e_cacheada(fake_core: FakeHACore) -> None:
+    fake_core.fail_network = True
+    assert await validate_ha_token(TOKEN_VALIDO) is None
+
+    fake_core.fail_network = False
+    assert await validate_ha_token(TOKEN_VALIDO) is not None
@@ -3,7 +3,8 @@ from pathlib import Path
 import pytest
 
 from src import config
-from src.core.user_config_service import UserConfigService
+from src.core import user_config_service as user_config_module
+from src.core.user_config_service import UserConfigService, get_user_config_cache
 
 # A fixture 'mock_env_and_config' de conftest.py será usada automaticamente
 
@@ -135,3 +136,47 @@ def test_clear_config_resets_onboarding_but_keeps_identity(
 
     # 7. Verificar se a chave de identidade foi MANTIDA
     assert cleaned_config["google_oauth_tokens"] == "token_secreto_do_google"
+
+
+def test_load_config_descriptografa_uma_vez_entre_instancias(
+    service: UserConfigService,
+) -> None:
+    """Instâncias do mesmo usuário compartilham o config já descriptografado."""
+    service.save_config({"comunicacao": {"telegram_chat_id": 1}})
+    cache = get_user_config_cache()
+    decrypts = cache.decrypts
+
+    for _ in range(3):
+        UserConfigService("test_user").load_config()
+
+    assert cache.decrypts == decrypts
+
+
+def test_load_config_rele_quando_arquivo_muda_fora_do_processo(
+    service: UserConfigService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # O módulo usa o 'config' de nível superior (não o 'src.config')
+    monkeypatch.setattr(
+        user_config_module.config, "USER_CONFIG_STAT_INTERVAL_SECONDS", 0
+    )
+    service.save_config({"versao": 1})
+    other = UserConfigService("test_user")
+    encrypted = other._encrypt_data('{"versao": 2, "extra": true}')
+    service.config_file_path.write_bytes(encrypted)
+
+    assert service.load_config() == {"versao": 2, "extra": True}
+
+
+def test_alterar_retorno_de_load_config_nao_afeta_cache(
+    service: UserConfigService,
+) -> None:
+    service.save_config({"comunicacao": {"telegram_chat_id": 1}})
+
+    service.load_config()["comunicacao"]["telegram_chat_id"] = 99
+
+    assert service.get_comunicacao_config() == {"telegram_chat_id": 1}
+
+
+def test_for_user_reaproveita_instancia() -> None:
+    assert UserConfigService.for_user("ana") is UserConfigService.for_user("ana")
+    assert UserConfigService.for_user("ana") is not UserConfigService.for_user("bia")
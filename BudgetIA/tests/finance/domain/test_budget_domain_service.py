@@ -5,6 +5,7 @@ import pytest
 
 from finance.domain.models.budget import Budget
 from finance.domain.models.transaction import Transaction
+from finance.domain.services import budget_service
 from finance.domain.services.budget_service import BudgetDomainService
 
 
@@ -22,30 +23,8 @@ def test_recalculate_budgets_sums_correctly(mock_repos):
         Budget(categoria="Alimentação", limite=1000.0, gasto_atual=0.0)
     ]
 
-    # Transações: 2 de Alimentação (150 + 50) e 1 de Lazer (100)
-    mock_tx_repo.list_all.return_value = [
-        Transaction(
-            data=date(2024, 1, 1),
-            tipo="Despesa",
-            categoria="Alimentação",
-            descricao="A",
-            valor=150.0,
-        ),
-        Transaction(
-            data=date(2024, 1, 1),
-            tipo="Despesa",
-            categoria="Alimentação",
-            descricao="B",
-            valor=50.0,
-        ),
-        Transaction(
-            data=date(2024, 1, 1),
-            tipo="Despesa",
-            categoria="Lazer",
-            descricao="C",
-            valor=100.0,
-        ),
-    ]
+    # Despesas agregadas: Alimentação (150 + 50) e Lazer (100)
+    mock_tx_repo.sum_by.return_value = {"Alimentação": 200.0, "Lazer": 100.0}
 
     service = BudgetDomainService(mock_budget_repo, mock_tx_repo)
     service.recalculate_budgets(month=1, year=2024)
@@ -55,6 +34,8 @@ def test_recalculate_budgets_sums_correctly(mock_repos):
     assert saved_budget.categoria == "Alimentação"
     assert saved_budget.gasto_atual == 200.0
     assert saved_budget.percentual_gasto == 20.0
+    _, kwargs = mock_tx_repo.sum_by.call_args
+    assert kwargs == {"tipo": "Despesa", "month": 1, "year": 2024}
 
 
 def test_recalculate_budgets_handles_no_transactions(mock_repos):
@@ -64,7 +45,7 @@ def test_recalculate_budgets_handles_no_transactions(mock_repos):
     mock_budget_repo.list_all.return_value = [
         Budget(categoria="Alimentação", limite=1000.0, gasto_atual=500.0)
     ]
-    mock_tx_repo.list_all.return_value = []  # Nenhuma transação
+    mock_tx_repo.sum_by.return_value = {}  # Nenhuma transação
 
     service = BudgetDomainService(mock_budget_repo, mock_tx_repo)
     service.recalculate_budgets(month=1, year=2024)
@@ -88,3 +69,136 @@ def test_add_or_update_budget_logic(mock_repos):
     saved_budget = mock_budget_repo.save.call_args[0][0]
     assert saved_budget.id == 1
     assert saved_budget.limite == 800.0
+
+
+def _despesa(categoria: str, valor: float, dia: date) -> Transaction:
+    return Transaction(
+        data=dia, tipo="Despesa", categoria=categoria, descricao="X", valor=valor
+    )
+
+
+@pytest.fixture
+def versao():
+    """Revisão da aba de transações, como o data context a expõe."""
+    return {"atual": 0}
+
+
+def _servico(mock_repos, versao) -> BudgetDomainService:
+    mock_budget_repo, mock_tx_repo = mock_repos
+    return BudgetDomainService(
+        mock_budget_repo, mock_tx_repo, transactions_version=lambda: versao["atual"]
+    )
+
+
+def _gravar(service: BudgetDomainService, versao: dict) -> int:
+    """Simula a escrita da transação pelo caso de uso: devolve a versão base."""
+    base = service.transactions_version()
+    versao["atual"] += 1
+    return base
+
+
+def test_apply_transaction_change_ajusta_so_a_categoria(mock_repos, versao):
+    """Testa o ajuste incremental (O(1)) no período já refletido."""
+    mock_budget_repo, mock_tx_repo = mock_repos
+    budget = Budget(categoria="Lazer", limite=500.0, gasto_atual=0.0)
+    mock_budget_repo.list_all.return_value = [budget]
+    mock_budget_repo.get_by_category.return_value = budget
+    mock_tx_repo.sum_by.return_value = {"Lazer": 100.0}
+
+    service = _servico(mock_repos, versao)
+    service.recalculate_budgets(month=1, year=2024)
+    mock_tx_repo.sum_by.reset_mock()
+    mock_budget_repo.save.reset_mock()
+
+    antiga = _despesa("Lazer", 40.0, date(2024, 1, 5))
+    nova = _despesa("Lazer", 70.0, date(2024, 1, 5))
+    service.apply_transaction_change(
+        antiga, nova, base_version=_gravar(service, versao)
+    )
+
+    assert budget.gasto_atual == 130.0
+    mock_budget_repo.save.assert_called_once_with(budget)
+    mock_tx_repo.sum_by.assert_not_called()
+
+
+def test_apply_transaction_change_recalcula_outro_periodo(mock_repos):
+    """Testa o recálculo completo quando a transação é de outro mês."""
+    mock_budget_repo, mock_tx_repo = mock_repos
+    mock_budget_repo.list_all.return_value = [
+        Budget(categoria="Lazer", limite=500.0, gasto_atual=0.0)
+    ]
+    mock_tx_repo.sum_by.return_value = {"Lazer": 80.0}
+
+    service = BudgetDomainService(mock_budget_repo, mock_tx_repo)
+    service.apply_transaction_change(None, _despesa("Lazer", 80.0, date(2024, 2, 1)))
+
+    _, kwargs = mock_tx_repo.sum_by.call_args
+    assert (kwargs["month"], kwargs["year"]) == (2, 2024)
+    assert mock_budget_repo.save.call_args[0][0].gasto_atual == 80.0
+
+
+def test_apply_transaction_change_confere_periodicamente(
+    mock_repos, versao, monkeypatch
+):
+    """Testa a conferência completa após N ajustes incrementais."""
+    monkeypatch.setattr(budget_service, "FULL_RECALC_EVERY", 1)
+    mock_budget_repo, mock_tx_repo = mock_repos
+    mock_budget_repo.list_all.return_value = [Budget(categoria="Lazer", limite=1.0)]
+    mock_budget_repo.get_by_category.return_value = None
+    mock_tx_repo.sum_by.return_value = {}
+
+    service = _servico(mock_repos, versao)
+    service.recalculate_budgets(month=1, year=2024)
+    tx = _despesa("Lazer", 10.0, date(2024, 1, 2))
+    service.apply_transaction_change(None, tx, base_version=_gravar(service, versao))
+    assert mock_tx_repo.sum_by.call_count == 1
+
+    service.apply_transaction_change(None, tx, base_version=_gravar(service, versao))
+    assert mock_tx_repo.sum_by.call_count == 2
+
+
+def test_apply_transaction_change_recalcula_apos_escrita_externa(mock_repos, versao):
+    """Testa que uma escrita na aba fora dos casos de uso invalida os totais."""
+    mock_budget_repo, mock_tx_repo = mock_repos
+    mock_budget_repo.list_all.return_value = [Budget(categoria="Lazer", limite=1.0)]
+    mock_tx_repo.sum_by.return_value = {}
+
+    service = _servico(mock_repos, versao)
+    service.recalculate_budgets(month=1, year=2024)
+    tx = _despesa("Lazer", 10.0, date(2024, 1, 2))
+    service.apply_transaction_change(None, tx, base_version=_gravar(service, versao))
+    assert mock_tx_repo.sum_by.call_count == 1
+
+    versao["atual"] += 1  # ex.: faxina recategorizando transações
+    service.apply_transaction_change(None, tx, base_version=_gravar(service, versao))
+    assert mock_tx_repo.sum_by.call_count == 2
+
+
+def test_apply_transaction_change_mantem_totais_por_periodo(mock_repos, versao):
+    """Testa que alternar entre meses usa os totais de cada um, sem recálculo."""
+    mock_budget_repo, mock_tx_repo = mock_repos
+    budget = Budget(categoria="Lazer", limite=500.0, gasto_atual=0.0)
+    mock_budget_repo.list_all.return_value = [budget]
+    mock_budget_repo.get_by_category.return_value = budget
+    mock_tx_repo.sum_by.side_effect = [{"Lazer": 100.0}, {"Lazer": 20.0}]
+
+    service = _servico(mock_repos, versao)
+    service.recalculate_budgets(month=1, year=2024)
+    fevereiro = _despesa("Lazer", 5.0, date(2024, 2, 3))
+    janeiro = _despesa("Lazer", 10.0, date(2024, 1, 3))
+
+    # Fevereiro nunca foi calculado: recálculo completo (já inclui a nova)
+    service.apply_transaction_change(
+        None, fevereiro, base_version=_gravar(service, versao)
+    )
+    assert budget.gasto_atual == 20.0
+
+    service.apply_transaction_change(
+        None, janeiro, base_version=_gravar(service, versao)
+    )
+    assert budget.gasto_atual == 110.0
+    service.apply_transaction_change(
+        None, fevereiro, base_version=_gravar(service, versao)
+    )
+    assert budget.gasto_atual == 25.0
+    assert mock_tx_repo.sum_by.call_count == 2
@@ -0,0 +1,66 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from finance.domain.models.category import Category
+from finance.domain.services.semantic_category_service import SemanticCategoryService
+
+VETORES = {
+    "Alimentação": [1.0, 0.0, 0.0],
+    "Transporte": [0.0, 1.0, 0.0],
+    "Salário": [0.0, 0.0, 1.0],
+    "mercado": [0.9, 0.1, 0.0],
+    "uber": [0.1, 2.0, 0.0],
+    "aleatório": [-1.0, -1.0, 0.0],
+    "pagamento": [0.0, 0.2, 0.8],
+}
+
+
+@pytest.fixture
+def embedding_service() -> MagicMock:
+    service = MagicMock()
+    service.get_embeddings.side_effect = lambda texts: [
+        VETORES.get(text, []) for text in texts
+    ]
+    return service
+
+
+@pytest.fixture
+def service(embedding_service: MagicMock) -> SemanticCategoryService:
+    repo = MagicMock()
+    repo.list_all.return_value = [
+        Category(name="Alimentação", type="Despesa"),
+        Category(name="Transporte", type="Despesa"),
+        Category(name="Salário", type="Receita"),
+    ]
+    return SemanticCategoryService(embedding_service, repo)
+
+
+def test_suggest_category_escolhe_a_mais_similar_do_tipo(
+    service: SemanticCategoryService,
+) -> None:
+    assert service.suggest_category("mercado").name == "Alimentação"
+    assert service.suggest_category("pagamento", "Receita").name == "Salário"
+
+
+def test_suggest_categories_classifica_em_lote(
+    service: SemanticCategoryService, embedding_service: MagicMock
+) -> None:
+    sugestoes = service.suggest_categories(
+        ["mercado", "uber", "aleatório", "sem embedding"]
+    )
+
+    assert [s.name if s else None for s in sugestoes] == [
+        "Alimentação",
+        "Transporte",
+        None,
+        None,
+    ]
+    # Um lote para as categorias (uma vez só) e um para as descrições
+    assert embedding_service.get_embeddings.call_count == 2
+
+
+def test_suggest_categories_sem_categorias_do_tipo(
+    service: SemanticCategoryService,
+) -> None:
+    assert service.suggest_categories(["mercado"], "Transferência") == [None]
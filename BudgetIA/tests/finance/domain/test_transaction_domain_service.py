@@ -3,7 +3,6 @@ from unittest.mock import MagicMock
 
 import pytest
 
-from finance.domain.models.transaction import Transaction
 from finance.domain.repositories.transaction_repository import ITransactionRepository
 from finance.domain.services.transaction_service import TransactionDomainService
 
@@ -52,31 +51,27 @@ def test_add_transaction_with_installments(mock_repo):
     mock_repo.save_batch.assert_called_once_with(results)
 
 
+def test_add_transactions_uses_single_batch(mock_repo):
+    """Testa se vários registros (com parcelas) viram um único save_batch."""
+    service = TransactionDomainService(mock_repo)
+    base = {
+        "data": date(2024, 1, 10),
+        "tipo": "Despesa",
+        "categoria": "Casa",
+        "descricao": "Sofá",
+        "valor": 100.0,
+    }
+
+    results = service.add_transactions([base, {**base, "parcelas": 3}])
+
+    assert len(results) == 4
+    mock_repo.save_batch.assert_called_once_with(results)
+    mock_repo.save.assert_not_called()
+
+
 def test_get_summary_calculation(mock_repo):
-    """Testa o cálculo de resumo baseado em entidades."""
-    mock_repo.list_all.return_value = [
-        Transaction(
-            data=date(2024, 1, 1),
-            tipo="Receita",
-            categoria="S",
-            descricao="D",
-            valor=1000.0,
-        ),
-        Transaction(
-            data=date(2024, 1, 1),
-            tipo="Despesa",
-            categoria="S",
-            descricao="D",
-            valor=200.0,
-        ),
-        Transaction(
-            data=date(2024, 1, 1),
-            tipo="Despesa",
-            categoria="S",
-            descricao="D",
-            valor=300.0,
-        ),
-    ]
+    """Testa o cálculo de resumo baseado nos totais agregados."""
+    mock_repo.totals.return_value = {"Receita": 1000.0, "Despesa": 500.0}
 
     service = TransactionDomainService(mock_repo)
     summary = service.get_summary()
@@ -84,3 +79,35 @@ def test_get_summary_calculation(mock_repo):
     assert summary["total_receitas"] == 1000.0
     assert summary["total_despesas"] == 500.0
     assert summary["saldo"] == 500.0
+    mock_repo.list_all.assert_not_called()
+
+
+def test_get_expenses_by_category_top_n(mock_repo):
+    """Testa se as categorias de despesa são ordenadas e cortadas em top N."""
+    mock_repo.sum_by.return_value = {"A": 10.0, "B": 30.0, "C": 20.0}
+
+    service = TransactionDomainService(mock_repo)
+    result = service.get_expenses_by_category(top_n=2)
+
+    assert result == {"B": 30.0, "C": 20.0}
+    mock_repo.sum_by.assert_called_once_with(
+        ITransactionRepository.GROUP_CATEGORIA, tipo="Despesa", month=None, year=None
+    )
+
+
+def test_get_monthly_summary(mock_repo):
+    """Testa o resumo mensal a partir das somas por mês."""
+    mock_repo.sum_by.side_effect = [
+        {"2024-01": 1200.0, "2024-02": 300.0},  # todos os tipos
+        {"2024-01": 200.0, "2024-02": 300.0},  # apenas despesas
+    ]
+
+    service = TransactionDomainService(mock_repo)
+    monthly = service.get_monthly_summary(year=2024)
+
+    assert monthly["2024-01"] == {
+        "total_receitas": 1000.0,
+        "total_despesas": 200.0,
+        "saldo": 800.0,
+    }
+    assert monthly["2024-02"]["saldo"] == -300.0
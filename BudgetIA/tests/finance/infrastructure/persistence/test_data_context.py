@@ -0,0 +1,350 @@
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+import config
+from finance.infrastructure.persistence import data_context
+from finance.infrastructure.persistence.data_context import FinancialDataContext
+from finance.storage.base_storage_handler import BaseStorageHandler
+from finance.storage.excel_storage_handler import ExcelStorageHandler
+from finance.strategies.default_strategy import DefaultStrategy
+
+
+@pytest.fixture
+def storage() -> MagicMock:
+    handler = MagicMock(spec=BaseStorageHandler)
+    mock_dfs = {
+        aba: pd.DataFrame(columns=colunas)
+        for aba, colunas in config.LAYOUT_PLANILHA.items()
+    }
+    handler.load_sheets.return_value = (mock_dfs, False)
+    handler.get_source_modified_time.return_value = "2025-01-01T00:00:00Z"
+    return handler
+
+
+@pytest.fixture
+def cache() -> MagicMock:
+    cache = MagicMock()
+    cache.get_entry.return_value = (None, None)
+    return cache
+
+
+@pytest.fixture
+def context(storage: MagicMock, cache: MagicMock) -> FinancialDataContext:
+    return FinancialDataContext(
+        storage_handler=storage,
+        strategy=DefaultStrategy(config.LAYOUT_PLANILHA, None),
+        cache_service=cache,
+        cache_key="dfs:test",
+    )
+
+
+def test_get_dataframe_compartilha_buffers_sem_vazar_alteracoes(
+    context: FinancialDataContext,
+) -> None:
+    original = pd.DataFrame({config.ColunasTransacoes.VALOR: [10.0, 20.0]})
+    context.update_dataframe(config.NomesAbas.TRANSACOES, original)
+
+    snapshot = context.get_dataframe(config.NomesAbas.TRANSACOES)
+    assert np.shares_memory(
+        snapshot[config.ColunasTransacoes.VALOR].to_numpy(),
+        original[config.ColunasTransacoes.VALOR].to_numpy(),
+    )
+
+    snapshot.loc[0, config.ColunasTransacoes.VALOR] = 99.0
+
+    df = context.get_dataframe(config.NomesAbas.TRANSACOES)
+    assert df.loc[0, config.ColunasTransacoes.VALOR] == 10.0
+
+
+def test_save_envia_apenas_abas_alteradas(
+    context: FinancialDataContext, storage: MagicMock
+) -> None:
+    df = context.get_dataframe(config.NomesAbas.TRANSACOES)
+    context.update_dataframe(config.NomesAbas.TRANSACOES, df)
+
+    context.save()
+
+    _, kwargs = storage.save_sheets.call_args
+    assert kwargs["dirty_sheets"] == {config.NomesAbas.TRANSACOES}
+    assert context.dirty_sheets == set()
+
+
+def test_save_com_falha_mantem_abas_sujas(
+    context: FinancialDataContext, storage: MagicMock
+) -> None:
+    df = context.get_dataframe(config.NomesAbas.TRANSACOES)
+    context.update_dataframe(config.NomesAbas.TRANSACOES, df)
+    storage.save_sheets.return_value = False
+
+    context.save()
+    assert context.dirty_sheets == {config.NomesAbas.TRANSACOES}
+
+    # O próximo save tenta de novo
+    storage.save_sheets.return_value = True
+    context.save()
+    assert storage.save_sheets.call_count == 2
+    assert context.dirty_sheets == set()
+
+
+def test_save_sem_alteracoes_nao_toca_no_storage(
+    context: FinancialDataContext, storage: MagicMock
+) -> None:
+    context.save()
+
+    storage.save_sheets.assert_not_called()
+
+
+def test_reload_descarta_abas_sujas(
+    context: FinancialDataContext, storage: MagicMock
+) -> None:
+    df = context.get_dataframe(config.NomesAbas.ORCAMENTOS)
+    context.update_dataframe(config.NomesAbas.ORCAMENTOS, df)
+
+    context.reload()
+
+    assert context.dirty_sheets == set()
+
+
+def test_save_local_carimba_cache_sem_esperar(
+    context: FinancialDataContext,
+    storage: MagicMock,
+    cache: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        data_context.time, "sleep", MagicMock(side_effect=AssertionError)
+    )
+    storage.metadata_is_immediate = True
+    storage.get_source_modified_time.return_value = "2025-01-02T00:00:00Z"
+    df = context.get_dataframe(config.NomesAbas.TRANSACOES)
+    context.update_dataframe(config.NomesAbas.TRANSACOES, df)
+
+    context.save()
+
+    args, _ = cache.set_entry.call_args
+    assert args[2] == "2025-01-02T00:00:00Z"
+
+
+def test_save_remoto_carimba_cache_apos_poll(
+    context: FinancialDataContext,
+    storage: MagicMock,
+    cache: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(data_context, "VERSION_POLL_INTERVAL_SECONDS", 0)
+    monkeypatch.setattr(context, "_schedule_version_poll", context._poll_source_version)
+    storage.metadata_is_immediate = False
+    storage.get_source_modified_time.side_effect = [
+        "2025-01-01T00:00:00Z",
+        "2025-01-03T00:00:00Z",
+    ]
+    revision_before = context.revision
+    df = context.get_dataframe(config.NomesAbas.METAS)
+    context.update_dataframe(config.NomesAbas.METAS, df)
+
+    context.save()
+
+    assert context.revision > revision_before
+    cache.invalidate.assert_called_once_with("dfs:test")
+    args, _ = cache.set_entry.call_args
+    assert args[2] == "2025-01-03T00:00:00Z"
+
+
+def test_poll_nao_carimba_cache_com_snapshot_de_revisao_velha(
+    context: FinancialDataContext,
+    storage: MagicMock,
+    cache: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(data_context, "VERSION_POLL_INTERVAL_SECONDS", 0)
+    polls = []
+    monkeypatch.setattr(
+        context, "_schedule_version_poll", lambda *args: polls.append(args)
+    )
+    storage.metadata_is_immediate = False
+    storage.get_source_modified_time.return_value = "2025-01-03T00:00:00Z"
+    df = context.get_dataframe(config.NomesAbas.METAS)
+    context.update_dataframe(config.NomesAbas.METAS, df)
+    context.save()
+    cache.set_entry.reset_mock()
+
+    # Nova escrita antes de o poll terminar: o snapshot salvo ficou velho
+    context.update_dataframe(config.NomesAbas.METAS, df)
+    context._poll_source_version(*polls[0])
+
+    cache.set_entry.assert_not_called()
+
+
+def test_poll_consulta_storage_com_o_lock(
+    context: FinancialDataContext,
+    storage: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(data_context, "VERSION_POLL_INTERVAL_SECONDS", 0)
+    holds_lock = []
+
+    def get_source_modified_time() -> str:
+        # Outra thread não consegue pegar o lock enquanto a consulta roda
+        probe = threading.Thread(
+            target=lambda: holds_lock.append(
+                not context._storage_lock.acquire(blocking=False)
+            )
+        )
+        probe.start()
+        probe.join()
+        return "2025-01-03T00:00:00Z"
+
+    storage.get_source_modified_time.side_effect = get_source_modified_time
+    context._poll_source_version({}, context.revision, None, set())
+
+    assert holds_lock == [True]
+
+
+def test_save_grava_linhas_novas_via_append(
+    context: FinancialDataContext, storage: MagicMock
+) -> None:
+    storage.append_rows.return_value = True
+    nova = pd.DataFrame([{config.ColunasTransacoes.ID: 1}])
+
+    context.append_rows(config.NomesAbas.TRANSACOES, nova)
+    context.save()
+
+    args, _ = storage.append_rows.call_args
+    assert args[0] == config.NomesAbas.TRANSACOES
+    assert len(args[1]) == 1
+    storage.save_sheets.assert_not_called()
+    assert len(context.get_dataframe(config.NomesAbas.TRANSACOES)) == 1
+
+
+def test_save_regrava_aba_quando_append_indisponivel(
+    context: FinancialDataContext, storage: MagicMock
+) -> None:
+    storage.append_rows.return_value = False
+    nova = pd.DataFrame([{config.ColunasTransacoes.ID: 1}])
+
+    context.append_rows(config.NomesAbas.TRANSACOES, nova)
+    context.save()
+
+    _, kwargs = storage.save_sheets.call_args
+    assert kwargs["dirty_sheets"] == {config.NomesAbas.TRANSACOES}
+
+
+def test_excel_append_acrescenta_linha_sem_regravar(tmp_path: Path) -> None:
+    file_path = str(tmp_path / "planilha.xlsx")
+    strategy = DefaultStrategy(config.LAYOUT_PLANILHA, None)
+    handler = ExcelStorageHandler(file_path=file_path)
+    dfs, _ = handler.load_sheets(config.LAYOUT_PLANILHA, strategy)
+    handler.save_sheets(dfs, strategy)
+
+    nova = pd.DataFrame(
+        [
+            {
+                config.ColunasTransacoes.ID: 1,
+                config.ColunasTransacoes.DATA: pd.Timestamp("2025-03-10"),
+                config.ColunasTransacoes.TIPO: "Despesa",
+                config.ColunasTransacoes.CATEGORIA: "Lazer",
+                config.ColunasTransacoes.DESCRICAO: "=Cinema",
+                config.ColunasTransacoes.VALOR: 42.5,
+                config.ColunasTransacoes.STATUS: "Concluído",
+            }
+        ]
+    )
+    assert handler.append_rows(config.NomesAbas.TRANSACOES, nova, strategy) is True
+
+    df_salvo = pd.read_excel(file_path, sheet_name=config.NomesAbas.TRANSACOES)
+    assert len(df_salvo) == 1
+    assert df_salvo.iloc[0][config.ColunasTransacoes.VALOR] == 42.5
+    assert df_salvo.iloc[0][config.ColunasTransacoes.DESCRICAO] == "'=Cinema"
+    assert pd.Timestamp(df_salvo.iloc[0][config.ColunasTransacoes.DATA]) == (
+        pd.Timestamp("2025-03-10")
+    )
+
+
+def test_excel_regrava_somente_abas_sujas(tmp_path: Path) -> None:
+    file_path = str(tmp_path / "planilha.xlsx")
+    strategy = DefaultStrategy(config.LAYOUT_PLANILHA, None)
+    handler = ExcelStorageHandler(file_path=file_path)
+    dfs, _ = handler.load_sheets(config.LAYOUT_PLANILHA, strategy)
+    dfs[config.NomesAbas.PERFIL_FINANCEIRO] = pd.DataFrame(
+        {
+            config.ColunasPerfil.CAMPO: ["Renda Mensal Média"],
+            config.ColunasPerfil.VALOR: ["5000"],
+            config.ColunasPerfil.OBS: [""],
+        }
+    )
+    handler.save_sheets(dfs, strategy)
+
+    # Altera a aba de perfil apenas em memória: não deve ir para o disco
+    dfs[config.NomesAbas.PERFIL_FINANCEIRO].loc[0, config.ColunasPerfil.VALOR] = "1"
+    dfs[config.NomesAbas.CATEGORIAS] = pd.DataFrame(
+        {
+            config.ColunasCategorias.NOME: ["Lazer"],
+            config.ColunasCategorias.TIPO: ["Despesa"],
+            config.ColunasCategorias.ICONE: [""],
+            config.ColunasCategorias.TAGS: [""],
+        }
+    )
+    handler.save_sheets(dfs, strategy, dirty_sheets={config.NomesAbas.CATEGORIAS})
+
+    wb = load_workbook(file_path)
+    assert wb.sheetnames == list(config.LAYOUT_PLANILHA.keys())
+    df_perfil = pd.read_excel(file_path, sheet_name=config.NomesAbas.PERFIL_FINANCEIRO)
+    assert str(df_perfil.iloc[0][config.ColunasPerfil.VALOR]) == "5000"
+    df_cats = pd.read_excel(file_path, sheet_name=config.NomesAbas.CATEGORIAS)
+    assert df_cats.iloc[0][config.ColunasCategorias.NOME] == "Lazer"
+
+
+def test_excel_regravar_aba_suja_mantem_formatacao(tmp_path: Path) -> None:
+    file_path = str(tmp_path / "planilha.xlsx")
+    strategy = DefaultStrategy(config.LAYOUT_PLANILHA, None)
+    handler = ExcelStorageHandler(file_path=file_path)
+    dfs, _ = handler.load_sheets(config.LAYOUT_PLANILHA, strategy)
+    dfs[config.NomesAbas.TRANSACOES] = pd.DataFrame(
+        [[1, pd.Timestamp("2025-03-10"), "Despesa", "Lazer", "Cinema", 42.5, "Ok"]],
+        columns=config.LAYOUT_PLANILHA[config.NomesAbas.TRANSACOES],
+    )
+    handler.save_sheets(dfs, strategy, add_intelligence=True)
+
+    assert handler.save_sheets(
+        dfs, strategy, dirty_sheets={config.NomesAbas.TRANSACOES}
+    )
+
+    ws = load_workbook(file_path)[config.NomesAbas.TRANSACOES]
+    assert ws["A1"].font.bold and ws["A1"].alignment.wrap_text
+    assert ws["F2"].number_format == "R$ #,##0.00"
+    assert ws.column_dimensions["F"].width == 15
+
+
+def test_close_grava_pendencias_sem_fechar_cache_compartilhado(
+    context: FinancialDataContext, storage: MagicMock, cache: MagicMock
+) -> None:
+    df = context.get_dataframe(config.NomesAbas.METAS)
+    context.update_dataframe(config.NomesAbas.METAS, df)
+    assert context.has_pending_changes
+
+    context.close()
+
+    storage.save_sheets.assert_called_once()
+    assert not context.has_pending_changes
+    cache.close.assert_not_called()
+
+
+def test_save_regrava_no_cache_somente_abas_alteradas(
+    context: FinancialDataContext, storage: MagicMock, cache: MagicMock
+) -> None:
+    storage.metadata_is_immediate = True
+    _, kwargs = cache.set_entry.call_args
+    assert kwargs["sheets"] == set(config.LAYOUT_PLANILHA)
+
+    df = context.get_dataframe(config.NomesAbas.METAS)
+    context.update_dataframe(config.NomesAbas.METAS, df)
+    context.save()
+
+    _, kwargs = cache.set_entry.call_args
+    assert kwargs["sheets"] == {config.NomesAbas.METAS}
@@ -4,12 +4,15 @@ from unittest.mock import MagicMock
 import pandas as pd
 import pytest
 
+import config
 from config import ColunasTransacoes
 from finance.domain.models.transaction import Transaction
 from finance.infrastructure.persistence.data_context import FinancialDataContext
 from finance.infrastructure.persistence.excel_transaction_repository import (
     ExcelTransactionRepository,
 )
+from finance.storage.base_storage_handler import BaseStorageHandler
+from finance.strategies.default_strategy import DefaultStrategy
 
 
 @pytest.fixture
@@ -45,11 +48,12 @@ def test_save_new_transaction_generates_id(mock_context):
     saved_tx = repo.save(tx)
     assert saved_tx.id == 1
 
-    # Verifica se o context recebeu o DataFrame atualizado
-    args, _ = mock_context.update_dataframe.call_args
-    updated_df = args[1]
-    assert len(updated_df) == 1
-    assert updated_df.iloc[0][ColunasTransacoes.ID] == 1
+    # Verifica se o context recebeu apenas a nova linha (append-only)
+    mock_context.update_dataframe.assert_not_called()
+    args, _ = mock_context.append_rows.call_args
+    new_rows = args[1]
+    assert len(new_rows) == 1
+    assert new_rows.iloc[0][ColunasTransacoes.ID] == 1
 
 
 def test_get_by_id_returns_entity(mock_context):
@@ -94,3 +98,180 @@ def test_delete_transaction(mock_context):
     updated_df = args[1]
     assert len(updated_df) == 1
     assert 10 not in updated_df[ColunasTransacoes.ID].values
+
+
+@pytest.fixture
+def df_historico():
+    return pd.DataFrame(
+        {
+            ColunasTransacoes.ID: [1, 2, 3, None],
+            ColunasTransacoes.DATA: pd.to_datetime(
+                ["2024-01-05", "2024-01-20", "2024-02-01", "2024-01-25"]
+            ),
+            ColunasTransacoes.TIPO: ["Receita", "Despesa", "Despesa", "Despesa"],
+            ColunasTransacoes.CATEGORIA: ["Salário", "Lazer", "Lazer", "Mercado"],
+            ColunasTransacoes.DESCRICAO: [" Job ", "Cinema", "Show", "Feira"],
+            ColunasTransacoes.VALOR: [5000.0, 40.0, 100.0, 60.0],
+            ColunasTransacoes.STATUS: ["Concluído", None, "Pendente", "Concluído"],
+        }
+    )
+
+
+def test_list_all_materializa_em_lote(mock_context, df_historico):
+    """Testa a conversão vetorizada e o filtro de período."""
+    mock_context.get_dataframe.return_value = df_historico
+    repo = ExcelTransactionRepository(mock_context)
+
+    txs = repo.list_all(month=1, year=2024)
+
+    assert [tx.id for tx in txs] == [1, 2, None]
+    assert txs[0].descricao == "Job"
+    assert txs[0].data == date(2024, 1, 5)
+    assert txs[1].status == "Concluído"
+    assert txs[2].model_dump()["id_externo"] is None
+
+
+def test_list_all_descarta_linhas_invalidas(mock_context, df_historico):
+    """Testa que data ou valor inválidos não viram entidades silenciosamente."""
+    df = df_historico.astype({ColunasTransacoes.VALOR: object})
+    df.loc[1, ColunasTransacoes.DATA] = pd.NaT
+    df.loc[2, ColunasTransacoes.VALOR] = "R$ 50"
+    df.loc[3, ColunasTransacoes.VALOR] = -5.0
+    mock_context.get_dataframe.return_value = df
+    repo = ExcelTransactionRepository(mock_context)
+
+    txs = repo.list_all()
+
+    assert [tx.id for tx in txs] == [1]
+    assert txs[0].valor == 5000.0
+
+
+def test_agregados_sem_materializar_entidades(mock_context, df_historico):
+    """Testa os totais por tipo e por categoria calculados no DataFrame."""
+    mock_context.get_dataframe.return_value = df_historico
+    repo = ExcelTransactionRepository(mock_context)
+
+    assert repo.totals(month=1, year=2024) == {"Despesa": 100.0, "Receita": 5000.0}
+    assert repo.sum_by(repo.GROUP_CATEGORIA, tipo="despesa") == {
+        "Lazer": 140.0,
+        "Mercado": 60.0,
+    }
+    assert repo.sum_by(repo.GROUP_MES, tipo="Despesa") == {
+        "2024-01": 100.0,
+        "2024-02": 100.0,
+    }
+
+
+def test_agregados_ignoram_as_linhas_que_list_all_descarta(mock_context, df_historico):
+    """Testa que os totais batem com as entidades (mesmas linhas válidas)."""
+    df = df_historico.astype({ColunasTransacoes.VALOR: object})
+    df.loc[1, ColunasTransacoes.DATA] = pd.NaT
+    df.loc[2, ColunasTransacoes.VALOR] = "R$ 50"
+    df.loc[3, ColunasTransacoes.VALOR] = -5.0
+    mock_context.get_dataframe.return_value = df
+    repo = ExcelTransactionRepository(mock_context)
+
+    assert repo.totals() == {"Receita": 5000.0}
+    assert repo.sum_by(repo.GROUP_CATEGORIA, tipo="Despesa") == {}
+    assert repo.sum_by(repo.GROUP_MES) == {"2024-01": 5000.0}
+
+
+def test_list_all_do_periodo_mantem_a_ordem_da_planilha(mock_context, df_historico):
+    """Testa que o filtro por índice de datas não reordena as linhas."""
+    df = df_historico.iloc[[1, 0, 3]].reset_index(drop=True)
+    mock_context.get_dataframe.return_value = df
+    repo = ExcelTransactionRepository(mock_context)
+
+    assert [tx.id for tx in repo.list_all(month=1, year=2024)] == [2, 1, None]
+
+
+def test_agregados_reconstroem_colunas_so_quando_aba_muda(mock_context, df_historico):
+    """Testa se as colunas agregáveis são cacheadas pela revisão da aba."""
+    mock_context.get_dataframe.return_value = df_historico
+    mock_context.sheet_revision.return_value = 1
+    repo = ExcelTransactionRepository(mock_context)
+
+    repo.totals()
+    repo.sum_by(repo.GROUP_CATEGORIA)
+    assert mock_context.get_dataframe.call_count == 1
+
+    mock_context.get_dataframe.return_value = df_historico.iloc[:1]
+    mock_context.sheet_revision.return_value = 2
+    assert repo.totals() == {"Receita": 5000.0}
+
+
+@pytest.fixture
+def real_context():
+    storage = MagicMock(spec=BaseStorageHandler)
+    storage.load_sheets.return_value = (
+        {
+            aba: pd.DataFrame(columns=colunas)
+            for aba, colunas in config.LAYOUT_PLANILHA.items()
+        },
+        False,
+    )
+    storage.get_source_modified_time.return_value = "2025-01-01T00:00:00Z"
+    cache = MagicMock()
+    cache.get_entry.return_value = (None, None)
+    return FinancialDataContext(
+        storage_handler=storage,
+        strategy=DefaultStrategy(config.LAYOUT_PLANILHA, None),
+        cache_service=cache,
+        cache_key="dfs:test",
+    )
+
+
+def _tx(dia: date, descricao: str) -> Transaction:
+    return Transaction(
+        data=dia, tipo="Despesa", categoria="Lazer", descricao=descricao, valor=1.0
+    )
+
+
+def test_indice_acompanha_escritas_sem_reconstruir(real_context):
+    """Testa índice por ID/data mantido incrementalmente nas escritas."""
+    repo = ExcelTransactionRepository(real_context)
+    repo.save(_tx(date(2024, 3, 1), "Março"))
+    repo.save(_tx(date(2024, 1, 10), "Janeiro"))
+    repo.save(_tx(date(2024, 2, 5), "Fevereiro"))
+    indice = repo._indice()
+
+    assert [tx.id for tx in repo.list_all(month=1, year=2024)] == [2]
+    assert [tx.id for tx in repo.list_all(year=2024)] == [1, 2, 3]
+    assert [tx.id for tx in repo.list_all(month=2)] == [3]
+
+    movida = repo.get_by_id(1)
+    movida.data = date(2023, 12, 31)
+    repo.save(movida)
+
+    assert [tx.id for tx in repo.list_all(year=2024)] == [2, 3]
+    assert [tx.id for tx in repo.list_all(year=2023)] == [1]
+    assert repo._indice() is indice
+
+
+def test_indice_reconstruido_apos_delete(real_context):
+    """Testa se o delete invalida as posições e os IDs seguem crescentes."""
+    repo = ExcelTransactionRepository(real_context)
+    for dia in (1, 2, 3):
+        repo.save(_tx(date(2024, 1, dia), f"Dia {dia}"))
+
+    assert repo.delete(2) is True
+    assert repo.delete(2) is False
+    assert repo.get_by_id(2) is None
+    assert repo.get_by_id(3).descricao == "Dia 3"
+    assert repo.save(_tx(date(2024, 1, 4), "Dia 4")).id == 4
+
+
+def test_save_batch_grava_em_um_unico_append(real_context, monkeypatch):
+    """Testa se o lote gera IDs em sequência e faz um só append."""
+    repo = ExcelTransactionRepository(real_context)
+    repo.save(_tx(date(2024, 1, 1), "Existente"))
+    append_spy = MagicMock(wraps=real_context.append_rows)
+    monkeypatch.setattr(real_context, "append_rows", append_spy)
+
+    lote = [_tx(date(2024, 2, dia), f"Parcela {dia}") for dia in range(1, 6)]
+    assert repo.save_batch(lote) == 5
+
+    append_spy.assert_called_once()
+    assert [tx.id for tx in lote] == [2, 3, 4, 5, 6]
+    assert repo.get_by_id(6).descricao == "Parcela 5"
+    assert len(repo.list_all(month=2, year=2024)) == 5
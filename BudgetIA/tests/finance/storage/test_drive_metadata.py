@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+from finance.storage import drive_metadata
+from finance.storage.drive_metadata import DriveMetadataCache, version_token
+
+
+class FakeDrive:
+    """Fonte de metadados que conta as chamadas a 'files.get'."""
+
+    def __init__(self) -> None:
+        self.version = 1
+        self.calls = 0
+
+    def fetch(self) -> dict:
+        self.calls += 1
+        return {"version": str(self.version), "modifiedTime": "2025-01-01T00:00:00Z"}
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_version_token_prefere_version() -> None:
+    assert version_token({"version": "7", "modifiedTime": "x"}) == "v7"
+    assert version_token({"modifiedTime": "2025-01-01T00:00:00Z"}) == (
+        "2025-01-01T00:00:00Z"
+    )
+    assert version_token({}) is None
+
+
+def test_memoiza_dentro_do_ttl(clock: list[float]) -> None:
+    cache = DriveMetadataCache(ttl_seconds=5)
+    drive = FakeDrive()
+
+    cache.get("file", drive.fetch)
+    cache.get("file", drive.fetch)
+    assert drive.calls == 1
+
+    clock[0] += 6
+    cache.get("file", drive.fetch)
+    assert drive.calls == 2
+    assert cache.metrics()["hits"] == 1
+
+
+def test_apos_escrita_consulta_ate_a_versao_mudar(clock: list[float]) -> None:
+    cache = DriveMetadataCache(ttl_seconds=5)
+    drive = FakeDrive()
+    cache.get("file", drive.fetch)
+
+    cache.mark_written("file")
+    # O Drive ainda não refletiu a escrita: nada vem da memória
+    assert version_token(cache.get("file", drive.fetch)) == "v1"
+    assert version_token(cache.get("file", drive.fetch)) == "v1"
+    drive.version = 2
+    assert version_token(cache.get("file", drive.fetch)) == "v2"
+    assert drive.calls == 4
+
+    # Versão nova vista: volta a memoizar
+    cache.get("file", drive.fetch)
+    assert drive.calls == 4
+
+
+def test_escrita_sem_mudanca_de_versao_expira(clock: list[float]) -> None:
+    cache = DriveMetadataCache(ttl_seconds=5)
+    drive = FakeDrive()
+    cache.get("file", drive.fetch)
+    cache.mark_written("file")
+
+    clock[0] += drive_metadata.PENDING_WRITE_MAX_SECONDS + 1
+    cache.get("file", drive.fetch)
+    cache.get("file", drive.fetch)
+
+    assert drive.calls == 2
+
+
+def test_erro_na_consulta_nao_e_memoizado(clock: list[float]) -> None:
+    cache = DriveMetadataCache(ttl_seconds=5)
+
+    def broken() -> dict:
+        raise ConnectionError("offline")
+
+    with pytest.raises(ConnectionError):
+        cache.get("file", broken)
+    drive = FakeDrive()
+    cache.get("file", drive.fetch)
+    assert drive.calls == 1
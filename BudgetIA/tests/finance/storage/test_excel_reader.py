@@ -0,0 +1,93 @@
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+import config
+from finance.storage import excel_reader
+from finance.storage.excel_reader import read_workbook, resolve_engine
+from finance.storage.layout_dtypes import apply_layout_dtypes
+
+TRANSACOES = config.NomesAbas.TRANSACOES
+ORCAMENTOS = config.NomesAbas.ORCAMENTOS
+
+
+@pytest.fixture
+def planilha(tmp_path: Path) -> Path:
+    path = tmp_path / "planilha.xlsx"
+    # Cabeçalhos repetidos no fim: o pandas lê como "Valor.1", "Obs", "Obs.1"
+    transacoes = pd.DataFrame(
+        [
+            [1, datetime(2025, 1, 5), "Despesa", "Mercado", "Compra", 10.5, "Ativo"]
+            + [11.0, "a", "b"],
+            [None] * 10,  # Linha em branco
+            [2, datetime(2025, 1, 6), "Receita", "Salário", None, 1000, "Ativo"]
+            + [None, None, "c"],
+        ],
+        columns=config.LAYOUT_PLANILHA[TRANSACOES]
+        + [config.ColunasTransacoes.VALOR, "Obs", "Obs"],
+    )
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        transacoes.to_excel(writer, sheet_name=TRANSACOES, index=False)
+        pd.DataFrame(columns=config.LAYOUT_PLANILHA[ORCAMENTOS]).to_excel(
+            writer, sheet_name=ORCAMENTOS, index=False
+        )
+    return path
+
+
+def test_openpyxl_streaming_le_como_o_pandas(planilha: Path) -> None:
+    sheets = read_workbook(planilha, engine="openpyxl")
+
+    expected = apply_layout_dtypes(pd.read_excel(planilha, sheet_name=TRANSACOES))
+    assert_frame_equal(sheets[TRANSACOES], expected)
+    assert str(sheets[TRANSACOES][config.ColunasTransacoes.ID].dtype) == "Int64"
+    assert list(sheets[TRANSACOES].columns[-3:]) == [
+        f"{config.ColunasTransacoes.VALOR}.1",
+        "Obs",
+        "Obs.1",
+    ]
+    assert sheets[ORCAMENTOS].empty
+    assert list(sheets[ORCAMENTOS].columns) == config.LAYOUT_PLANILHA[ORCAMENTOS]
+
+
+def test_le_so_as_abas_pedidas(planilha: Path) -> None:
+    sheets = read_workbook(planilha, sheet_names=[ORCAMENTOS, "Inexistente"])
+
+    assert list(sheets) == [ORCAMENTOS]
+
+
+def test_motor_indisponivel_cai_para_o_melhor_instalado(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(excel_reader, "available_engines", lambda: ["openpyxl"])
+
+    assert resolve_engine("calamine") == "openpyxl"
+    assert resolve_engine("auto") == "openpyxl"
+
+
+@pytest.mark.skipif(
+    "calamine" not in excel_reader.available_engines(),
+    reason="python-calamine não instalado",
+)
+def test_calamine_le_como_o_openpyxl(planilha: Path) -> None:
+    calamine = read_workbook(planilha, engine="calamine")
+    openpyxl = read_workbook(planilha, engine="openpyxl")
+
+    assert_frame_equal(calamine[TRANSACOES], openpyxl[TRANSACOES])
+
+
+def test_valores_que_nao_convertem_ficam_como_estao() -> None:
+    df = pd.DataFrame(
+        {
+            config.ColunasTransacoes.VALOR: ["10.5", "R$ 50", None],
+            config.ColunasTransacoes.ID: [1, 2, 3],
+        }
+    )
+
+    df = apply_layout_dtypes(df)
+
+    assert df[config.ColunasTransacoes.VALOR].tolist()[:2] == [10.5, "R$ 50"]
+    assert pd.isna(df[config.ColunasTransacoes.VALOR].iloc[2])
+    assert str(df[config.ColunasTransacoes.ID].dtype) == "Int64"
@@ -0,0 +1,165 @@
+import hashlib
+import io
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pandas as pd
+import pytest
+
+import config
+from finance.storage import google_drive_handler
+from finance.storage.drive_metadata import drive_metadata_cache
+from finance.storage.google_drive_handler import GoogleDriveFileHandler
+from finance.strategies.default_strategy import DefaultStrategy
+
+FILE_URL = "https://drive.google.com/file/d/abc123/view"
+TRANSACOES = config.NomesAbas.TRANSACOES
+
+
+def _xlsx(n_rows: int) -> bytes:
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        for sheet_name, columns in config.LAYOUT_PLANILHA.items():
+            rows = n_rows if sheet_name == TRANSACOES else 0
+            df = pd.DataFrame(
+                [[i] * len(columns) for i in range(rows)], columns=columns
+            )
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+    return buffer.getvalue()
+
+
+class FakeDrive:
+    """Arquivo no Drive em memória que conta as chamadas feitas à API."""
+
+    def __init__(self, content: bytes) -> None:
+        self.content = content
+        self.version = 1
+        self.calls: list[str] = []
+        self.uploads: list[Any] = []
+
+    @property
+    def metadata(self) -> dict[str, Any]:
+        return {
+            "id": "abc123",
+            "name": "planilha.xlsx",
+            "version": str(self.version),
+            "md5Checksum": hashlib.md5(self.content).hexdigest(),
+        }
+
+    def files(self) -> "FakeDrive":
+        return self
+
+    def get(self, fileId: str, fields: str, **kwargs: Any) -> SimpleNamespace:
+        self.calls.append("files_get")
+        return SimpleNamespace(execute=lambda: self.metadata)
+
+    def get_media(self, fileId: str, **kwargs: Any) -> "FakeDrive":
+        return self
+
+    def update(self, fileId: str, media_body: Any, fields: str, **kwargs: Any):
+        self.uploads.append(media_body)
+        return FakeUpload(self, media_body)
+
+
+class FakeUpload:
+    """Upload resumível: envia um bloco por next_chunk()."""
+
+    def __init__(self, drive: FakeDrive, media_body: Any) -> None:
+        self.drive = drive
+        self.media = media_body
+        self.received = b""
+
+    def next_chunk(self, num_retries: int = 0):
+        self.drive.calls.append("upload_chunk")
+        self.received += self.media.getbytes(len(self.received), self.media.chunksize())
+        if len(self.received) < self.media.size():
+            progress = len(self.received) / self.media.size()
+            return SimpleNamespace(progress=lambda: progress), None
+        self.drive.content = self.received
+        self.drive.version += 1
+        return None, self.drive.metadata
+
+
+class FakeDownloader:
+    def __init__(self, fd: io.BytesIO, request: FakeDrive) -> None:
+        self.fd = fd
+        self.drive = request
+
+    def next_chunk(self, num_retries: int = 0):
+        self.drive.calls.append("download")
+        self.fd.write(self.drive.content)
+        return SimpleNamespace(progress=lambda: 1.0), True
+
+
+@pytest.fixture
+def drive(monkeypatch: pytest.MonkeyPatch) -> FakeDrive:
+    drive_metadata_cache.clear()
+    fake = FakeDrive(_xlsx(3))
+    monkeypatch.setattr(
+        google_drive_handler.Credentials,
+        "from_service_account_file",
+        lambda *args, **kwargs: None,
+    )
+    monkeypatch.setattr(google_drive_handler, "build", lambda *args, **kwargs: fake)
+    monkeypatch.setattr(google_drive_handler, "MediaIoBaseDownload", FakeDownloader)
+    return fake
+
+
+@pytest.fixture
+def strategy() -> DefaultStrategy:
+    return DefaultStrategy(config.LAYOUT_PLANILHA)
+
+
+def _load(cache_dir: Path, strategy) -> dict[str, pd.DataFrame]:
+    handler = GoogleDriveFileHandler(FILE_URL, cache_dir=cache_dir)
+    dataframes, _ = handler.load_sheets(config.LAYOUT_PLANILHA, strategy)
+    return dataframes
+
+
+def test_novo_manager_com_copia_local_so_consulta_metadados(
+    drive: FakeDrive, strategy, tmp_path: Path
+) -> None:
+    first = _load(tmp_path, strategy)
+    assert drive.calls == ["files_get", "download"]
+
+    drive_metadata_cache.clear()  # Depois do TTL da memoização
+    second = _load(tmp_path, strategy)
+
+    assert drive.calls == ["files_get", "download", "files_get"]
+    assert len(second[TRANSACOES]) == len(first[TRANSACOES]) == 3
+
+
+def test_arquivo_alterado_no_drive_e_baixado_de_novo(
+    drive: FakeDrive, strategy, tmp_path: Path
+) -> None:
+    _load(tmp_path, strategy)
+    drive.content = _xlsx(5)
+    drive.version += 1
+    drive_metadata_cache.clear()
+
+    data = _load(tmp_path, strategy)
+
+    assert drive.calls.count("download") == 2
+    assert len(data[TRANSACOES]) == 5
+
+
+def test_save_resumivel_atualiza_copia_local(
+    drive: FakeDrive, strategy, tmp_path: Path
+) -> None:
+    handler = GoogleDriveFileHandler(FILE_URL, cache_dir=tmp_path)
+    data, _ = handler.load_sheets(config.LAYOUT_PLANILHA, strategy)
+    data[TRANSACOES] = data[TRANSACOES].iloc[:1]
+
+    handler.save_sheets(data, strategy)
+
+    (media,) = drive.uploads
+    assert media.resumable()
+    assert media.chunksize() == config.DRIVE_UPLOAD_CHUNK_SIZE_MB * 1024 * 1024
+    assert handler.get_source_modified_time() == "v2"
+
+    # O conteúdo enviado já é a cópia local: nenhum download novo
+    drive_metadata_cache.clear()
+    reloaded = _load(tmp_path, strategy)
+    assert drive.calls.count("download") == 1
+    assert len(reloaded[TRANSACOES]) == 1
@@ -0,0 +1,446 @@
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import gspread
+import pandas as pd
+import pytest
+from gspread.utils import a1_to_rowcol
+
+import config
+from finance.storage.drive_metadata import drive_metadata_cache
+from finance.storage.google_sheets_storage_handler import GoogleSheetsStorageHandler
+from finance.strategies.default_strategy import DefaultStrategy
+
+TRANSACOES = config.NomesAbas.TRANSACOES
+ORCAMENTOS = config.NomesAbas.ORCAMENTOS
+
+
+class FakeResponse:
+    """Resposta HTTP mínima para montar um gspread APIError."""
+
+    def __init__(self, status_code: int, message: str) -> None:
+        self.status_code = status_code
+        self.text = message
+
+    def json(self) -> dict:
+        return {"error": {"code": self.status_code, "message": self.text}}
+
+
+class FakeWorksheet:
+    """Aba em memória: grade esparsa como a API do Google Sheets."""
+
+    def __init__(self, title: str, rows: int = 100, cols: int = 20) -> None:
+        self.title = title
+        self.row_count = rows
+        self.col_count = cols
+        self.grid: list[list[Any]] = []
+
+    def values(self) -> list[list[Any]]:
+        """Valores como a API devolve: sem células/linhas vazias no fim."""
+        rows = []
+        for row in self.grid:
+            row = list(row)
+            while row and row[-1] == "":
+                row.pop()
+            rows.append(row)
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+    def write(self, row: int, col: int, value: Any) -> None:
+        if row > self.row_count or col > self.col_count:
+            raise gspread.exceptions.GSpreadException("exceeds grid limits")
+        while len(self.grid) < row:
+            self.grid.append([])
+        line = self.grid[row - 1]
+        while len(line) < col:
+            line.append("")
+        line[col - 1] = value
+
+    def resize(self, rows: int | None = None, cols: int | None = None) -> None:
+        self.row_count = rows or self.row_count
+        self.col_count = cols or self.col_count
+
+    def acell(self, label: str) -> SimpleNamespace:
+        values = self.values()
+        return SimpleNamespace(value=values[0][0] if values and values[0] else "")
+
+    def row_values(self, row: int) -> list[Any]:
+        values = self.values()
+        return values[row - 1] if row <= len(values) else []
+
+    def append_rows(self, values: list[list[Any]], value_input_option: str) -> None:
+        start = len(self.values())
+        for i, line in enumerate(values):
+            for j, value in enumerate(line):
+                self.write(start + i + 1, j + 1, value)
+
+
+class FakeSpreadsheet:
+    """Planilha em memória que registra as chamadas feitas à API."""
+
+    id = "fake-spreadsheet"
+    title = "Planilha Fake"
+
+    def __init__(self) -> None:
+        self.sheets: dict[str, FakeWorksheet] = {}
+        self.calls: list[str] = []
+        self.batch_updates: list[dict[str, Any]] = []
+        self.quota_errors = 0
+        self.drive_version = 1
+        self.client = SimpleNamespace(request=self._drive_request)
+
+    def _drive_request(self, method: str, url: str, params: dict) -> SimpleNamespace:
+        """Drive API 'files.get' (metadados de versão)."""
+        self.calls.append("drive_files_get")
+        assert url.endswith(f"/files/{self.id}")
+        metadata = {"version": str(self.drive_version), "modifiedTime": "2025-01-01"}
+        return SimpleNamespace(json=lambda: metadata)
+
+    def add_sheet(self, title: str, values: list[list[Any]]) -> FakeWorksheet:
+        ws = FakeWorksheet(title)
+        for i, line in enumerate(values):
+            for j, value in enumerate(line):
+                ws.write(i + 1, j + 1, value)
+        self.sheets[title] = ws
+        return ws
+
+    def worksheets(self) -> list[FakeWorksheet]:
+        self.calls.append("worksheets")
+        return list(self.sheets.values())
+
+    def worksheet(self, title: str) -> FakeWorksheet:
+        self.calls.append("worksheet")
+        if title not in self.sheets:
+            raise gspread.exceptions.WorksheetNotFound(title)
+        return self.sheets[title]
+
+    def add_worksheet(self, title: str, rows: int, cols: int) -> FakeWorksheet:
+        self.calls.append("add_worksheet")
+        ws = FakeWorksheet(title, rows, cols)
+        self.sheets[title] = ws
+        return ws
+
+    @staticmethod
+    def _split(range_name: str) -> tuple[str, str]:
+        title, sep, cells = range_name.rpartition("!")
+        if not sep:  # Só o nome da aba: a aba inteira
+            title, cells = range_name, ""
+        return title.strip("'").replace("''", "'"), cells
+
+    def values_batch_get(self, ranges: list[str], params: dict | None = None) -> dict:
+        self.calls.append("values_batch_get")
+        if self.quota_errors:
+            self.quota_errors -= 1
+            raise gspread.exceptions.APIError(FakeResponse(429, "Quota exceeded"))
+        titles = [self._split(range_name)[0] for range_name in ranges]
+        if any(title not in self.sheets for title in titles):
+            raise gspread.exceptions.APIError(FakeResponse(400, "Unable to parse"))
+        return {
+            "valueRanges": [
+                {"range": r, "values": self.sheets[t].values()}
+                for r, t in zip(ranges, titles, strict=True)
+            ]
+        }
+
+    def values_batch_update(self, body: dict[str, Any]) -> dict:
+        self.calls.append("values_batch_update")
+        self.batch_updates.append(body)
+        self.drive_version += 1
+        for value_range in body["data"]:
+            title, cells = self._split(value_range["range"])
+            row, col = a1_to_rowcol(cells.split(":")[0])
+            for i, line in enumerate(value_range["values"]):
+                for j, value in enumerate(line):
+                    self.sheets[title].write(row + i, col + j, value)
+        return {}
+
+
+def _transacoes_grid(n: int) -> list[list[Any]]:
+    header = config.LAYOUT_PLANILHA[TRANSACOES]
+    rows = [
+        [i, f"2025-01-{i:02d}", "Despesa", "Mercado", f"Compra {i}", 10.5 * i, "Ativo"]
+        for i in range(1, n + 1)
+    ]
+    return [header, *rows]
+
+
+@pytest.fixture
+def spreadsheet(monkeypatch: pytest.MonkeyPatch) -> FakeSpreadsheet:
+    drive_metadata_cache.clear()
+    fake = FakeSpreadsheet()
+    for sheet_name, columns in config.LAYOUT_PLANILHA.items():
+        fake.add_sheet(sheet_name, [columns])
+    fake.add_sheet(TRANSACOES, _transacoes_grid(5))
+    client = SimpleNamespace(open_by_url=lambda url: fake)
+    monkeypatch.setattr(gspread, "authorize", lambda credentials: client)
+    return fake
+
+
+@pytest.fixture
+def handler(spreadsheet: FakeSpreadsheet) -> GoogleSheetsStorageHandler:
+    return GoogleSheetsStorageHandler("https://docs.google.com/fake", credentials=1)
+
+
+@pytest.fixture
+def strategy() -> DefaultStrategy:
+    return DefaultStrategy(config.LAYOUT_PLANILHA)
+
+
+def _load(handler, strategy) -> dict[str, pd.DataFrame]:
+    dataframes, _ = handler.load_sheets(config.LAYOUT_PLANILHA, strategy)
+    return dataframes
+
+
+def test_save_envia_so_a_celula_alterada(
+    handler, strategy, spreadsheet: FakeSpreadsheet
+) -> None:
+    data = _load(handler, strategy)
+    df = data[TRANSACOES].copy()
+    df.loc[2, config.ColunasTransacoes.CATEGORIA] = "Lazer"
+    data[TRANSACOES] = df
+
+    handler.save_sheets(data, strategy, dirty_sheets={TRANSACOES})
+
+    assert spreadsheet.calls.count("values_batch_update") == 1
+    assert spreadsheet.batch_updates[0]["data"] == [
+        {"range": f"'{TRANSACOES}'!D4:D4", "values": [["Lazer"]]}
+    ]
+    assert spreadsheet.sheets[TRANSACOES].values()[3][3] == "Lazer"
+
+
+def test_save_sem_alteracoes_nao_escreve(
+    handler, strategy, spreadsheet: FakeSpreadsheet
+) -> None:
+    data = _load(handler, strategy)
+
+    handler.save_sheets(data, strategy)
+
+    assert "values_batch_update" not in spreadsheet.calls
+
+
+def test_linhas_novas_e_removidas_num_unico_batch(
+    handler, strategy, spreadsheet: FakeSpreadsheet
+) -> None:
+    data = _load(handler, strategy)
+    data[TRANSACOES] = data[TRANSACOES].iloc[:3].reset_index(drop=True)
+    orcamento = dict.fromkeys(config.LAYOUT_PLANILHA[ORCAMENTOS], "")
+    orcamento[config.ColunasOrcamentos.CATEGORIA] = "Mercado"
+    data[ORCAMENTOS] = pd.DataFrame([orcamento])
+
+    handler.save_sheets(data, strategy)
+
+    assert spreadsheet.calls.count("values_batch_update") == 1
+    ranges = [r["range"] for r in spreadsheet.batch_updates[0]["data"]]
+    assert ranges == [f"'{TRANSACOES}'!A5:G6", f"'{ORCAMENTOS}'!B2:B2"]
+    assert spreadsheet.sheets[TRANSACOES].values() == _transacoes_grid(3)
+
+    # O snapshot foi atualizado: um novo save idêntico não escreve nada
+    handler.save_sheets(data, strategy)
+    assert spreadsheet.calls.count("values_batch_update") == 1
+
+
+def test_aba_cheia_nao_e_apagada_por_dataframe_vazio(
+    handler, strategy, spreadsheet: FakeSpreadsheet
+) -> None:
+    data = _load(handler, strategy)
+    data[TRANSACOES] = data[TRANSACOES].iloc[0:0]
+
+    handler.save_sheets(data, strategy, dirty_sheets={TRANSACOES})
+
+    assert "values_batch_update" not in spreadsheet.calls
+    assert len(spreadsheet.sheets[TRANSACOES].values()) == 6
+
+
+def test_append_mantem_snapshot_em_dia(
+    handler, strategy, spreadsheet: FakeSpreadsheet
+) -> None:
+    data = _load(handler, strategy)
+    nova = data[TRANSACOES].iloc[[0]].copy()
+    nova[config.ColunasTransacoes.ID] = 6
+
+    assert handler.append_rows(TRANSACOES, nova, strategy)
+    data[TRANSACOES] = pd.concat([data[TRANSACOES], nova], ignore_index=True)
+    handler.save_sheets(data, strategy, dirty_sheets={TRANSACOES})
+
+    assert "values_batch_update" not in spreadsheet.calls
+    assert len(spreadsheet.sheets[TRANSACOES].values()) == 7
+
+
+def test_append_grava_celulas_vazias_sem_nan(
+    handler, strategy, spreadsheet: FakeSpreadsheet
+) -> None:
+    data = _load(handler, strategy)
+    nova = data[TRANSACOES].iloc[[0]].copy()
+    nova[config.ColunasTransacoes.ID] = 6
+    nova[config.ColunasTransacoes.DESCRICAO] = float("nan")
+    nova[config.ColunasTransacoes.VALOR] = float("nan")
+
+    assert handler.append_rows(TRANSACOES, nova, strategy)
+
+    assert spreadsheet.sheets[TRANSACOES].grid[-1][4:6] == ["", ""]
+
+
+def test_save_rele_a_aba_se_a_versao_remota_mudou(
+    handler, strategy, spreadsheet: FakeSpreadsheet
+) -> None:
+    data = _load(handler, strategy)
+    # Outra pessoa acrescenta uma linha depois da nossa leitura
+    spreadsheet.sheets[TRANSACOES].append_rows(_transacoes_grid(6)[-1:], "RAW")
+    spreadsheet.drive_version += 1
+    data[TRANSACOES].loc[2, config.ColunasTransacoes.CATEGORIA] = "Lazer"
+
+    handler.save_sheets(data, strategy, dirty_sheets={TRANSACOES})
+
+    # O diff usou a aba relida: a linha nova foi limpa, não ficou para trás
+    expected = _transacoes_grid(5)
+    expected[3][3] = "Lazer"
+    assert spreadsheet.calls.count("values_batch_get") == 2
+    assert spreadsheet.sheets[TRANSACOES].values() == expected
+
+
+def test_save_na_versao_lida_nao_rele_a_aba(
+    handler, strategy, spreadsheet: FakeSpreadsheet
+) -> None:
+    data = _load(handler, strategy)
+    data[TRANSACOES].loc[2, config.ColunasTransacoes.CATEGORIA] = "Lazer"
+
+    handler.save_sheets(data, strategy, dirty_sheets={TRANSACOES})
+    assert spreadsheet.calls.count("values_batch_get") == 1
+
+    # A versão pós-escrita foi carimbada: o próximo save não relê a aba
+    handler.save_sheets(data, strategy, dirty_sheets={TRANSACOES})
+    assert spreadsheet.calls.count("values_batch_get") == 1
+    assert spreadsheet.calls.count("values_batch_update") == 1
+
+
+def test_saves_seguidos_nao_releem_nem_listam_abas(
+    handler, strategy, spreadsheet: FakeSpreadsheet
+) -> None:
+    data = _load(handler, strategy)
+    for categoria in ("Lazer", "Saúde"):
+        spreadsheet.calls.clear()
+        data[TRANSACOES].loc[2, config.ColunasTransacoes.CATEGORIA] = categoria
+        handler.save_sheets(data, strategy, dirty_sheets={TRANSACOES})
+
+    # Regime permanente: confere a versão, escreve e carimba a versão nova
+    assert spreadsheet.calls == [
+        "drive_files_get",
+        "values_batch_update",
+        "drive_files_get",
+    ]
+    assert spreadsheet.sheets[TRANSACOES].values()[3][3] == "Saúde"
+
+
+def test_datas_no_formato_do_locale_nao_sao_regravadas(
+    handler, strategy, spreadsheet: FakeSpreadsheet
+) -> None:
+    grid = _transacoes_grid(3)
+    for row in grid[1:]:
+        row[1] = f"{row[0] + 10:02d}/01/2025"  # FORMATTED_STRING em pt_BR
+    spreadsheet.add_sheet(TRANSACOES, grid)
+
+    data = _load(handler, strategy)
+    handler.save_sheets(data, strategy, dirty_sheets={TRANSACOES})
+
+    datas = data[TRANSACOES][config.ColunasTransacoes.DATA]
+    assert datas.dt.strftime("%Y-%m-%d").tolist() == [
+        "2025-01-11",
+        "2025-01-12",
+        "2025-01-13",
+    ]
+    assert "values_batch_update" not in spreadsheet.calls
+
+
+def test_valor_fora_do_tipo_nao_e_apagado_no_save(
+    handler, strategy, spreadsheet: FakeSpreadsheet
+) -> None:
+    grid = _transacoes_grid(3)
+    grid[2][5] = "R$ 50"
+    spreadsheet.add_sheet(TRANSACOES, grid)
+
+    data = _load(handler, strategy)
+    data[TRANSACOES].loc[0, config.ColunasTransacoes.CATEGORIA] = "Lazer"
+    handler.save_sheets(data, strategy, dirty_sheets={TRANSACOES})
+
+    assert spreadsheet.batch_updates[0]["data"] == [
+        {"range": f"'{TRANSACOES}'!D2:D2", "values": [["Lazer"]]}
+    ]
+    assert spreadsheet.sheets[TRANSACOES].values()[2][5] == "R$ 50"
+
+
+def test_sem_snapshot_regrava_a_aba_inteira_sem_clear(
+    handler, strategy, spreadsheet: FakeSpreadsheet
+) -> None:
+    data = _load(handler, strategy)
+    handler._snapshots.clear()
+    data[TRANSACOES] = data[TRANSACOES].iloc[:2]
+
+    handler.save_sheets(data, strategy, dirty_sheets={TRANSACOES})
+
+    (value_range,) = spreadsheet.batch_updates[0]["data"]
+    assert value_range["range"] == f"'{TRANSACOES}'!A1:T100"
+    assert spreadsheet.sheets[TRANSACOES].values() == _transacoes_grid(2)
+
+
+def test_load_le_todas_as_abas_numa_unica_chamada(
+    handler, strategy, spreadsheet: FakeSpreadsheet
+) -> None:
+    data, is_new_file = handler.load_sheets(config.LAYOUT_PLANILHA, strategy)
+
+    assert spreadsheet.calls == ["drive_files_get", "values_batch_get"]
+    assert not is_new_file
+    df = data[TRANSACOES]
+    assert str(df[config.ColunasTransacoes.ID].dtype) == "Int64"
+    assert str(df[config.ColunasTransacoes.VALOR].dtype) == "float64"
+    assert pd.api.types.is_datetime64_any_dtype(df[config.ColunasTransacoes.DATA])
+    assert df[config.ColunasTransacoes.VALOR].tolist() == [10.5, 21, 31.5, 42, 52.5]
+
+
+def test_load_com_aba_faltando_le_so_as_existentes(
+    handler, strategy, spreadsheet: FakeSpreadsheet
+) -> None:
+    del spreadsheet.sheets[config.NomesAbas.METAS]
+
+    data, is_new_file = handler.load_sheets(config.LAYOUT_PLANILHA, strategy)
+
+    assert is_new_file
+    assert spreadsheet.calls == [
+        "drive_files_get",
+        "values_batch_get",
+        "worksheets",
+        "values_batch_get",
+    ]
+    assert data[config.NomesAbas.METAS].empty
+    assert len(data[TRANSACOES]) == 5
+
+
+def test_load_repete_em_erro_de_cota(
+    handler, strategy, spreadsheet: FakeSpreadsheet, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+    spreadsheet.quota_errors = 2
+
+    data = _load(handler, strategy)
+
+    assert spreadsheet.calls.count("values_batch_get") == 3
+    assert len(data[TRANSACOES]) == 5
+
+
+def test_versao_remota_memoizada_e_renovada_apos_save(
+    handler, strategy, spreadsheet: FakeSpreadsheet
+) -> None:
+    assert handler.get_source_modified_time() == "v1"
+    assert handler.get_source_modified_time() == "v1"
+    assert spreadsheet.calls.count("drive_files_get") == 1
+
+    data = _load(handler, strategy)
+    data[TRANSACOES].loc[0, config.ColunasTransacoes.CATEGORIA] = "Lazer"
+    handler.save_sheets(data, strategy, dirty_sheets={TRANSACOES})
+    spreadsheet.drive_version = 2
+
+    # O save confere a versão antes e consulta a nova logo após escrever:
+    # o poll enxerga a versão nova sem outra chamada
+    assert handler.get_source_modified_time() == "v2"
+    assert spreadsheet.calls.count("drive_files_get") == 3
@@ -0,0 +1,150 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from infrastructure.caching import bounded_cache
+from infrastructure.caching.bounded_cache import BoundedLRUCache
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    now = [1000.0]
+    monkeypatch.setattr(bounded_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_remove_o_menos_usado_ao_exceder_entradas() -> None:
+    on_evict = MagicMock()
+    cache: BoundedLRUCache[str, str] = BoundedLRUCache(
+        name="t", max_entries=2, on_evict=on_evict
+    )
+    cache.set("a", "A")
+    cache.set("b", "B")
+    assert cache.get("a") == "A"  # "b" passa a ser o menos usado
+
+    cache.set("c", "C")
+
+    assert "b" not in cache
+    on_evict.assert_called_once_with("b", "B")
+    metrics = cache.metrics()
+    assert (metrics["hits"], metrics["evictions"], metrics["entries"]) == (1, 1, 2)
+
+
+def test_respeita_limite_de_bytes() -> None:
+    cache: BoundedLRUCache[str, bytes] = BoundedLRUCache(
+        name="t", max_entries=10, max_bytes=10, size_of=len
+    )
+    cache.set("a", b"123456")
+    cache.set("b", b"1234")
+    cache.set("c", b"12")
+
+    assert "a" not in cache
+    assert cache.metrics()["total_bytes"] == 6
+    assert cache.metrics()["bytes_per_entry"] == {"b": 4, "c": 2}
+
+
+def test_expira_entradas_ociosas(clock: list[float]) -> None:
+    on_evict = MagicMock()
+    cache: BoundedLRUCache[str, str] = BoundedLRUCache(
+        name="t", max_entries=10, idle_ttl_seconds=60, on_evict=on_evict
+    )
+    cache.set("a", "A")
+    cache.set("b", "B")
+
+    clock[0] += 30
+    assert cache.get("a") == "A"  # renova o último acesso de "a"
+    clock[0] += 45
+
+    assert cache.sweep() == 1
+    on_evict.assert_called_once_with("b", "B")
+    assert cache.get("b") is None
+    assert cache.metrics()["misses"] == 1
+
+
+def test_sweep_reestima_tamanhos_e_respeita_limite() -> None:
+    cache: BoundedLRUCache[str, bytearray] = BoundedLRUCache(
+        name="t", max_entries=10, max_bytes=10, size_of=len
+    )
+    a, b = bytearray(b"1234"), bytearray(b"1234")
+    cache.set("a", a)
+    cache.set("b", b)
+    a.extend(b"5678")  # "a" cresceu depois do set()
+
+    assert cache.sweep() == 1
+    assert "a" not in cache
+    assert cache.metrics()["total_bytes"] == 4
+
+
+def test_get_or_create_expira_ociosos(clock: list[float]) -> None:
+    on_evict = MagicMock()
+    cache: BoundedLRUCache[str, str] = BoundedLRUCache(
+        name="t", max_entries=10, idle_ttl_seconds=60, on_evict=on_evict
+    )
+    cache.set("a", "A")
+    clock[0] += 61
+
+    cache.get_or_create("b", lambda: "B")
+
+    on_evict.assert_called_once_with("a", "A")
+    assert len(cache) == 1
+
+
+def test_get_or_create_cria_uma_vez_e_conta_metricas() -> None:
+    factory = MagicMock(return_value="manager")
+    cache: BoundedLRUCache[str, str] = BoundedLRUCache(name="t", max_entries=2)
+
+    assert cache.get_or_create("u", factory) == "manager"
+    assert cache.get_or_create("u", factory) == "manager"
+
+    factory.assert_called_once()
+    metrics = cache.metrics()
+    assert (metrics["hits"], metrics["misses"]) == (1, 1)
+
+
+def test_falha_no_hook_nao_interrompe_remocao() -> None:
+    cache: BoundedLRUCache[str, str] = BoundedLRUCache(
+        name="t", max_entries=1, on_evict=MagicMock(side_effect=RuntimeError)
+    )
+    cache.set("a", "A")
+    cache.set("b", "B")
+
+    assert "a" not in cache
+    assert cache.get("b") == "B"
+
+
+def test_criacao_lenta_nao_bloqueia_outras_chaves() -> None:
+    cache: BoundedLRUCache[str, str] = BoundedLRUCache(name="t", max_entries=10)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_factory() -> str:
+        started.set()
+        release.wait(timeout=5)
+        return "lento"
+
+    worker = threading.Thread(target=cache.get_or_create, args=("a", slow_factory))
+    worker.start()
+    assert started.wait(timeout=5)
+
+    # Enquanto "a" carrega, outra chave é criada sem esperar
+    assert cache.get_or_create("b", lambda: "rapido") == "rapido"
+    assert "a" not in cache
+
+    release.set()
+    worker.join(timeout=5)
+    assert cache.peek("a") == "lento"
+    assert cache._create_locks == {}
+
+
+def test_peek_nao_conta_acesso() -> None:
+    cache: BoundedLRUCache[str, str] = BoundedLRUCache(name="t", max_entries=2)
+    cache.set("a", "A")
+    cache.set("b", "B")
+
+    assert cache.peek("a") == "A"
+    assert cache.peek("x") is None
+    cache.set("c", "C")  # "a" continua sendo o menos usado
+
+    assert "a" not in cache
+    assert (cache.metrics()["hits"], cache.metrics()["misses"]) == (0, 0)
@@ -0,0 +1,195 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import config
+from infrastructure.caching import frame_codec
+from infrastructure.caching.redis_cache_service import RedisCacheService
+
+
+class FakePipeline:
+    def __init__(self, client: "FakeRedis"):
+        self._client = client
+        self._ops: list[tuple[str, tuple]] = []
+
+    def setex(self, key: str, ttl: int, value: bytes | str) -> None:
+        self._ops.append(("setex", (key, ttl, value)))
+
+    def expire(self, key: str, ttl: int) -> None:
+        self._ops.append(("expire", (key, ttl)))
+
+    def set(self, key: str, value: str) -> None:
+        self._ops.append(("set", (key, value)))
+
+    def delete(self, *keys: str) -> None:
+        self._ops.append(("delete", keys))
+
+    def execute(self) -> None:
+        for name, args in self._ops:
+            getattr(self._client, name)(*args)
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+        self.ttls: dict[str, int] = {}
+        self.writes: list[str] = []
+
+    def get(self, key: str) -> bytes | None:
+        return self.store.get(key)
+
+    def mget(self, keys: list[str]) -> list[bytes | None]:
+        return [self.store.get(k) for k in keys]
+
+    def setex(self, key: str, ttl: int, value: bytes | str) -> None:
+        self.store[key] = value.encode() if isinstance(value, str) else value
+        self.ttls[key] = ttl
+        self.writes.append(key)
+
+    def expire(self, key: str, ttl: int) -> None:
+        self.ttls[key] = ttl
+
+    def set(self, key: str, value: str) -> None:
+        self.store[key] = value.encode()
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.store.pop(key, None)
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+
+@pytest.fixture
+def redis_client() -> FakeRedis:
+    return FakeRedis()
+
+
+@pytest.fixture
+def service(redis_client: FakeRedis) -> RedisCacheService:
+    cache = RedisCacheService()
+    cache.redis_client = redis_client
+    cache.enabled = True
+    return cache
+
+
+def _dfs() -> dict[str, pd.DataFrame]:
+    return {
+        config.NomesAbas.TRANSACOES: pd.DataFrame(
+            {
+                config.ColunasTransacoes.ID: [1, 2],
+                config.ColunasTransacoes.DATA: pd.to_datetime(["2025-01-05", None]),
+                config.ColunasTransacoes.DESCRICAO: ["Mercado", None],
+                config.ColunasTransacoes.VALOR: [10.5, 20.0],
+            }
+        ),
+        config.NomesAbas.METAS: pd.DataFrame({"Obs": ["a", 1]}),
+    }
+
+
+def test_frame_codec_preserva_dtypes_e_nulos() -> None:
+    df = _dfs()[config.NomesAbas.TRANSACOES]
+
+    restored = frame_codec.decode_frame(frame_codec.encode_frame(df))
+
+    pd.testing.assert_frame_equal(restored, df)
+    missing = restored[config.ColunasTransacoes.DESCRICAO].iloc[1]
+    assert isinstance(missing, float) and np.isnan(missing)
+
+
+def test_frame_codec_usa_pickle_para_colunas_mistas() -> None:
+    df = _dfs()[config.NomesAbas.METAS]
+
+    blob = frame_codec.encode_frame(df)
+
+    assert blob[5:6] == frame_codec.CODEC_PICKLE
+    pd.testing.assert_frame_equal(frame_codec.decode_frame(blob), df)
+
+
+def test_frame_codec_rejeita_versao_desconhecida() -> None:
+    blob = bytearray(frame_codec.encode_frame(pd.DataFrame({"a": [1]})))
+    blob[4] = frame_codec.FORMAT_VERSION + 1
+
+    with pytest.raises(frame_codec.IncompatibleFrameError):
+        frame_codec.decode_frame(bytes(blob))
+
+
+def test_grava_uma_chave_por_aba_e_le_de_volta(
+    service: RedisCacheService, redis_client: FakeRedis
+) -> None:
+    assert service.set_entry("dfs:u", _dfs(), "ts1", ttl_seconds=60)
+
+    assert set(redis_client.store) == {
+        "dfs:u:meta",
+        f"dfs:u:sheet:{config.NomesAbas.TRANSACOES}",
+        f"dfs:u:sheet:{config.NomesAbas.METAS}",
+    }
+    assert set(redis_client.ttls.values()) == {60}
+
+    data, timestamp = service.get_entry("dfs:u")
+    assert timestamp == "ts1"
+    for sheet, df in _dfs().items():
+        pd.testing.assert_frame_equal(data[sheet], df)
+
+
+def test_le_apenas_as_abas_pedidas(service: RedisCacheService) -> None:
+    service.set_entry("dfs:u", _dfs(), "ts1")
+
+    data, _ = service.get_entry("dfs:u", sheets=[config.NomesAbas.METAS])
+
+    assert list(data) == [config.NomesAbas.METAS]
+
+
+def test_regrava_somente_abas_alteradas(
+    service: RedisCacheService, redis_client: FakeRedis
+) -> None:
+    dfs = _dfs()
+    service.set_entry("dfs:u", dfs, "ts1")
+    redis_client.writes.clear()
+
+    dfs[config.NomesAbas.METAS] = pd.DataFrame({"Obs": ["b"]})
+    service.set_entry("dfs:u", dfs, "ts2", sheets={config.NomesAbas.METAS})
+
+    assert redis_client.writes == [
+        f"dfs:u:sheet:{config.NomesAbas.METAS}",
+        "dfs:u:meta",
+    ]
+    data, timestamp = service.get_entry("dfs:u")
+    assert timestamp == "ts2"
+    assert data[config.NomesAbas.METAS]["Obs"].tolist() == ["b"]
+    assert len(data[config.NomesAbas.TRANSACOES]) == 2
+
+
+def test_escrita_parcial_sem_tokens_conhecidos_grava_tudo(
+    service: RedisCacheService, redis_client: FakeRedis
+) -> None:
+    service.set_entry("dfs:u", _dfs(), "ts1", sheets={config.NomesAbas.METAS})
+
+    assert len(redis_client.writes) == 3
+
+
+def test_abas_de_escritas_diferentes_sao_miss(
+    service: RedisCacheService, redis_client: FakeRedis
+) -> None:
+    service.set_entry("dfs:u", _dfs(), "ts1")
+    meta = json.loads(redis_client.store["dfs:u:meta"])
+    meta["sheets"][config.NomesAbas.METAS] = "0" * 16
+    redis_client.store["dfs:u:meta"] = json.dumps(meta).encode()
+
+    assert service.get_entry("dfs:u") == (None, None)
+
+
+def test_invalidate_remove_somente_o_meta(
+    service: RedisCacheService, redis_client: FakeRedis
+) -> None:
+    service.set_entry("dfs:u", _dfs(), "ts1")
+
+    service.invalidate("dfs:u")
+
+    assert service.get_entry("dfs:u") == (None, None)
+    assert len(redis_client.store) == 2
+
+    service.delete("dfs:u")
+    assert redis_client.store == {}
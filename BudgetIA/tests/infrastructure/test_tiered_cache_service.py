@@ -0,0 +1,78 @@
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+
+from infrastructure.caching.redis_cache_service import RedisCacheService
+from infrastructure.caching.tiered_cache_service import TieredCacheService
+from tests.infrastructure.test_redis_cache_service import FakeRedis
+
+
+def _redis(client: FakeRedis) -> RedisCacheService:
+    l2 = RedisCacheService()
+    l2.redis_client = client
+    l2.enabled = True
+    return l2
+
+
+@pytest.fixture
+def redis_client() -> FakeRedis:
+    return FakeRedis()
+
+
+@pytest.fixture
+def dfs() -> dict[str, pd.DataFrame]:
+    return {"Transacoes": pd.DataFrame({"Valor": [1.0, 2.0]})}
+
+
+def test_leitura_com_carimbo_igual_nao_baixa_o_blob(
+    redis_client: FakeRedis, dfs: dict[str, pd.DataFrame]
+) -> None:
+    l2 = _redis(redis_client)
+    cache = TieredCacheService(l2)
+    cache.set_entry("dfs:u", dfs, "ts1")
+    l2.get_entry = MagicMock(side_effect=AssertionError("não deveria ir ao L2"))
+
+    data, timestamp = cache.get_entry("dfs:u")
+
+    assert timestamp == "ts1"
+    assert data["Transacoes"] is dfs["Transacoes"]
+    assert cache.metrics()["hits"] == 1
+
+
+def test_escrita_de_outro_worker_invalida_o_l1(
+    redis_client: FakeRedis, dfs: dict[str, pd.DataFrame]
+) -> None:
+    worker_a = TieredCacheService(_redis(redis_client))
+    worker_b = TieredCacheService(_redis(redis_client))
+    worker_a.set_entry("dfs:u", dfs, "ts1")
+    assert worker_a.get_entry("dfs:u")[1] == "ts1"
+
+    novos = {"Transacoes": pd.DataFrame({"Valor": [9.0]})}
+    worker_b.set_entry("dfs:u", novos, "ts2")
+
+    data, timestamp = worker_a.get_entry("dfs:u")
+    assert timestamp == "ts2"
+    assert data["Transacoes"]["Valor"].tolist() == [9.0]
+
+
+def test_invalidate_troca_o_carimbo(
+    redis_client: FakeRedis, dfs: dict[str, pd.DataFrame]
+) -> None:
+    worker_a = TieredCacheService(_redis(redis_client))
+    worker_b = TieredCacheService(_redis(redis_client))
+    worker_a.set_entry("dfs:u", dfs, "ts1")
+
+    worker_b.invalidate("dfs:u")
+
+    assert worker_a.get_entry("dfs:u") == (None, None)
+
+
+def test_sem_redis_o_l1_fica_desligado(dfs: dict[str, pd.DataFrame]) -> None:
+    l2 = RedisCacheService()
+    l2.enabled = False
+    cache = TieredCacheService(l2)
+
+    assert cache.set_entry("dfs:u", dfs, "ts1") is False
+    assert cache.get_entry("dfs:u") == (None, None)
+    assert len(cache.l1) == 0
@@ -0,0 +1,68 @@
+import json
+import os
+import pickle
+import sys
+import time
+from io import StringIO
+
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+sys.path.append(os.path.abspath("."))
+
+from infrastructure.caching.frame_codec import (  # noqa: E402
+    decode_frame,
+    encode_frame,
+)
+from tests.performance.bench_data import build_transactions  # noqa: E402
+
+SIZES = (1_000, 10_000, 100_000)
+REPEAT = 3
+
+
+# Formato antigo do RedisCacheService: pickle do dict inteiro + timestamp
+def pickle_roundtrip(df: pd.DataFrame) -> tuple[int, pd.DataFrame]:
+    blob = pickle.dumps(({"t": df}, "ts"))
+    return len(blob), pickle.loads(blob)[0]["t"]
+
+
+# Formato antigo do core.CacheService: to_json(orient="split")
+def json_roundtrip(df: pd.DataFrame) -> tuple[int, pd.DataFrame]:
+    blob = json.dumps({"timestamp": "ts", "data": {"t": df.to_json(orient="split")}})
+    payload = json.loads(blob)
+    return len(blob), pd.read_json(StringIO(payload["data"]["t"]), orient="split")
+
+
+def arrow_roundtrip(df: pd.DataFrame) -> tuple[int, pd.DataFrame]:
+    blob = encode_frame(df)
+    return len(blob), decode_frame(blob)
+
+
+def measure(fn, df: pd.DataFrame) -> tuple[float, int]:
+    best = float("inf")
+    size = 0
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        size, _ = fn(df)
+        best = min(best, time.perf_counter() - start)
+    return best, size
+
+
+def main():
+    formats = {
+        "pickle": pickle_roundtrip,
+        "json": json_roundtrip,
+        "arrow": arrow_roundtrip,
+    }
+
+    print(f"\n{'linhas':>8} {'formato':>8} {'ida+volta':>10} {'tamanho':>10}")
+    for n in SIZES:
+        df = build_transactions(n)
+        for name, fn in formats.items():
+            elapsed, size = measure(fn, df)
+            print(f"{n:>8} {name:>8} {elapsed * 1000:>8.1f}ms {size / 1024:>8.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
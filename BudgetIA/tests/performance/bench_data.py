@@ -0,0 +1,44 @@
+"""
+Dados sintéticos compartilhados pelos benchmarks (sem I/O, reprodutíveis).
+"""
+
+from datetime import date, timedelta
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+import config
+
+
+def build_transactions(n: int) -> pd.DataFrame:
+    """Aba de transações com 'n' linhas, no layout interno."""
+    rng = np.random.default_rng(42)
+    col = config.ColunasTransacoes
+    return pd.DataFrame(
+        {
+            col.ID: np.arange(1, n + 1),
+            col.DATA: pd.Timestamp("2020-01-01")
+            + pd.to_timedelta(rng.integers(0, 1500, n), unit="D"),
+            col.TIPO: np.where(rng.random(n) < 0.3, "Receita", "Despesa"),
+            col.CATEGORIA: [f"Categoria {i % 12}" for i in range(n)],
+            col.DESCRICAO: [f"Lançamento {i}" for i in range(n)],
+            col.VALOR: (rng.random(n) * 500).round(2),
+            col.STATUS: "Concluído",
+        }
+    )
+
+
+def build_transaction_payloads(n: int) -> list[dict[str, Any]]:
+    """Payloads como os de 'adicionar_registros_lote' (importação em lote)."""
+    inicio = date(2020, 1, 1)
+    return [
+        {
+            "data": inicio + timedelta(days=i % 1500),
+            "tipo": "Despesa" if i % 3 else "Receita",
+            "categoria": f"Categoria {i % 12}",
+            "descricao": f"Lançamento {i}",
+            "valor": float(i % 500) + 0.99,
+        }
+        for i in range(n)
+    ]
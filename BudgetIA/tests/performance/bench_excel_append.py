@@ -0,0 +1,73 @@
+"""
+Benchmark da gravação de uma transação nova num .xlsx (ExcelStorageHandler).
+
+Compara, para N linhas na aba de transações:
+- append_rows (openpyxl: carrega o workbook, acrescenta a linha, salva);
+- regravar só a aba suja (openpyxl, mode="a": o fallback sem append);
+- regerar o arquivo inteiro com xlsxwriter (o save antigo, sem dirty_sheets).
+
+O .xlsx é um zip de XMLs: qualquer escrita re-serializa a aba inteira, e o
+openpyxl ainda precisa ler o workbook antes. Regerar com xlsxwriter é o
+mais rápido, mas reescreve todas as abas a partir da memória (descartando
+abas que o app não carrega), por isso só é usado no save completo.
+
+Uso (na raiz do projeto): python tests/performance/bench_excel_append.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+sys.path.append(os.path.abspath("."))
+
+import config  # noqa: E402
+from finance.storage.excel_storage_handler import ExcelStorageHandler  # noqa: E402
+from finance.strategies.default_strategy import DefaultStrategy  # noqa: E402
+from tests.performance.bench_data import build_transactions  # noqa: E402
+
+SIZES = (1_000, 10_000, 50_000)
+TRANSACOES = config.NomesAbas.TRANSACOES
+
+
+def measure(n: int) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        handler = ExcelStorageHandler(os.path.join(tmp_dir, "bench.xlsx"))
+        strategy = DefaultStrategy(config.LAYOUT_PLANILHA, None)
+        data = {
+            name: pd.DataFrame(columns=columns)
+            for name, columns in config.LAYOUT_PLANILHA.items()
+        }
+        data[TRANSACOES] = build_transactions(n)
+        handler.save_sheets(data, strategy)
+
+        nova = build_transactions(1)
+        timings = {}
+        start = time.perf_counter()
+        handler.append_rows(TRANSACOES, nova, strategy)
+        timings["append_rows (openpyxl)"] = time.perf_counter() - start
+
+        data[TRANSACOES] = pd.concat([data[TRANSACOES], nova], ignore_index=True)
+        start = time.perf_counter()
+        handler.save_sheets(data, strategy, dirty_sheets={TRANSACOES})
+        timings["aba suja (openpyxl)"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        handler.save_sheets(data, strategy)
+        timings["arquivo todo (xlsxwriter)"] = time.perf_counter() - start
+        return timings
+
+
+def main():
+    for n in SIZES:
+        print(f"\n--- Uma transação nova com {n} linhas na aba ---")
+        for label, seconds in measure(n).items():
+            print(f"{label:<28} {seconds:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark dos motores de leitura de .xlsx (cache miss do ExcelStorageHandler).
+
+Gera a 'planilha_mestra.xlsx' (tests/criar_planilha_teste.py), escala a aba
+de transações para N_ROWS linhas e mede a leitura de todas as abas com:
+- o caminho antigo (pd.ExcelFile + pd.read_excel por aba, openpyxl padrão);
+- cada motor disponível em finance.storage.excel_reader.
+
+Uso (na raiz do projeto): python tests/performance/bench_excel_readers.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+sys.path.append(os.path.abspath("."))
+
+import config  # noqa: E402
+from finance.storage.excel_reader import (  # noqa: E402
+    available_engines,
+    read_workbook,
+)
+from tests.criar_planilha_teste import OUTPUT_FILE  # noqa: E402
+from tests.criar_planilha_teste import main as generate_sheet  # noqa: E402
+from tests.performance.bench_data import build_transactions  # noqa: E402
+
+N_ROWS = 50_000
+REPEAT = 3
+
+
+def build_workbook(tmp_dir: str) -> str:
+    """Gera a planilha mestra e substitui as transações por N_ROWS linhas."""
+    cwd = os.getcwd()
+    os.chdir(tmp_dir)
+    try:
+        generate_sheet()
+    finally:
+        os.chdir(cwd)
+
+    path = os.path.join(tmp_dir, OUTPUT_FILE)
+    sheets = pd.read_excel(path, sheet_name=None)
+    sheets[config.NomesAbas.TRANSACOES] = build_transactions(N_ROWS)
+    with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+    return path
+
+
+def read_legacy(path: str) -> dict[str, pd.DataFrame]:
+    """Leitura anterior: ExcelFile com openpyxl padrão + read_excel por aba."""
+    xls = pd.ExcelFile(path)
+    return {name: pd.read_excel(xls, sheet_name=name) for name in xls.sheet_names}
+
+
+def measure(label: str, read) -> None:
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        sheets = read()
+        timings.append(time.perf_counter() - start)
+    rows = len(sheets[config.NomesAbas.TRANSACOES])
+    print(f"{label:<22} {min(timings):>8.3f}s (melhor de {REPEAT}) | {rows} linhas")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = build_workbook(tmp_dir)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(
+            f"\n--- Leitura de {OUTPUT_FILE} ({N_ROWS} transações, {size_mb:.1f} MB) ---"
+        )
+
+        measure("pandas/openpyxl padrão", lambda: read_legacy(path))
+        for engine in available_engines():
+            measure(engine, lambda engine=engine: read_workbook(path, engine=engine))
+        if "calamine" not in available_engines():
+            print("(calamine: instale 'python-calamine' para incluir este motor)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark da importação em lote (PlanilhaManager.adicionar_registros_lote).
+
+Mede o caminho completo de um lote sobre uma planilha .xlsx que já tem
+N_ROWS transações: criação das entidades, gravação em lote no repositório,
+recálculo dos orçamentos e o save no storage (append). O manager é montado
+pela FinancialSystemFactory, com o mesmo cache da API (TieredCacheService;
+sem Redis configurado, o L2 fica desligado).
+
+Uso (na raiz do projeto): python tests/performance/bench_save_batch.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+sys.path.append(os.path.abspath("."))
+
+import config  # noqa: E402
+from finance.factory import FinancialSystemFactory  # noqa: E402
+from finance.planilha_manager import PlanilhaManager  # noqa: E402
+from finance.storage.excel_storage_handler import ExcelStorageHandler  # noqa: E402
+from finance.strategies.default_strategy import DefaultStrategy  # noqa: E402
+from tests.performance.bench_data import (  # noqa: E402
+    build_transaction_payloads,
+    build_transactions,
+)
+
+N_ROWS = 10_000
+BATCH_SIZES = (100, 1_000)
+
+
+def build_manager(tmp_dir: str) -> PlanilhaManager:
+    """Planilha com N_ROWS transações e o manager montado pela factory."""
+    config.DATA_DIR = tmp_dir
+    path = os.path.join(tmp_dir, "bench.xlsx")
+    data = {
+        name: pd.DataFrame(columns=columns)
+        for name, columns in config.LAYOUT_PLANILHA.items()
+    }
+    data[config.NomesAbas.TRANSACOES] = build_transactions(N_ROWS)
+    ExcelStorageHandler(file_path=path).save_sheets(
+        data, DefaultStrategy(config.LAYOUT_PLANILHA, None)
+    )
+
+    # Handler novo: 'is_new_file' é decidido na construção
+    handler = ExcelStorageHandler(file_path=path)
+
+    config_service = SimpleNamespace(
+        username=f"bench_{os.getpid()}", get_mapeamento=lambda: None
+    )
+    return FinancialSystemFactory.create_manager(
+        storage_handler=handler,
+        config_service=config_service,
+        llm_orchestrator=None,
+    )
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = build_manager(tmp_dir)
+        manager.adicionar_ou_atualizar_orcamento("Categoria 1", 1000.0)
+
+        print(f"\n--- adicionar_registros_lote ({N_ROWS} linhas na planilha) ---")
+        for size in BATCH_SIZES:
+            payloads = build_transaction_payloads(size)
+            start_cpu = time.process_time()
+            start = time.perf_counter()
+            manager.adicionar_registros_lote(payloads)
+            cpu = time.process_time() - start_cpu
+            wall = time.perf_counter() - start
+            print(f"lote de {size:>5}: CPU {cpu:.4f}s | Wall {wall:.4f}s")
+
+        start = time.perf_counter()
+        manager.transaction_repo.list_all(month=6, year=2022)
+        manager.transaction_repo.totals()
+        print(f"Primeira consulta após os lotes: {time.perf_counter() - start:.4f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# tests/tools/test_tool_memoization.py
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+
+from config import NomesAbas
+from finance.tool_loader import load_all_financial_tools
+
+
+@pytest.fixture
+def manager() -> MagicMock:
+    manager = MagicMock()
+    manager.visualizar_dados.return_value = pd.DataFrame(
+        [
+            {
+                "Data": "2025-01-01",
+                "Tipo (Receita/Despesa)": "Despesa",
+                "Categoria": "Alimentação",
+                "Valor": 100.0,
+                "Descricao": "Restaurante",
+            }
+        ]
+    )
+    manager.revisions = {}
+    manager.sheet_revision.side_effect = lambda sheet: manager.revisions.get(sheet, 0)
+    return manager
+
+
+@pytest.fixture
+def tools(manager: MagicMock) -> dict:
+    loaded = load_all_financial_tools(
+        manager=manager,
+        memory_service=None,
+        config_service=None,
+        llm_orchestrator=None,
+    )
+    return {tool.name: tool for tool in loaded}
+
+
+def test_mesma_chamada_reaproveita_resultado(tools: dict, manager: MagicMock) -> None:
+    tool = tools["identificar_maiores_gastos"]
+
+    first = tool.run(top_n=3)
+    second = tool.run(top_n=3)
+
+    assert first == second
+    assert manager.visualizar_dados.call_count == 1
+
+
+def test_argumentos_diferentes_recalculam(tools: dict, manager: MagicMock) -> None:
+    tool = tools["identificar_maiores_gastos"]
+
+    tool.run(top_n=3)
+    tool.run(top_n=5)
+
+    assert manager.visualizar_dados.call_count == 2
+
+
+def test_escrita_na_aba_lida_invalida(tools: dict, manager: MagicMock) -> None:
+    tool = tools["identificar_maiores_gastos"]
+    tool.run(top_n=3)
+
+    # Escrita em outra aba não afeta; na aba de transações, invalida
+    manager.revisions[NomesAbas.DIVIDAS] = 1
+    tool.run(top_n=3)
+    manager.revisions[NomesAbas.TRANSACOES] = 2
+    tool.run(top_n=3)
+
+    assert manager.visualizar_dados.call_count == 2
+
+
+def test_visualizar_dados_usa_revisao_da_aba_pedida(
+    tools: dict, manager: MagicMock
+) -> None:
+    tool = tools["visualizar_dados_planilha"]
+    tool.run(aba_nome=NomesAbas.DIVIDAS)
+
+    manager.revisions[NomesAbas.TRANSACOES] = 1
+    tool.run(aba_nome=NomesAbas.DIVIDAS)
+    manager.revisions[NomesAbas.DIVIDAS] = 2
+    tool.run(aba_nome=NomesAbas.DIVIDAS)
+
+    assert manager.visualizar_dados.call_count == 2
+
+
+def test_ferramentas_de_escrita_nao_sao_memoizadas(tools: dict) -> None:
+    assert not tools["adicionar_transacao"].reads_sheets
+    assert tools["adicionar_transacao"].run.__func__.__name__ == "run"